@@ -0,0 +1,81 @@
+"""
+    Micro benchmark for the BASS binding layer.
+
+    Compares the old eager `func_type(restype, *argtypes)((name, dll))` prototypes against the lazy
+    argtypes/restype functions from pybass3.bindings, both for the cost of building them (what used
+    to happen at import time) and for the per call overhead.
+
+    python benchmarks/bench_bindings.py [--calls 200000]
+"""
+from argparse import ArgumentParser
+import subprocess
+import sys
+import timeit
+
+from pybass3.bindings import LazyLibrary, ctype_of, OVERRIDES, load_library
+from pybass3.datatypes import func_type
+from pybass3._bass_api import PROTOTYPES
+
+
+def build_eager(dll):
+    """
+        What bass_module/bass_channel/bass_stream used to do, one prototype object per function at import
+    """
+    functions = {}
+    for name, (restype, argtypes) in PROTOTYPES.items():
+        if hasattr(dll, name) is False:
+            continue
+        prototype = func_type(OVERRIDES.get(name) or ctype_of(restype, restype=True), *[ctype_of(arg) for arg in argtypes])
+        functions[name] = prototype((name, dll))
+    return functions
+
+
+def import_time(statement: str, repeat: int = 5) -> float:
+    best = None
+    for _ in range(repeat):
+        output = subprocess.check_output([
+            sys.executable, "-c",
+            f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+        ])
+        elapsed = float(output)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(calls: int):
+    dll = load_library()
+
+    build = min(timeit.repeat(lambda: build_eager(dll), number=1, repeat=5))
+    lazy_build = min(timeit.repeat(lambda: LazyLibrary(loader=lambda: dll).BASS_GetVersion, number=1, repeat=5))
+    print(f"Build all {len(PROTOTYPES)} prototypes eagerly: {build * 1000:8.3f} ms")
+    print(f"Lazy library, first function only:     {lazy_build * 1000:8.3f} ms")
+
+    eager = build_eager(dll)
+    lazy = LazyLibrary(loader=lambda: dll)
+
+    cases = [
+        ("BASS_GetVersion()", (), ),
+        ("BASS_ChannelIsActive(0)", (0,)),
+        ("BASS_ChannelGetPosition(0, 0)", (0, 0)),
+    ]
+    print()
+    print(f"{'call':32} {'eager ns':>10} {'lazy ns':>10}")
+    for label, args in cases:
+        name = label.split("(")[0]
+        namespace = {"eager_fn": eager[name], "lazy": lazy, "args": args}
+        eager_time = min(timeit.repeat("eager_fn(*args)", number=calls, repeat=3, globals=namespace))
+        # the same attribute lookup the wrappers do, `bass.BASS_Xxx(...)`
+        lazy_time = min(timeit.repeat(f"lazy.{name}(*args)", number=calls, repeat=3, globals=namespace))
+        print(f"{label:32} {eager_time / calls * 1e9:10.1f} {lazy_time / calls * 1e9:10.1f}")
+
+    print()
+    print(f"import pybass3.bindings:    {import_time('import pybass3.bindings') * 1000:8.3f} ms")
+    print(f"import pybass3.bass_module: {import_time('import pybass3.bass_module') * 1000:8.3f} ms")
+    print(f"import pybass3:             {import_time('import pybass3') * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+    main(args.calls)
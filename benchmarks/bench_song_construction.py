@@ -0,0 +1,61 @@
+"""
+    Construction cost of Song objects when bulk loading a playlist.
+
+    Times creating N songs for the same file and measures the memory each one holds (tracemalloc),
+    for the regular Song, the slotted SlimSong and both with `trusted=True` (no stat call), alongside
+    the per track cost of a Playlist's TrackStore.
+
+    python benchmarks/bench_song_construction.py [--count 100000] [--file some.mp3]
+"""
+from argparse import ArgumentParser
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from pybass3.song import Song, SlimSong
+from pybass3.track_store import TrackStore
+
+
+def construct(factory, count: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    items = [factory(index) for index in range(count)]
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return elapsed, size
+
+
+def main(count: int, file_path: str):
+    cases = [
+        ("Song", lambda index: Song(file_path)),
+        ("Song trusted", lambda index: Song(file_path, trusted=True)),
+        ("SlimSong", lambda index: SlimSong(file_path)),
+        ("SlimSong trusted", lambda index: SlimSong(file_path, trusted=True)),
+    ]
+
+    print(f"{'':18} {'us/song':>10} {'bytes/song':>12}")
+    for label, factory in cases:
+        elapsed, size = construct(factory, count)
+        print(f"{label:18} {elapsed / count * 1e6:10.2f} {size / count:12.0f}")
+
+    store = TrackStore()
+    elapsed, size = construct(lambda index: store.add(file_path, 180.0), count)
+    print(f"{'TrackStore.add':18} {elapsed / count * 1e6:10.2f} {size / count:12.0f}")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--file", default=None, help="Any existing file, defaults to a temporary one")
+    args = parser.parse_args()
+
+    if args.file is None:
+        with tempfile.NamedTemporaryFile(suffix=".mp3") as handle:
+            main(args.count, handle.name)
+    else:
+        main(args.count, os.path.abspath(args.file))
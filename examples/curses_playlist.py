@@ -97,6 +97,8 @@ def main(song_dir):
 
 
         song = playlist.current
+        # One call gathers everything drawn below
+        state = song.snapshot(level=False)
 
         display.clear()
         display.border('|', '|', '-', '-', '+', '+', '+', '+')
@@ -107,10 +109,10 @@ def main(song_dir):
         filename = f"Song: {song.file_path.name}"
         print_centered_text(display, 1, filename, 120)
 
-        counter = f"{f2t(song.position)} / {f2t(song.duration)}"
+        counter = f"{state.position_time} / {state.duration_time}"
         print_centered_text(display, 2, counter, 120)
 
-        perc_done = (song.position_bytes / song.duration_bytes)
+        perc_done = state.progress
 
         progress_perc = f"{int(100 * perc_done)}%"
         tick_end = int(89*perc_done)
@@ -136,22 +136,23 @@ class PlaylistTableModel(QtCore.QAbstractTableModel):
 
     def data(self, index: QtCore.QModelIndex, role: int = ...) -> typing.Any:
 
-        song = self.playlist.get_song_by_row(index.row())
+        # Painting a row shouldn't create a Song, read straight from the playlist's track store
+        track = self.playlist.get_track_by_row(index.row())
         col = index.column()
         if role == Qt.DisplayRole:
             if col == 0:
-                return song.id
+                return track.id
             elif col == 1:
-                song_name = song.title
-                return song_name
+                path = pathlib.Path(track.path)
+                return f"{path.parent.name} - {path.stem}"
             elif col == 2:
-                return song.duration_time
+                return track.duration_time
 
         elif role == Qt.ToolTipRole:
             if col == 1:
-                return song.file_path.as_posix()
+                return track.path
 
-    def song_added(self, song_id: str):
+    def song_added(self, song_id: int):
 
         index = self.playlist.get_indexof_song_by_id(song_id)
         index_model = QtCore.QModelIndex()
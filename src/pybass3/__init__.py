@@ -1,7 +1,7 @@
 
-__all__ = ["Song", "Playlist", "Bass", "BassException", "BassChannel", "BassStream"]
+__all__ = ["Song", "SlimSong", "Playlist", "Bass", "BassException", "BassChannel", "BassStream"]
 
-from .song import Song
+from .song import Song, SlimSong
 from .playlist import Playlist
 from .bass_module import Bass, BassException
 from .bass_channel import BassChannel
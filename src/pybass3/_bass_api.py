@@ -0,0 +1,110 @@
+"""
+    Generated by tools/generate_bindings.py from vendor/bass.h, do not edit by hand.
+
+    name -> (C return type, (C argument types, ...))
+"""
+
+PROTOTYPES = {
+    'BASS_SetConfig': ('BOOL', ('DWORD', 'DWORD')),
+    'BASS_GetConfig': ('DWORD', ('DWORD',)),
+    'BASS_SetConfigPtr': ('BOOL', ('DWORD', 'void*')),
+    'BASS_GetConfigPtr': ('void*', ('DWORD',)),
+    'BASS_GetVersion': ('DWORD', ()),
+    'BASS_ErrorGetCode': ('int', ()),
+    'BASS_GetDeviceInfo': ('BOOL', ('DWORD', 'BASS_DEVICEINFO*')),
+    'BASS_Init': ('BOOL', ('int', 'DWORD', 'DWORD', 'HWND', 'GUID*')),
+    'BASS_SetDevice': ('BOOL', ('DWORD',)),
+    'BASS_GetDevice': ('DWORD', ()),
+    'BASS_Free': ('BOOL', ()),
+    'BASS_GetDSoundObject': ('void*', ('DWORD',)),
+    'BASS_GetInfo': ('BOOL', ('BASS_INFO*',)),
+    'BASS_Update': ('BOOL', ('DWORD',)),
+    'BASS_GetCPU': ('float', ()),
+    'BASS_Start': ('BOOL', ()),
+    'BASS_Stop': ('BOOL', ()),
+    'BASS_Pause': ('BOOL', ()),
+    'BASS_IsStarted': ('BOOL', ()),
+    'BASS_SetVolume': ('BOOL', ('float',)),
+    'BASS_GetVolume': ('float', ()),
+    'BASS_PluginLoad': ('HPLUGIN', ('char*', 'DWORD')),
+    'BASS_PluginFree': ('BOOL', ('HPLUGIN',)),
+    'BASS_PluginGetInfo': ('BASS_PLUGININFO*', ('HPLUGIN',)),
+    'BASS_Set3DFactors': ('BOOL', ('float', 'float', 'float')),
+    'BASS_Get3DFactors': ('BOOL', ('float*', 'float*', 'float*')),
+    'BASS_Set3DPosition': ('BOOL', ('BASS_3DVECTOR*', 'BASS_3DVECTOR*', 'BASS_3DVECTOR*', 'BASS_3DVECTOR*')),
+    'BASS_Get3DPosition': ('BOOL', ('BASS_3DVECTOR*', 'BASS_3DVECTOR*', 'BASS_3DVECTOR*', 'BASS_3DVECTOR*')),
+    'BASS_Apply3D': ('void', ()),
+    'BASS_SetEAXParameters': ('BOOL', ('int', 'float', 'float', 'float')),
+    'BASS_GetEAXParameters': ('BOOL', ('DWORD*', 'float*', 'float*', 'float*')),
+    'BASS_MusicLoad': ('HMUSIC', ('BOOL', 'void*', 'QWORD', 'DWORD', 'DWORD', 'DWORD')),
+    'BASS_MusicFree': ('BOOL', ('HMUSIC',)),
+    'BASS_SampleLoad': ('HSAMPLE', ('BOOL', 'void*', 'QWORD', 'DWORD', 'DWORD', 'DWORD')),
+    'BASS_SampleCreate': ('HSAMPLE', ('DWORD', 'DWORD', 'DWORD', 'DWORD', 'DWORD')),
+    'BASS_SampleFree': ('BOOL', ('HSAMPLE',)),
+    'BASS_SampleSetData': ('BOOL', ('HSAMPLE', 'void*')),
+    'BASS_SampleGetData': ('BOOL', ('HSAMPLE', 'void*')),
+    'BASS_SampleGetInfo': ('BOOL', ('HSAMPLE', 'BASS_SAMPLE*')),
+    'BASS_SampleSetInfo': ('BOOL', ('HSAMPLE', 'BASS_SAMPLE*')),
+    'BASS_SampleGetChannel': ('HCHANNEL', ('HSAMPLE', 'BOOL')),
+    'BASS_SampleGetChannels': ('DWORD', ('HSAMPLE', 'HCHANNEL*')),
+    'BASS_SampleStop': ('BOOL', ('HSAMPLE',)),
+    'BASS_StreamCreate': ('HSTREAM', ('DWORD', 'DWORD', 'DWORD', 'STREAMPROC*', 'void*')),
+    'BASS_StreamCreateFile': ('HSTREAM', ('BOOL', 'void*', 'QWORD', 'QWORD', 'DWORD')),
+    'BASS_StreamCreateURL': ('HSTREAM', ('char*', 'DWORD', 'DWORD', 'DOWNLOADPROC*', 'void*')),
+    'BASS_StreamCreateFileUser': ('HSTREAM', ('DWORD', 'DWORD', 'BASS_FILEPROCS*', 'void*')),
+    'BASS_StreamFree': ('BOOL', ('HSTREAM',)),
+    'BASS_StreamGetFilePosition': ('QWORD', ('HSTREAM', 'DWORD')),
+    'BASS_StreamPutData': ('DWORD', ('HSTREAM', 'void*', 'DWORD')),
+    'BASS_StreamPutFileData': ('DWORD', ('HSTREAM', 'void*', 'DWORD')),
+    'BASS_RecordGetDeviceInfo': ('BOOL', ('DWORD', 'BASS_DEVICEINFO*')),
+    'BASS_RecordInit': ('BOOL', ('int',)),
+    'BASS_RecordSetDevice': ('BOOL', ('DWORD',)),
+    'BASS_RecordGetDevice': ('DWORD', ()),
+    'BASS_RecordFree': ('BOOL', ()),
+    'BASS_RecordGetInfo': ('BOOL', ('BASS_RECORDINFO*',)),
+    'BASS_RecordGetInputName': ('char*', ('int',)),
+    'BASS_RecordSetInput': ('BOOL', ('int', 'DWORD', 'float')),
+    'BASS_RecordGetInput': ('DWORD', ('int', 'float*')),
+    'BASS_RecordStart': ('HRECORD', ('DWORD', 'DWORD', 'DWORD', 'RECORDPROC*', 'void*')),
+    'BASS_ChannelBytes2Seconds': ('double', ('DWORD', 'QWORD')),
+    'BASS_ChannelSeconds2Bytes': ('QWORD', ('DWORD', 'double')),
+    'BASS_ChannelGetDevice': ('DWORD', ('DWORD',)),
+    'BASS_ChannelSetDevice': ('BOOL', ('DWORD', 'DWORD')),
+    'BASS_ChannelIsActive': ('DWORD', ('DWORD',)),
+    'BASS_ChannelGetInfo': ('BOOL', ('DWORD', 'BASS_CHANNELINFO*')),
+    'BASS_ChannelGetTags': ('char*', ('DWORD', 'DWORD')),
+    'BASS_ChannelFlags': ('DWORD', ('DWORD', 'DWORD', 'DWORD')),
+    'BASS_ChannelUpdate': ('BOOL', ('DWORD', 'DWORD')),
+    'BASS_ChannelLock': ('BOOL', ('DWORD', 'BOOL')),
+    'BASS_ChannelPlay': ('BOOL', ('DWORD', 'BOOL')),
+    'BASS_ChannelStop': ('BOOL', ('DWORD',)),
+    'BASS_ChannelPause': ('BOOL', ('DWORD',)),
+    'BASS_ChannelSetAttribute': ('BOOL', ('DWORD', 'DWORD', 'float')),
+    'BASS_ChannelGetAttribute': ('BOOL', ('DWORD', 'DWORD', 'float*')),
+    'BASS_ChannelSlideAttribute': ('BOOL', ('DWORD', 'DWORD', 'float', 'DWORD')),
+    'BASS_ChannelIsSliding': ('BOOL', ('DWORD', 'DWORD')),
+    'BASS_ChannelSetAttributeEx': ('BOOL', ('DWORD', 'DWORD', 'void*', 'DWORD')),
+    'BASS_ChannelGetAttributeEx': ('DWORD', ('DWORD', 'DWORD', 'void*', 'DWORD')),
+    'BASS_ChannelSet3DAttributes': ('BOOL', ('DWORD', 'int', 'float', 'float', 'int', 'int', 'float')),
+    'BASS_ChannelGet3DAttributes': ('BOOL', ('DWORD', 'DWORD*', 'float*', 'float*', 'DWORD*', 'DWORD*', 'float*')),
+    'BASS_ChannelSet3DPosition': ('BOOL', ('DWORD', 'BASS_3DVECTOR*', 'BASS_3DVECTOR*', 'BASS_3DVECTOR*')),
+    'BASS_ChannelGet3DPosition': ('BOOL', ('DWORD', 'BASS_3DVECTOR*', 'BASS_3DVECTOR*', 'BASS_3DVECTOR*')),
+    'BASS_ChannelGetLength': ('QWORD', ('DWORD', 'DWORD')),
+    'BASS_ChannelSetPosition': ('BOOL', ('DWORD', 'QWORD', 'DWORD')),
+    'BASS_ChannelGetPosition': ('QWORD', ('DWORD', 'DWORD')),
+    'BASS_ChannelGetLevel': ('DWORD', ('DWORD',)),
+    'BASS_ChannelGetLevelEx': ('BOOL', ('DWORD', 'float*', 'float', 'DWORD')),
+    'BASS_ChannelGetData': ('DWORD', ('DWORD', 'void*', 'DWORD')),
+    'BASS_ChannelSetSync': ('HSYNC', ('DWORD', 'DWORD', 'QWORD', 'SYNCPROC*', 'void*')),
+    'BASS_ChannelRemoveSync': ('BOOL', ('DWORD', 'HSYNC')),
+    'BASS_ChannelSetDSP': ('HDSP', ('DWORD', 'DSPPROC*', 'void*', 'int')),
+    'BASS_ChannelRemoveDSP': ('BOOL', ('DWORD', 'HDSP')),
+    'BASS_ChannelSetLink': ('BOOL', ('DWORD', 'DWORD')),
+    'BASS_ChannelRemoveLink': ('BOOL', ('DWORD', 'DWORD')),
+    'BASS_ChannelSetFX': ('HFX', ('DWORD', 'DWORD', 'int')),
+    'BASS_ChannelRemoveFX': ('BOOL', ('DWORD', 'HFX')),
+    'BASS_FXSetParameters': ('BOOL', ('HFX', 'void*')),
+    'BASS_FXGetParameters': ('BOOL', ('HFX', 'void*')),
+    'BASS_FXReset': ('BOOL', ('HFX',)),
+    'BASS_FXSetPriority': ('BOOL', ('HFX', 'int')),
+}
@@ -0,0 +1,399 @@
+"""
+    asyncio front end
+
+    Every Song/Playlist call blocks on ctypes and often on the disk (opening a stream, scanning a directory).
+    `AsyncSong` and `AsyncPlaylist` run those calls on executor threads so coroutines only ever await them,
+    and report what the player is doing as events instead of asking the caller to poll with tick().
+
+    Usage::
+
+        async def main():
+            async with AsyncPlaylist() as playlist:
+                await playlist.add_directory(Path("~/music").expanduser())
+                await playlist.play()
+                async for event in playlist.events():
+                    if isinstance(event, TrackChanged):
+                        print("Now playing", event.current)
+
+    A Playlist is not thread safe, `AsyncPlaylist` confines it to one worker thread; every method call and
+    every posted BASS sync callback runs there in order.   The exceptions run on BASS's own threads and only
+    read attributes and act on streams that are already open: the playlist's mixtime end sync (restarting a
+    looped song), its direct end sync (starting a prefetched next song) and the TrackEnded sync, which only
+    publishes.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import dataclasses
+import functools
+import logging
+from pathlib import Path
+import threading
+import typing as T
+
+from .bass_channel import ChannelSnapshot
+from .codes import sync
+from .playlist import Playlist
+from .scanner import ProgressCallback, ScanProgress
+from .song import Song
+from .sync import SyncDispatcher
+
+log = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class TrackChanged:
+    previous: T.Any  # Song id, None when the playlist started
+    current: T.Any  # Song id, None when the playlist stopped
+
+
+@dataclasses.dataclass(frozen=True)
+class TrackEnded:
+    song_id: T.Any
+
+
+@dataclasses.dataclass(frozen=True)
+class TracksAdded:
+    track_ids: T.Tuple[int, ...]  # Added by this batch of a directory scan
+    progress: ScanProgress  # Scan progress once the batch was scanned
+
+
+class EventStream:
+    """
+        Fans events published from any thread out to every subscriber on the event loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int = 0):
+        """
+
+        Args:
+            loop: Loop the subscribers live on
+            maxsize: Per subscriber queue limit, the oldest events are dropped once a slow subscriber hits it
+        """
+        self.loop = loop
+        self.maxsize = maxsize
+        self._queues = set()
+
+    def publish(self, event) -> None:
+        """
+            Safe to call from any thread, including the BASS mixer thread
+        """
+        self.loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event):
+        for queue in self._queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def subscribe(self) -> "Subscription":
+        """
+            Async iterator over every event published from this call on, even before iteration starts
+        """
+        queue = asyncio.Queue(self.maxsize)
+        self._queues.add(queue)
+        return Subscription(self, queue)
+
+    def _unsubscribe(self, queue):
+        self._queues.discard(queue)
+
+    async def wait_for(self, event_type: type, predicate: T.Callable[[T.Any], bool] = None):
+        """
+            Wait for the next event of `event_type` (and matching `predicate`)
+        """
+        with self.subscribe() as events:
+            async for event in events:
+                if isinstance(event, event_type) and (predicate is None or predicate(event)):
+                    return event
+
+    def close(self) -> None:
+        # Ends every subscriber's iteration, a full queue loses its oldest event like in _deliver
+        for queue in self._queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+
+class Subscription:
+    """
+        One subscriber's events, iterate with `async for` and `close()` (or use `with`) when done.
+    """
+
+    def __init__(self, stream: EventStream, queue: asyncio.Queue):
+        self._stream = stream
+        self._queue = queue
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self._queue.get()
+        if event is None:
+            self.close()
+            raise StopAsyncIteration
+        return event
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        self._stream._unsubscribe(self._queue)
+
+
+class AsyncSong:
+    """
+        Awaitable front for a Song, blocking calls run on `executor` (the loop's default executor if None).
+    """
+
+    def __init__(self, song: Song, loop: asyncio.AbstractEventLoop = None, executor=None):
+        self.song = song
+        self.loop = loop or asyncio.get_running_loop()
+        self.executor = executor
+        # Song isn't safe to use from two threads at once, eg two coroutines both opening the stream
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<AsyncSong {self.song.file_path}>"
+
+    @classmethod
+    async def open(cls, file_path: T.Union[str, Path], song_cls=Song, executor=None, **kwargs) -> "AsyncSong":
+        """
+            Create the song and open its stream without blocking the loop
+
+        Args:
+            file_path: Path to a music file
+            song_cls: Song class to create
+            executor: Where blocking calls run
+            kwargs: Passed to `song_cls`
+        """
+        loop = asyncio.get_running_loop()
+        song = await loop.run_in_executor(executor, functools.partial(song_cls, file_path, **kwargs))
+        wrapper = cls(song, loop, executor)
+        await wrapper.call(lambda: song.handle)
+        return wrapper
+
+    async def call(self, function: T.Callable, *args):
+        """
+            Run `function(*args)` on the executor with the song locked
+        """
+        def locked():
+            with self._lock:
+                return function(*args)
+
+        return await self.loop.run_in_executor(self.executor, locked)
+
+    @property
+    def id(self):
+        return self.song.id
+
+    async def play(self) -> None:
+        await self.call(self.song.play)
+
+    async def pause(self) -> None:
+        await self.call(self.song.pause)
+
+    async def resume(self) -> None:
+        await self.call(self.song.resume)
+
+    async def stop(self) -> None:
+        await self.call(self.song.stop)
+
+    async def seek(self, seconds: float) -> None:
+        await self.call(self.song.move2position_seconds, seconds)
+
+    async def duration(self) -> float:
+        return await self.call(lambda: self.song.duration)
+
+    async def snapshot(self, level: bool = True) -> ChannelSnapshot:
+        return await self.call(self.song.snapshot, level)
+
+    async def free(self) -> None:
+        await self.call(self.song.free_stream)
+
+    async def wait_end(self) -> None:
+        """
+            Returns when the song plays to its end.   Uses a one time BASS end sync, nothing is polled.
+        """
+        done = self.loop.create_future()
+
+        def ended(channel, data):
+            # BASS's sync thread, once the end has been heard
+            self.loop.call_soon_threadsafe(lambda: done.done() or done.set_result(None))
+
+        handle = await self.call(lambda: self.song.handle)
+        dispatcher = SyncDispatcher.default()
+        hsync = dispatcher.set_sync(handle, sync.SYNC_END, ended, onetime=True, direct=True)
+        try:
+            await done
+        finally:
+            if self.song._handle == handle:
+                dispatcher.remove_sync(handle, hsync)
+
+
+class AsyncPlaylist:
+    """
+        Awaitable front for a Playlist driven by BASS sync events.   Track changes and track ends are
+        published as `TrackChanged` and `TrackEnded` events and directory scans as `TracksAdded`, see `events()`.
+    """
+
+    def __init__(self, playlist: Playlist = None, loop: asyncio.AbstractEventLoop = None, **playlist_kwargs):
+        """
+
+        Args:
+            playlist: Playlist to drive, a new one is made from `playlist_kwargs` if None.  It must not be
+                used directly from other threads afterwards.
+            loop: Defaults to the running loop
+        """
+        self.loop = loop or asyncio.get_running_loop()
+        self.playlist = playlist if playlist is not None else Playlist(**playlist_kwargs)
+        self.stream = EventStream(self.loop)
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pybass3-aio")
+        self._observed = None  # id of the song last reported as current
+        self._current = None  # The song last reported as current, read from the loop's thread
+        self._watched = set()  # stream handles with a TrackEnded sync
+
+        self.dispatcher = SyncDispatcher(post=self._post)
+        self._executor.submit(self._run, self.playlist.use_sync_events, self.dispatcher)
+
+    async def __aenter__(self) -> "AsyncPlaylist":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __len__(self):
+        return len(self.playlist)
+
+    def _post(self, job):
+        # Called from BASS threads by the dispatcher, runs the sync handler on the playlist thread
+        self._executor.submit(self._run, job)
+
+    def _run(self, function: T.Callable, *args):
+        try:
+            return function(*args)
+        finally:
+            self._check_current()
+
+    def _check_current(self):
+        current = self.playlist.current
+        current_id = None if current is None else current.id
+        if current_id == self._observed:
+            return
+
+        previous, self._observed = self._observed, current_id
+        self._current = current
+        if current is not None and current._handle is not None and current._handle not in self._watched:
+            handle = current._handle
+            self._watched.add(handle)
+            self.dispatcher.set_sync(handle, sync.SYNC_END, functools.partial(self._on_end, current_id), direct=True)
+            self.dispatcher.set_sync(handle, sync.SYNC_FREE, self._on_freed)
+
+        self.stream.publish(TrackChanged(previous, current_id))
+
+    def _on_end(self, song_id, channel, data):
+        # BASS's sync thread as the end is heard, published before the playlist's posted end handler has run
+        self.stream.publish(TrackEnded(song_id))
+
+    def _on_freed(self, channel, data):
+        # Posted, runs on the playlist's thread
+        self._watched.discard(channel)
+
+    async def call(self, function: T.Callable, *args):
+        """
+            Run `function(*args)` on the playlist's thread, eg `await aplaylist.call(playlist.loop_queue)`
+        """
+        return await self.loop.run_in_executor(self._executor, functools.partial(self._run, function, *args))
+
+    def events(self) -> Subscription:
+        """
+            Async iterator of TrackChanged/TrackEnded/TracksAdded events from the moment this is called
+        """
+        return self.stream.subscribe()
+
+    async def wait_track_change(self) -> TrackChanged:
+        return await self.stream.wait_for(TrackChanged)
+
+    async def wait_track_end(self) -> TrackEnded:
+        return await self.stream.wait_for(TrackEnded)
+
+    @property
+    def current(self) -> Song:
+        """
+            The current song as of the last command or sync handled on the playlist's thread, the Playlist
+            itself isn't read from the loop's thread
+        """
+        return self._current
+
+    async def add_song(self, song_path: Path, add2queue=True, duration: float = None) -> Song:
+        return await self.call(self.playlist.add_song, song_path, add2queue, duration)
+
+    async def add_directory(self, dir_path: Path, recurse=True, workers: int = None,
+                            progress: ProgressCallback = None) -> T.List[int]:
+        """
+            Scan on the loop's default executor, only adding the results takes the playlist's thread.   Results are
+            added in batches as the scan goes, each one published as a `TracksAdded` event.
+
+        Returns:
+            Track ids added
+        """
+        scanner = self.playlist.make_scanner(workers, progress)
+
+        def add_batch(results, scan_progress):
+            track_ids = self.playlist.add_scan_results(results)
+            self.stream.publish(TracksAdded(tuple(track_ids), scan_progress))
+            return track_ids
+
+        def scan():
+            pending = [self._executor.submit(self._run, add_batch, batch, dataclasses.replace(scanner.progress))
+                       for batch in scanner.scan_batches(dir_path, recurse)]
+            return [track_id for added in pending for track_id in added.result()]
+
+        return await self.loop.run_in_executor(None, scan)
+
+    async def remove_song(self, song_id) -> bool:
+        return await self.call(self.playlist.remove_song, song_id)
+
+    async def play(self) -> None:
+        await self.call(self.playlist.play)
+
+    async def play_song_by_id(self, song_id) -> None:
+        await self.call(self.playlist.play_song_by_id, song_id)
+
+    async def pause(self) -> None:
+        await self.call(self.playlist.pause)
+
+    async def stop(self) -> None:
+        await self.call(self.playlist.stop)
+
+    async def next(self) -> Song:
+        return await self.call(self.playlist.next)
+
+    async def previous(self) -> Song:
+        return await self.call(self.playlist.previous)
+
+    async def restart(self) -> None:
+        await self.call(self.playlist.restart)
+
+    async def set_randomize(self, restart_and_play=True) -> None:
+        await self.call(self.playlist.set_randomize, restart_and_play)
+
+    async def set_sequential(self, restart_and_play=True) -> None:
+        await self.call(self.playlist.set_sequential, restart_and_play)
+
+    async def snapshot(self, level: bool = True) -> T.Optional[ChannelSnapshot]:
+        def current_snapshot():
+            current = self.playlist.current
+            return None if current is None else current.snapshot(level)
+
+        return await self.call(current_snapshot)
+
+    async def close(self) -> None:
+        """
+            Free the playlist and stop the worker thread
+        """
+        await self.call(self.playlist.free)
+        self._executor.shutdown(wait=False)
+        self.stream.close()
@@ -1,46 +1,91 @@
 import ctypes
+import typing as T
 
-from .bass_module import func_type, bass_module
-from .datatypes import HANDLE, QWORD
+from .bindings import bass
+from .datatypes import func_type, HANDLE, HSYNC, HDSP, DWORD
 from .codes import channel
+from .codes import tag
+from .codes import data
+from .structs.channel import BASS_CHANNELINFO
+from .structs.tag import TAG_ID3
+
+# void CALLBACK SyncProc(HSYNC handle, DWORD channel, DWORD data, void *user)
+SYNCPROC = func_type(None, HSYNC, DWORD, DWORD, ctypes.c_void_p)
+# void CALLBACK DSPPROC(HDSP handle, DWORD channel, void *buffer, DWORD length, void *user)
+DSPPROC = func_type(None, HDSP, DWORD, ctypes.c_void_p, DWORD, ctypes.c_void_p)
+
+
+def __getattr__(name):
+    # Backwards compatibility for the BASS_Channelxxx prototypes that used to be defined here
+    if name.startswith("BASS_Channel"):
+        try:
+            return getattr(bass, name)
+        except AttributeError:
+            pass
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class ChannelSnapshot:
+    """
+        Everything a UI needs to draw a channel, gathered by BassChannel.Snapshot.   Instances are meant to be
+        reused from frame to frame, the channel's length and byte rate are only looked up when the handle changes.
+    """
+    __slots__ = ("handle", "state", "position_bytes", "position_seconds", "length_bytes", "length_seconds",
+                 "level_left", "level_right", "bytes_per_second")
+
+    def __init__(self):
+        self.handle = None
+        self.state = channel.ACTIVE_STOPPED
+        self.position_bytes = 0
+        self.position_seconds = 0.0
+        self.length_bytes = 0
+        self.length_seconds = 0.0
+        self.level_left = 0.0  # 0..1
+        self.level_right = 0.0  # 0..1
+        self.bytes_per_second = 0.0
+
+    @property
+    def is_playing(self) -> bool:
+        return self.state == channel.ACTIVE_PLAYING
+
+    @property
+    def is_paused(self) -> bool:
+        return self.state == channel.ACTIVE_PAUSED
+
+    @property
+    def is_stopped(self) -> bool:
+        return self.state == channel.ACTIVE_STOPPED
+
+    @property
+    def remaining_bytes(self) -> int:
+        return self.length_bytes - self.position_bytes
+
+    @property
+    def remaining_seconds(self) -> float:
+        return self.length_seconds - self.position_seconds
+
+    @property
+    def progress(self) -> float:
+        """
+            0..1 of the way through the channel
+        """
+        return self.position_bytes / self.length_bytes if self.length_bytes > 0 else 0.0
 
-BASS_ChannelPlay = func_type(
-    ctypes.c_bool,
-    HANDLE,
-    ctypes.c_bool)(('BASS_ChannelPlay', bass_module))
-
-BASS_ChannelStop = func_type(
-    ctypes.c_bool,
-    HANDLE)(('BASS_ChannelStop', bass_module))
-
-BASS_ChannelPause = func_type(
-    ctypes.c_bool,
-    HANDLE)(('BASS_ChannelPause', bass_module))
-
-BASS_ChannelIsActive = func_type(
-    ctypes.c_ulong,
-    ctypes.c_ulong)(('BASS_ChannelIsActive', bass_module))
-
-BASS_ChannelGetPosition = func_type(QWORD,
-                                    ctypes.c_ulong,
-                                    ctypes.c_ulong)(('BASS_ChannelGetPosition', bass_module))
-
-BASS_ChannelSetPosition = func_type(ctypes.c_bool,
-                                    ctypes.c_ulong,
-                                    QWORD,
-                                    ctypes.c_ulong)(('BASS_ChannelSetPosition', bass_module))
-
-BASS_ChannelBytes2Seconds = func_type(
-    ctypes.c_double,
-    ctypes.c_ulong, QWORD)(('BASS_ChannelBytes2Seconds', bass_module))
+    @staticmethod
+    def _time(value: float) -> str:
+        return f"{int(value // 60):02}:{int(value % 60):02}"
 
-BASS_ChannelSeconds2Bytes = func_type(
-    QWORD,
-    ctypes.c_ulong,
-    ctypes.c_double)(('BASS_ChannelSeconds2Bytes', bass_module))
+    @property
+    def position_time(self) -> str:
+        return self._time(self.position_seconds)
 
-BASS_ChannelGetLength = func_type(QWORD, ctypes.c_ulong, ctypes.c_ulong)(('BASS_ChannelGetLength', bass_module))
+    @property
+    def duration_time(self) -> str:
+        return self._time(self.length_seconds)
 
+    @property
+    def remaining_time(self) -> str:
+        return self._time(self.remaining_seconds)
 
 
 class BassChannel:
@@ -56,11 +101,11 @@ class BassChannel:
         Returns:
 
         """
-        return BASS_ChannelPlay(stream_handle, restart)
+        return bass.BASS_ChannelPlay(stream_handle, restart)
 
     @classmethod
     def Stop(cls, stream_handle: HANDLE) -> bool:
-        return BASS_ChannelStop(stream_handle)
+        return bass.BASS_ChannelStop(stream_handle)
 
     @classmethod
     def Pause(cls, stream_handle: HANDLE) -> bool:
@@ -77,15 +122,30 @@ class BassChannel:
         if status == channel.ACTIVE_PAUSED:
             return cls.Play(stream_handle)
         else:
-            return BASS_ChannelPause(stream_handle)
+            return bass.BASS_ChannelPause(stream_handle)
 
     @classmethod
     def Resume(cls, stream_handle: HANDLE) -> bool:
         return cls.Play(stream_handle)
 
+    @classmethod
+    def Update(cls, stream_handle: HANDLE, length: int = 0) -> bool:
+        """
+            Fills the playback buffer, used on a stream that isn't playing yet it pre-buffers it so
+            playback starts without waiting on the file/decoder.
+
+        Args:
+            stream_handle: A valid Bass stream handle
+            length: Milliseconds of data to buffer, 0 = the whole playback buffer
+
+        Returns:
+            bool
+        """
+        return bass.BASS_ChannelUpdate(stream_handle, length)
+
     @classmethod
     def IsActive(cls, stream_handle: HANDLE):
-        return BASS_ChannelIsActive(stream_handle)
+        return bass.BASS_ChannelIsActive(stream_handle)
 
     @classmethod
     def IsPlaying(cls, stream_handle: HANDLE):
@@ -104,21 +164,21 @@ class BassChannel:
 
     @classmethod
     def GetPositionBytes(cls, stream_handle: HANDLE):
-        return BASS_ChannelGetPosition(stream_handle, channel.POS_BYTE)
+        return bass.BASS_ChannelGetPosition(stream_handle, channel.POS_BYTE)
 
     @classmethod
     def GetPositionSeconds(cls, stream_handle: HANDLE) -> int:
         bytes = cls.GetPositionBytes(stream_handle)
-        return BASS_ChannelBytes2Seconds(stream_handle, bytes)
+        return bass.BASS_ChannelBytes2Seconds(stream_handle, bytes)
 
     @classmethod
     def SetPositionBySeconds(cls, handle: HANDLE, seconds: float):
-        bytes = BASS_ChannelSeconds2Bytes(handle, seconds)
-        return BASS_ChannelSetPosition(handle, bytes, channel.POS_BYTE)
+        bytes = bass.BASS_ChannelSeconds2Bytes(handle, seconds)
+        return bass.BASS_ChannelSetPosition(handle, bytes, channel.POS_BYTE)
 
     @classmethod
     def SetPositionByBytes(cls, handle: HANDLE, bytes: int):
-        return BASS_ChannelSetPosition(handle, bytes, channel.POS_BYTE)
+        return bass.BASS_ChannelSetPosition(handle, bytes, channel.POS_BYTE)
 
 
     @classmethod
@@ -126,7 +186,15 @@ class BassChannel:
         if bytes is None:
             bytes = cls.GetLengthBytes(stream_handle)
 
-        return BASS_ChannelBytes2Seconds(stream_handle, bytes)
+        return bass.BASS_ChannelBytes2Seconds(stream_handle, bytes)
+
+    @classmethod
+    def Seconds2Bytes(cls, stream_handle: HANDLE, seconds: float) -> int:
+        return bass.BASS_ChannelSeconds2Bytes(stream_handle, seconds)
+
+    @classmethod
+    def Bytes2Seconds(cls, stream_handle: HANDLE, bytes: int) -> float:
+        return bass.BASS_ChannelBytes2Seconds(stream_handle, bytes)
 
     @classmethod
     def GetLengthStr(cls, stream_handle):
@@ -145,4 +213,334 @@ class BassChannel:
 
     @classmethod
     def GetLengthBytes(cls, stream_handle: HANDLE):
-        return BASS_ChannelGetLength(stream_handle, channel.POS_BYTE)
+        return bass.BASS_ChannelGetLength(stream_handle, channel.POS_BYTE)
+
+    @classmethod
+    def GetInfo(cls, stream_handle: HANDLE) -> BASS_CHANNELINFO:
+        """
+            Sample rate, channel count, flags and type of a channel.
+
+        Args:
+            stream_handle: A valid Bass stream handle
+
+        Returns:
+            BASS_CHANNELINFO struct or None if the handle is not valid
+        """
+        info = BASS_CHANNELINFO()
+        retval = bass.BASS_ChannelGetInfo(stream_handle, info)
+        if retval is not True:
+            return None
+
+        return info
+
+    @classmethod
+    def _channel_count(cls, stream_handle: HANDLE) -> int:
+        # 1 for invalid handles, BASS then fails the call without writing anything
+        info = cls.GetInfo(stream_handle)
+        return 1 if info is None else info.chans
+
+    @classmethod
+    def GetTagList(cls, stream_handle: HANDLE, tag_type: int) -> list:
+        """
+            Reads tag formats which are a series of null-terminated strings (OGG, APE, MP4, ...).
+
+        Args:
+            stream_handle: A valid Bass stream handle
+            tag_type: one of codes.tag
+
+        Returns:
+            list of "KEY=value" strings, empty if the channel has no tags of that type
+        """
+        address = bass.BASS_ChannelGetTags(stream_handle, tag_type)
+        items = []
+        if not address:
+            return items
+
+        while True:
+            value = ctypes.string_at(address)
+            if not value:
+                break
+            items.append(value.decode("utf-8", errors="replace"))
+            address += len(value) + 1
+
+        return items
+
+    @classmethod
+    def GetTags(cls, stream_handle: HANDLE) -> dict:
+        """
+            Best effort title/artist/album/etc lookup.   OGG/Opus, APE and MP4 tags are tried first and
+            ID3v1 is used as a fallback.
+
+        Args:
+            stream_handle: A valid Bass stream handle
+
+        Returns:
+            dict of lower case tag name to value
+        """
+        tags = {}
+        for tag_type in (tag.OGG, tag.APE, tag.MP4):
+            for item in cls.GetTagList(stream_handle, tag_type):
+                key, sep, value = item.partition("=")
+                if sep:
+                    tags.setdefault(key.lower(), value)
+
+        if not tags:
+            address = bass.BASS_ChannelGetTags(stream_handle, tag.ID3)
+            if address:
+                id3 = TAG_ID3.from_address(address)
+                for name in ("title", "artist", "album", "year", "comment"):
+                    value = getattr(id3, name).decode("latin-1").strip()
+                    if value:
+                        tags[name] = value
+
+        return tags
+
+    @classmethod
+    def GetDataPtr(cls, stream_handle: HANDLE, address: int, length: int) -> int:
+        """
+            Raw BASS_ChannelGetData for callers that keep their own buffer address around.
+
+        Args:
+            stream_handle: A valid Bass stream handle, normally a decoding channel
+            address: Memory address to write to
+            length: Number of bytes wanted OR'd with codes.data flags
+
+        Returns:
+            Number of bytes written, or -1 if the channel has ended or an error occurred
+        """
+        retval = bass.BASS_ChannelGetData(stream_handle, address, length)
+        if retval == data.DW_ERROR:
+            return -1
+
+        return retval
+
+    @classmethod
+    def GetData(cls, stream_handle: HANDLE, buffer, flags: int = 0) -> int:
+        """
+            Decodes sample data (or FFT data with the codes.data FFT flags) straight into `buffer`
+            without an intermediate copy.
+
+        Args:
+            stream_handle: A valid Bass stream handle
+            buffer: A writable, contiguous buffer-protocol object; bytearray, memoryview, numpy array, ctypes array.
+            flags: codes.data flags, eg data.DATA_FLOAT
+
+        Returns:
+            Number of bytes written, or -1 if the channel has ended or an error occurred
+        """
+        view = memoryview(buffer)
+        c_buffer = (ctypes.c_char * view.nbytes).from_buffer(view)
+        return cls.GetDataPtr(stream_handle, ctypes.addressof(c_buffer), view.nbytes | flags)
+
+    @classmethod
+    def SetSync(cls, stream_handle: HANDLE, sync_type: int, param: int, proc: SYNCPROC, user: int = None) -> int:
+        """
+            Raw BASS_ChannelSetSync, see sync.SyncDispatcher for the managed version.
+
+        Args:
+            stream_handle: A valid Bass stream handle
+            sync_type: codes.sync SYNC_xxx type OR'd with any SYNC_MIXTIME/ONETIME/THREAD flags
+            param: Type specific, eg the byte position for SYNC_POS
+            proc: A SYNCPROC instance, it must be kept alive for as long as the sync exists
+            user: Passed back to `proc`
+
+        Returns:
+            Sync handle, 0 on failure
+        """
+        return bass.BASS_ChannelSetSync(stream_handle, sync_type, param, proc, user)
+
+    @classmethod
+    def RemoveSync(cls, stream_handle: HANDLE, sync_handle: int) -> bool:
+        return bass.BASS_ChannelRemoveSync(stream_handle, sync_handle)
+
+    @classmethod
+    def SetDSP(cls, stream_handle: HANDLE, proc: DSPPROC, user: int = None, priority: int = 0) -> int:
+        """
+            Raw BASS_ChannelSetDSP, see dsp.DSPChain for the managed version.
+
+        Args:
+            stream_handle: A valid Bass stream handle
+            proc: A DSPPROC instance, it must be kept alive for as long as the DSP is set
+            user: Passed back to `proc`
+            priority: DSPs with higher priorities are called before lower ones
+
+        Returns:
+            DSP handle, 0 on failure
+        """
+        return bass.BASS_ChannelSetDSP(stream_handle, proc, user, priority)
+
+    @classmethod
+    def RemoveDSP(cls, stream_handle: HANDLE, dsp_handle: int) -> bool:
+        return bass.BASS_ChannelRemoveDSP(stream_handle, dsp_handle)
+
+    @classmethod
+    def SetFX(cls, stream_handle: HANDLE, fx_type: int, priority: int = 0) -> int:
+        """
+            Raw BASS_ChannelSetFX, see fx.EffectChain for the managed version.
+
+        Args:
+            stream_handle: A valid Bass stream handle
+            fx_type: codes.fx FX_xxx effect type
+            priority: Effects (and DSPs) with higher priorities are applied before lower ones
+
+        Returns:
+            FX handle, 0 on failure
+        """
+        return bass.BASS_ChannelSetFX(stream_handle, fx_type, priority)
+
+    @classmethod
+    def RemoveFX(cls, stream_handle: HANDLE, fx_handle: int) -> bool:
+        return bass.BASS_ChannelRemoveFX(stream_handle, fx_handle)
+
+    @classmethod
+    def SetAttribute(cls, stream_handle: HANDLE, attrib: int, value: float) -> bool:
+        return bass.BASS_ChannelSetAttribute(stream_handle, attrib, value)
+
+    @classmethod
+    def GetAttribute(cls, stream_handle: HANDLE, attrib: int) -> float:
+        """
+        Returns:
+            The attribute's current value, None if the handle or attribute isn't valid
+        """
+        value = ctypes.c_float()
+        if bass.BASS_ChannelGetAttribute(stream_handle, attrib, ctypes.byref(value)) is not True:
+            return None
+        return value.value
+
+    @classmethod
+    def SlideAttribute(cls, stream_handle: HANDLE, attrib: int, value: float, milliseconds: int) -> bool:
+        """
+            Ramps an attribute to `value` inside BASS, no Python runs while it slides.
+
+        Args:
+            stream_handle: A valid Bass stream handle
+            attrib: codes.attrib ATTRIB_xxx, optionally OR'd with attrib.SLIDE_LOG for volume
+            value: Target value
+            milliseconds: Length of the slide
+
+        Returns:
+            bool
+        """
+        return bass.BASS_ChannelSlideAttribute(stream_handle, attrib, value, int(milliseconds))
+
+    @classmethod
+    def IsSliding(cls, stream_handle: HANDLE, attrib: int) -> bool:
+        return bass.BASS_ChannelIsSliding(stream_handle, attrib)
+
+    @classmethod
+    def GetLevel(cls, stream_handle: HANDLE) -> T.Tuple[float, float]:
+        """
+            Current peak level of a playing channel.   Don't use on decoding channels, it consumes their data.
+
+        Returns:
+            (left, right) between 0 and 1, mono channels report the same value twice
+        """
+        level = bass.BASS_ChannelGetLevel(stream_handle)
+        if level == data.DW_ERROR:
+            return 0.0, 0.0
+
+        return (level & 0xFFFF) / 32768, ((level >> 16) & 0xFFFF) / 32768
+
+    @classmethod
+    def GetLevelEx(cls, stream_handle: HANDLE, levels, length: float = 0.02, flags: int = 0) -> bool:
+        """
+            Peak (or RMS) level of every channel over the last `length` seconds, written into `levels`.
+
+        Args:
+            stream_handle: A valid Bass stream handle
+            levels: Writable float32 buffer with room for one value per channel (one with LEVEL_MONO,
+                two with LEVEL_STEREO), eg a numpy.float32 array.  Values are 0..1, above 1 if clipping.
+            length: Seconds to measure, up to 1
+            flags: codes.data LEVEL_xxx flags
+
+        Returns:
+            True on success, False if the channel isn't playing or the handle is invalid
+
+        Raises:
+            ValueError if `levels` is too small
+        """
+        if flags & data.LEVEL_MONO:
+            count = 1
+        elif flags & data.LEVEL_STEREO:
+            count = 2
+        else:
+            count = cls._channel_count(stream_handle)
+
+        view = memoryview(levels)
+        if view.nbytes < count * ctypes.sizeof(ctypes.c_float):
+            raise ValueError(f"{view.nbytes} byte buffer can't hold {count} levels")
+        c_buffer = (ctypes.c_char * view.nbytes).from_buffer(view)
+        pointer = ctypes.cast(c_buffer, ctypes.POINTER(ctypes.c_float))
+        return bass.BASS_ChannelGetLevelEx(stream_handle, pointer, length, flags)
+
+    @classmethod
+    def GetFFT(cls, stream_handle: HANDLE, buffer, fft: int = data.DATA_FFT2048, flags: int = 0) -> int:
+        """
+            FFT magnitudes of the data about to be heard, written into `buffer`.
+
+            An N sample FFT gives N/2 float bins (N/2+1 with DATA_FFT_NYQUIST, 2N floats with DATA_FFT_COMPLEX,
+            times the channel count with DATA_FFT_INDIVIDUAL); `buffer` must be big enough.
+
+        Args:
+            stream_handle: A valid Bass stream handle
+            buffer: Writable float32 buffer, eg a preallocated numpy.float32 array
+            fft: codes.data DATA_FFTxxx size
+            flags: codes.data DATA_FFT_xxx flags
+
+        Returns:
+            Number of bytes of sample data that were used, or -1 on error
+
+        Raises:
+            ValueError if `buffer` is too small
+        """
+        samples = 256 << (fft & 0x7)
+        if flags & data.DATA_FFT_COMPLEX:
+            count = samples * 2
+        else:
+            count = samples // 2 + (1 if flags & data.DATA_FFT_NYQUIST else 0)
+        if flags & data.DATA_FFT_INDIVIDUAL:
+            count *= cls._channel_count(stream_handle)
+
+        view = memoryview(buffer)
+        if view.nbytes < count * ctypes.sizeof(ctypes.c_float):
+            raise ValueError(f"{view.nbytes} byte buffer can't hold {count} FFT values")
+        c_buffer = (ctypes.c_char * view.nbytes).from_buffer(view)
+        # The FFT type goes where the length would, it isn't OR'd with a byte count like sample data requests
+        return cls.GetDataPtr(stream_handle, ctypes.addressof(c_buffer), fft | flags)
+
+    @classmethod
+    def Snapshot(cls, stream_handle: HANDLE, snapshot: ChannelSnapshot = None, level: bool = True) -> ChannelSnapshot:
+        """
+            State, position, length and level of a channel in one call.
+
+            Length and the byte rate are cached on the snapshot while the handle stays the same, so
+            a refresh is three ctypes calls (two without `level`) and seconds are worked out in Python.
+
+        Args:
+            stream_handle: A valid Bass stream handle
+            snapshot: A snapshot to refresh in place, a new one is made if omitted
+            level: Also read the peak level
+
+        Returns:
+            ChannelSnapshot
+        """
+        if snapshot is None:
+            snapshot = ChannelSnapshot()
+
+        if snapshot.handle != stream_handle:
+            snapshot.handle = stream_handle
+            snapshot.length_bytes = max(cls.GetLengthBytes(stream_handle), 0)
+            snapshot.length_seconds = max(bass.BASS_ChannelBytes2Seconds(stream_handle, snapshot.length_bytes), 0.0)
+            snapshot.bytes_per_second = (snapshot.length_bytes / snapshot.length_seconds
+                                         if snapshot.length_seconds > 0
+                                         else cls.Seconds2Bytes(stream_handle, 1.0))
+
+        snapshot.state = bass.BASS_ChannelIsActive(stream_handle)
+        snapshot.position_bytes = max(bass.BASS_ChannelGetPosition(stream_handle, channel.POS_BYTE), 0)
+        snapshot.position_seconds = (snapshot.position_bytes / snapshot.bytes_per_second
+                                     if snapshot.bytes_per_second > 0 else 0.0)
+
+        if level is True:
+            snapshot.level_left, snapshot.level_right = cls.GetLevel(stream_handle)
+
+        return snapshot
@@ -1,77 +1,36 @@
-from pathlib import Path
+import atexit
 import dataclasses
-import platform
-import ctypes
-import sys
+import logging
+import threading
 
+from .bindings import bass
 from .codes import errors
 from .codes import config
+from .codes import attrib
 from .codes.errors import get_description
 from .structs.info import BASS_INFO, BASS_DEVICEINFO
 
 BASSVERSION = 0x204
 BASSVERSIONTEXT = '2.4'
 
-HERE = Path(__file__).parent
-BASS_DLL = HERE / "vendor" / "bass"
-BASS_ATTRIB_VOL = 2 # used to set local volume
+log = logging.getLogger(__name__)
 
-# Carry over from pybass, TODO remove?
-if sys.hexversion < 0x02060000:
-    ctypes.c_bool = ctypes.c_byte
+BASS_ATTRIB_VOL = attrib.ATTRIB_VOL # used to set local volume
 
-if platform.system().lower() == "windows":
-    bass_module = ctypes.WinDLL(BASS_DLL.as_posix())
-    func_type = ctypes.WINFUNCTYPE
-else:
-    bass_module = ctypes.CDLL(
-        HERE / "vendor" / "libbass.so",
-        mode=ctypes.RTLD_GLOBAL)
-    func_type = ctypes.CFUNCTYPE
-
-BASS_Init = func_type(
-    ctypes.c_bool,
-    ctypes.c_int,
-    ctypes.c_ulong,
-    ctypes.c_ulong,
-    ctypes.c_ulong,
-    ctypes.c_void_p)(('BASS_Init', bass_module))
-
-BASS_IsStarted = func_type(ctypes.c_bool)(("BASS_IsStarted", bass_module))
-
-BASS_Free = func_type(ctypes.c_bool)(('BASS_Free', bass_module))
-
-BASS_ErrorGetCode = func_type(ctypes.c_int)(('BASS_ErrorGetCode', bass_module))
-
-BASS_GetCPU = func_type(ctypes.c_float)(('BASS_GetCPU', bass_module))
-
-#Global volume
-BASS_SetVolume = func_type(ctypes.c_bool, ctypes.c_float)(('BASS_SetVolume', bass_module))
-BASS_GetVolume = func_type(ctypes.c_float)(('BASS_GetVolume', bass_module))
-
-BASS_SetConfig = func_type(ctypes.c_bool,
-                           ctypes.c_ulong,
-                           ctypes.c_ulong)(('BASS_SetConfig', bass_module))
-
-BASS_GetConfig = func_type(ctypes.c_ulong, ctypes.c_ulong)(('BASS_GetConfig', bass_module))
-
-BASS_GetVersion = func_type(ctypes.c_ulong)(('BASS_GetVersion', bass_module))
-
-BASS_GetInfo = func_type(ctypes.c_bool, ctypes.POINTER(BASS_INFO))(('BASS_GetInfo', bass_module))
-
-BASS_GetDevice = func_type(ctypes.c_ulong)(('BASS_GetDevice', bass_module))
-BASS_SetDevice = func_type(ctypes.c_bool, ctypes.c_ulong)(('BASS_SetDevice', bass_module))
-
-BASS_GetDeviceInfo = func_type(ctypes.c_bool, ctypes.c_ulong, ctypes.POINTER(BASS_DEVICEINFO))(('BASS_GetDeviceInfo', bass_module))
-
-#Channel set attribute
-BASS_ChannelSetAttribute = func_type(ctypes.c_bool, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_float)(('BASS_ChannelSetAttribute',bass_module))
-
-# Master play controls
-BASS_Pause =  func_type(ctypes.c_bool)(("BASS_Pause", bass_module))
-BASS_Start = func_type(ctypes.c_bool)(("BASS_Start", bass_module))
-BASS_Stop = func_type(ctypes.c_bool)(("BASS_Stop", bass_module))
 
+def __getattr__(name):
+    """
+        The BASS_xxx prototypes used to be built here at import time, they now resolve lazily through
+        bindings.bass.   Kept so `from pybass3.bass_module import BASS_Init, bass_module` still works.
+    """
+    if name == "bass_module":
+        return bass.dll
+    if name.startswith("BASS_"):
+        try:
+            return getattr(bass, name)
+        except AttributeError:
+            pass
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @dataclasses.dataclass
@@ -102,10 +61,12 @@ class BassMissingDevice(Exception):
 class Bass:
     LIB_INITED = False
     LAST_ERROR = None
+    _EXIT_HOOKED = False
+    _INIT_LOCK = threading.RLock() # Songs can open their first stream on several threads at once
 
     @classmethod
     def GetError(cls) -> BassError:
-        code = BASS_ErrorGetCode()
+        code = bass.BASS_ErrorGetCode()
         return BassError(code, get_description(code))
 
     @classmethod
@@ -151,20 +112,52 @@ class Bass:
         if cls.LIB_INITED is True:
             return True
 
-        code = BASS_Init(device, freq, flags, win, clsid)
-        if code == errors.OK:
-            cls.LIB_INITED = True
+        with cls._INIT_LOCK:
+            if cls.LIB_INITED is True:
+                return True
 
-            if enable_ogg_prescan:
-                retval = Bass.SetConfig(config.OGG_PRESCAN, True)
-                if retval != errors.OK:
-                    # raise BassError
-                    pass
+            retval = bass.BASS_Init(device, freq, flags, win, clsid)
+            if retval is True or cls.GetError().code == errors.ERROR_ALREADY:
+                cls.LIB_INITED = True
+                if cls._EXIT_HOOKED is False:
+                    # Streams still open at interpreter teardown would call sync procs that no longer exist
+                    atexit.register(cls._free_at_exit)
+                    cls._EXIT_HOOKED = True
 
+                if enable_ogg_prescan:
+                    retval = Bass.SetConfig(config.OGG_PRESCAN, True)
+                    if retval != errors.OK:
+                        # raise BassError
+                        pass
+
+                return True
+
+            cls.RaiseError()
+            return False
+
+    @classmethod
+    def InitForDecoding(cls, freq: int = 44100) -> bool:
+        """
+            Decoding channels don't need a sound card.   Tries the default output device and falls
+            back to the "no sound" device (0) so headless machines can still decode.
+
+        Returns:
+            True once the library is usable for decoding channels
+        """
+        if cls.LIB_INITED is True:
             return True
 
-        cls.RaiseError()
-        return False
+        try:
+            return cls.Init(freq=freq)
+        except BassException:
+            log.debug("No usable output device, falling back to the no sound device")
+            return cls.Init(device=0, freq=freq)
+
+    @classmethod
+    def _free_at_exit(cls):
+        if cls.LIB_INITED is True:
+            bass.BASS_Free()
+            cls.LIB_INITED = False
 
     @classmethod
     def Free(cls):
@@ -172,7 +165,7 @@ class Bass:
             Closes down the BASS library
         :return:
         """
-        retval = BASS_Free()
+        retval = bass.BASS_Free()
         if retval is not True:
             cls.RaiseError()
 
@@ -188,11 +181,11 @@ class Bass:
 
 
         """
-        return BASS_GetCPU()
+        return bass.BASS_GetCPU()
 
     @classmethod
     def GetVolumeLevel(cls) -> float:
-        return BASS_GetVolume()
+        return bass.BASS_GetVolume()
 
     @classmethod
     def SetVolumeLevel(cls, level: float):
@@ -204,7 +197,7 @@ class Bass:
         Returns:
 
         """
-        BASS_SetVolume(level)
+        bass.BASS_SetVolume(level)
 
     @classmethod
     def GetVolumePerc(cls):
@@ -229,7 +222,7 @@ class Bass:
         Returns:
 
         """
-        BASS_ChannelSetAttribute(handle,BASS_ATTRIB_VOL,level)
+        bass.BASS_ChannelSetAttribute(handle, BASS_ATTRIB_VOL, level)
 
     @classmethod
     def VolumeToLogVolume(cls, level):
@@ -255,11 +248,11 @@ class Bass:
 
     @classmethod
     def SetConfig(cls, config_flag, value):
-        return BASS_SetConfig(config_flag, value)
+        return bass.BASS_SetConfig(config_flag, value)
 
     @classmethod
     def GetConfig(cls, config_flag):
-        return BASS_GetConfig(config_flag)
+        return bass.BASS_GetConfig(config_flag)
 
     @classmethod
     def EnableOggPrescan(cls):
@@ -271,7 +264,7 @@ class Bass:
 
     @classmethod
     def GetVersion(cls):
-        return BASS_GetVersion()
+        return bass.BASS_GetVersion()
 
     @classmethod
     def GetLibInfo(cls) -> BASS_INFO:
@@ -282,19 +275,19 @@ class Bass:
 
         """
         bi = BASS_INFO()
-        retval = BASS_GetInfo(bi)
+        retval = bass.BASS_GetInfo(bi)
         if retval is not True:
             cls.RaiseError()
 
         return bi
 
     @classmethod
-    def GetCurrentDeviceID(cls) -> ctypes.c_ulong:
-        return BASS_GetDevice()
+    def GetCurrentDeviceID(cls) -> int:
+        return bass.BASS_GetDevice()
 
     @classmethod
     def SetCurrentDevice(cls, device_id):
-        retval = BASS_SetDevice(device_id)
+        retval = bass.BASS_SetDevice(device_id)
         if retval is not True:
             raise BassMissingDevice(device_id)
 
@@ -313,7 +306,7 @@ class Bass:
             device_id = cls.GetCurrentDeviceID()
 
         bd = BASS_DEVICEINFO()
-        retval = BASS_GetDeviceInfo(device_id, bd)
+        retval = bass.BASS_GetDeviceInfo(device_id, bd)
         if retval is not True:
             cls.RaiseError()
 
@@ -327,7 +320,7 @@ class Bass:
         :return:
         """
 
-        return BASS_Pause()
+        return bass.BASS_Pause()
 
     @classmethod
     def Start(cls) -> bool:
@@ -336,7 +329,7 @@ class Bass:
 
         :return:
         """
-        return BASS_Start()
+        return bass.BASS_Start()
 
     @classmethod
     def Stop(cls) -> bool:
@@ -345,7 +338,7 @@ class Bass:
 
         :return:
         """
-        return BASS_Stop()
+        return bass.BASS_Stop()
 
 
 
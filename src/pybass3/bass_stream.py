@@ -1,29 +1,35 @@
 import ctypes
 
-from .bass_module import bass_module, Bass
-from .bass_module import func_type
-from .datatypes import QWORD, HSTREAM, HANDLE
+from .bindings import bass
+from .bass_module import Bass
+from .datatypes import func_type, HANDLE, HSTREAM, DWORD
+from .codes import stream
+from .buffers import PinnedBuffer
+# Re-exported, the user file stream callbacks used to be defined here
+from .structs.stream import BASS_FILEPROCS, FILECLOSEPROC, FILELENPROC, FILEREADPROC, FILESEEKPROC
 
-BASS_StreamCreateFile = func_type(
-    HSTREAM,
-    ctypes.c_bool,
-    ctypes.c_void_p,
-    QWORD,
-    QWORD,
-    ctypes.c_ulong)(('BASS_StreamCreateFile', bass_module))
+__all__ = ["BassStream", "STREAMPROC",
+           "BASS_FILEPROCS", "FILECLOSEPROC", "FILELENPROC", "FILEREADPROC", "FILESEEKPROC"]
 
-BASS_StreamFree = func_type(
-    ctypes.c_bool,
-    HSTREAM)(('BASS_StreamFree', bass_module))
+# DWORD CALLBACK STREAMPROC(HSTREAM handle, void *buffer, DWORD length, void *user)
+STREAMPROC = func_type(DWORD, HSTREAM, ctypes.c_void_p, DWORD, ctypes.c_void_p)
 
-BASS_StreamGetFilePosition = func_type(
-    QWORD,
-    HSTREAM,
-    ctypes.c_ulong)(('BASS_StreamGetFilePosition', bass_module))
+
+def __getattr__(name):
+    # Backwards compatibility for the BASS_Streamxxx prototypes that used to be defined here
+    if name.startswith("BASS_Stream"):
+        try:
+            return getattr(bass, name)
+        except AttributeError:
+            pass
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class BassStream:
 
+    # stream handle -> object with a release() method (PinnedBuffer, FileProcs) that must outlive the stream
+    RESOURCES = {}
+
     @classmethod
     def CreateFile(cls, mem, file, offset=0, length=0, flags=0):
         """
@@ -38,13 +44,152 @@ class BassStream:
         Returns:
 
         """
-        handle = BASS_StreamCreateFile(mem, file, offset, length, flags)
+        handle = bass.BASS_StreamCreateFile(mem, file, offset, length, flags)
 
         if handle == 0:
             Bass.RaiseError(f"file={file!r}")
 
         return handle
 
+    @classmethod
+    def CreateFromMemory(cls, buffer, offset=0, length=0, flags=0):
+        """
+            Zero copy memory stream from any contiguous buffer-protocol object; bytes, bytearray, memoryview,
+             mmap.mmap, numpy arrays.   The buffer is pinned until the stream is released with `Free` so
+             bytearrays can't be resized and mmaps can't be closed underneath BASS.
+
+        Args:
+            buffer: The complete encoded file (mp3, ogg, etc) in memory
+            offset: Where in the buffer the file starts
+            length: Data length, 0 = everything after offset
+            flags: codes.stream flags
+
+        Returns:
+            Stream handle
+        """
+        pinned = PinnedBuffer(buffer)
+        if length == 0:
+            length = pinned.nbytes - offset
+
+        if offset < 0 or length < 0 or offset + length > pinned.nbytes:
+            pinned.release()
+            raise ValueError(f"{offset=} {length=} is outside of a {pinned.nbytes} byte buffer")
+
+        handle = bass.BASS_StreamCreateFile(True, pinned.address + offset, 0, length, flags)
+        if handle == 0:
+            pinned.release()
+            Bass.RaiseError(f"memory buffer {type(buffer).__name__} of {length} bytes")
+
+        cls.RESOURCES[handle] = pinned
+        return handle
+
+    @classmethod
+    def CreateFileUser(cls, procs, system=None, flags=0):
+        """
+            Stream from Python code instead of a file path, see readers.FileProcs for the adapter
+            that turns a file-like object into BASS file callbacks.
+
+        Args:
+            procs: readers.FileProcs (or anything with a `.procs` BASS_FILEPROCS struct and a `release()` method)
+            system: codes.stream STREAMFILE_xxx, defaults to what `procs` recommends
+            flags: codes.stream flags
+
+        Returns:
+            Stream handle
+        """
+        if system is None:
+            system = procs.system
+
+        handle = bass.BASS_StreamCreateFileUser(system, flags, procs.procs, None)
+        if handle == 0:
+            procs.release()
+            Bass.RaiseError(f"file user stream {procs!r}")
+
+        cls.RESOURCES[handle] = procs
+        return handle
+
+    @classmethod
+    def Create(cls, freq: int, chans: int, proc: STREAMPROC, flags: int = 0, user: int = None, resource=None):
+        """
+            A stream whose sample data comes from `proc`, see mixer.Mixer.
+
+        Args:
+            freq: Sample rate
+            chans: Channel count
+            proc: A STREAMPROC instance, it must be kept alive for as long as the stream exists
+            flags: codes.stream flags, eg SAMPLE_FLOAT
+            user: Passed back to `proc`
+            resource: Object with a release() method kept until the stream is released with `Free`, normally
+                whatever owns `proc`
+
+        Returns:
+            Stream handle
+        """
+        handle = bass.BASS_StreamCreate(freq, chans, flags, proc, user)
+        if handle == 0:
+            Bass.RaiseError(f"{freq=} {chans=} {flags=}")
+
+        if resource is not None:
+            cls.RESOURCES[handle] = resource
+        return handle
+
+    @classmethod
+    def CreatePush(cls, freq: int, chans: int, flags: int = 0):
+        """
+            A stream fed with `PutData` instead of a callback, see push_stream.PushStream.
+
+        Returns:
+            Stream handle
+        """
+        handle = bass.BASS_StreamCreate(freq, chans, flags, ctypes.c_void_p(stream.STREAMPROC_PUSH), None)
+        if handle == 0:
+            Bass.RaiseError(f"push stream {freq=} {chans=} {flags=}")
+
+        return handle
+
+    @classmethod
+    def PutData(cls, handle: HANDLE, address: int, length: int) -> int:
+        """
+            Queue sample data on a push stream, BASS copies it before returning.
+
+        Args:
+            handle: From CreatePush
+            address: Memory address of the data, None to only query
+            length: Bytes at `address`, 0 to query, or'd with codes.stream.STREAMPROC_END to end the stream
+
+        Returns:
+            Bytes queued and not played yet, codes.data.DW_ERROR on failure
+        """
+        return bass.BASS_StreamPutData(handle, address, length)
+
     @classmethod
     def Free(cls, handle: HANDLE):
-        return BASS_StreamFree(handle)
\ No newline at end of file
+        retval = bass.BASS_StreamFree(handle)
+        resource = cls.RESOURCES.pop(handle, None)
+        if resource is not None:
+            resource.release()
+
+        return retval
+
+    @classmethod
+    def CreateDecodeFile(cls, file, float_samples=False, prescan=False, flags=0):
+        """
+            Opens a decoding channel, it can't be played but BASS_ChannelGetData can pull sample
+             data from it as fast as the CPU allows.   Works with the "no sound" device.
+
+        Args:
+            file: Filename (as bytes)
+            float_samples: Decode to 32 bit floating point samples instead of 16 bit integers
+            prescan: Scan the whole file for exact length and seeking (MP3/MP2/MP1)
+            flags: Any additional codes.stream flags
+
+        Returns:
+            Stream handle
+        """
+        flags |= stream.STREAM_DECODE
+        if float_samples is True:
+            flags |= stream.SAMPLE_FLOAT
+        if prescan is True:
+            flags |= stream.STREAM_PRESCAN
+
+        return cls.CreateFile(False, file, flags=flags)
@@ -0,0 +1,136 @@
+"""
+    Lazy BASS bindings
+
+    The whole BASS API from vendor/bass.h (see _bass_api.py and tools/generate_bindings.py) without
+    paying for it at import time.   Neither the shared library nor any function is touched until it is
+    first used; the first access to `bass.BASS_Xxx` looks the symbol up, sets its argtypes/restype
+    and caches the function on the instance so later calls are a plain attribute lookup.
+
+    Usage::
+
+        from pybass3.bindings import bass
+        version = bass.BASS_GetVersion()
+"""
+from pathlib import Path
+import ctypes
+import platform
+
+from . import datatypes
+from ._bass_api import PROTOTYPES
+from .structs.info import BASS_INFO, BASS_DEVICEINFO
+from .structs.channel import BASS_CHANNELINFO
+from .structs.stream import BASS_FILEPROCS
+
+HERE = Path(__file__).parent
+
+# C type name -> ctypes type for arguments
+TYPES = {
+    "void": None,
+    "BOOL": datatypes.BOOL,
+    "BYTE": datatypes.BYTE,
+    "WORD": datatypes.WORD,
+    "DWORD": datatypes.DWORD,
+    "QWORD": datatypes.QWORD,
+    "int": ctypes.c_int,
+    "float": ctypes.c_float,
+    "double": ctypes.c_double,
+    "char*": ctypes.c_char_p,
+    "HMUSIC": datatypes.HMUSIC,
+    "HSAMPLE": datatypes.HSAMPLE,
+    "HCHANNEL": datatypes.HCHANNEL,
+    "HSTREAM": datatypes.HSTREAM,
+    "HRECORD": datatypes.HRECORD,
+    "HSYNC": datatypes.HSYNC,
+    "HDSP": datatypes.HDSP,
+    "HFX": datatypes.HFX,
+    "HPLUGIN": datatypes.HPLUGIN,
+    "HWND": ctypes.c_void_p,
+}
+
+# Return types that differ from the argument mapping
+RESTYPES = {
+    # Existing callers test `retval is True`, BASS only ever returns 0 or 1
+    "BOOL": ctypes.c_bool,
+}
+
+STRUCTS = {
+    "BASS_INFO": BASS_INFO,
+    "BASS_DEVICEINFO": BASS_DEVICEINFO,
+    "BASS_CHANNELINFO": BASS_CHANNELINFO,
+    "BASS_FILEPROCS": BASS_FILEPROCS,
+}
+
+# Per function return type overrides
+OVERRIDES = {
+    # Tag data is often a series of null-terminated strings, c_char_p would only give the first
+    "BASS_ChannelGetTags": ctypes.c_void_p,
+}
+
+
+def ctype_of(c_type: str, restype: bool = False):
+    """
+        Map a normalized C type name from _bass_api to a ctypes type.   Known structs become POINTERs
+        so instances can be passed directly, callbacks and everything else opaque become c_void_p.
+    """
+    if restype is True and c_type in RESTYPES:
+        return RESTYPES[c_type]
+
+    if c_type in TYPES:
+        return TYPES[c_type]
+
+    if c_type.endswith("*"):
+        base = c_type[:-1]
+        if base in STRUCTS:
+            return ctypes.POINTER(STRUCTS[base])
+        if base in TYPES and TYPES[base] is not None and base != "BOOL":
+            return ctypes.POINTER(TYPES[base])
+
+    return ctypes.c_void_p
+
+
+def load_library():
+    if platform.system().lower() == "windows":
+        return ctypes.WinDLL((HERE / "vendor" / "bass").as_posix())
+
+    return ctypes.CDLL((HERE / "vendor" / "libbass.so").as_posix(), mode=ctypes.RTLD_GLOBAL)
+
+
+class LazyLibrary:
+    """
+        Resolves and caches BASS functions on first access.
+    """
+
+    def __init__(self, loader=load_library, prototypes: dict = PROTOTYPES):
+        self._loader = loader
+        self._prototypes = prototypes
+        self._dll = None
+
+    @property
+    def dll(self):
+        if self._dll is None:
+            self._dll = self._loader()
+        return self._dll
+
+    @property
+    def loaded(self) -> bool:
+        return self._dll is not None
+
+    def __dir__(self):
+        return list(self._prototypes) + list(super(LazyLibrary, self).__dir__())
+
+    def __getattr__(self, name):
+        # Only called when `name` hasn't been resolved yet
+        try:
+            restype, argtypes = self._prototypes[name]
+        except KeyError:
+            raise AttributeError(f"BASS has no function {name}") from None
+
+        function = getattr(self.dll, name)
+        function.restype = OVERRIDES.get(name) or ctype_of(restype, restype=True)
+        function.argtypes = [ctype_of(arg) for arg in argtypes]
+
+        self.__dict__[name] = function
+        return function
+
+
+bass = LazyLibrary()
@@ -0,0 +1,85 @@
+"""
+    Buffer pinning
+
+    BASS keeps reading from a memory stream's buffer for as long as the stream exists, so the
+    Python object behind it must neither be freed, resized nor closed until the stream is.
+    Holding a buffer-protocol export does exactly that: bytearrays refuse to resize and mmaps refuse to close
+    while it is held, and it works the same for read-only objects like bytes.
+"""
+import ctypes
+
+
+PyBUF_SIMPLE = 0  # contiguous bytes, no format/shape information needed
+
+
+class Py_buffer(ctypes.Structure):
+    _fields_ = [('buf', ctypes.c_void_p),
+                ('obj', ctypes.c_void_p),  # owned reference, released by PyBuffer_Release
+                ('len', ctypes.c_ssize_t),
+                ('itemsize', ctypes.c_ssize_t),
+                ('readonly', ctypes.c_int),
+                ('ndim', ctypes.c_int),
+                ('format', ctypes.c_char_p),
+                ('shape', ctypes.POINTER(ctypes.c_ssize_t)),
+                ('strides', ctypes.POINTER(ctypes.c_ssize_t)),
+                ('suboffsets', ctypes.POINTER(ctypes.c_ssize_t)),
+                ('internal', ctypes.c_void_p)
+                ]
+
+
+PyObject_GetBuffer = ctypes.pythonapi.PyObject_GetBuffer
+PyObject_GetBuffer.argtypes = [ctypes.py_object, ctypes.POINTER(Py_buffer), ctypes.c_int]
+PyObject_GetBuffer.restype = ctypes.c_int
+
+PyBuffer_Release = ctypes.pythonapi.PyBuffer_Release
+PyBuffer_Release.argtypes = [ctypes.POINTER(Py_buffer)]
+PyBuffer_Release.restype = None
+
+
+class PinnedBuffer:
+    """
+        Zero copy access to the memory behind any contiguous buffer-protocol object
+        (bytes, bytearray, memoryview, mmap.mmap, array.array, numpy arrays...).
+
+        The memory stays valid at `address` until `release` is called.
+    """
+
+    address: int
+    nbytes: int
+    readonly: bool
+
+    def __init__(self, obj):
+        """
+
+        Args:
+            obj: A contiguous buffer-protocol object
+
+        Raises:
+            TypeError/BufferError if `obj` doesn't expose a contiguous buffer
+        """
+        self.obj = obj
+        self._view = Py_buffer()
+        PyObject_GetBuffer(obj, ctypes.byref(self._view), PyBUF_SIMPLE)
+        self._held = True
+
+        self.address = self._view.buf or 0
+        self.nbytes = self._view.len
+        self.readonly = bool(self._view.readonly)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def __del__(self):
+        self.release()
+
+    def __len__(self):
+        return self.nbytes
+
+    def release(self) -> None:
+        if getattr(self, "_held", False) is True:
+            self._held = False
+            PyBuffer_Release(ctypes.byref(self._view))
+            self.obj = None
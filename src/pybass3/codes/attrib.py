@@ -0,0 +1,18 @@
+# BASS_ChannelSetAttribute/GetAttribute/SlideAttribute attributes
+ATTRIB_FREQ = 1
+ATTRIB_VOL = 2
+ATTRIB_PAN = 3
+ATTRIB_EAXMIX = 4
+ATTRIB_NOBUFFER = 5
+ATTRIB_VBR = 6
+ATTRIB_CPU = 7
+ATTRIB_SRC = 8
+ATTRIB_NET_RESUME = 9
+ATTRIB_SCANINFO = 10
+ATTRIB_NORAMP = 11
+ATTRIB_BITRATE = 12
+ATTRIB_BUFFER = 13
+ATTRIB_GRANULE = 14
+
+# BASS_ChannelSlideAttribute flags
+SLIDE_LOG = 0x1000000  # flag: slide logarithmically, only valid with ATTRIB_VOL/ATTRIB_MUSIC_VOL_xxx
@@ -0,0 +1,26 @@
+# BASS_ChannelGetData flags
+DATA_AVAILABLE = 0  # query how much data is buffered
+DATA_FIXED = 0x20000000  # flag: return 8.24 fixed-point data
+DATA_FLOAT = 0x40000000  # flag: return floating-point sample data
+DATA_FFT256 = 0x80000000  # 256 sample FFT
+DATA_FFT512 = 0x80000001  # 512 FFT
+DATA_FFT1024 = 0x80000002  # 1024 FFT
+DATA_FFT2048 = 0x80000003  # 2048 FFT
+DATA_FFT4096 = 0x80000004  # 4096 FFT
+DATA_FFT8192 = 0x80000005  # 8192 FFT
+DATA_FFT16384 = 0x80000006  # 16384 FFT
+DATA_FFT32768 = 0x80000007  # 32768 FFT
+DATA_FFT_INDIVIDUAL = 0x10  # FFT flag: FFT for each channel, else all combined
+DATA_FFT_NOWINDOW = 0x20  # FFT flag: no Hanning window
+DATA_FFT_REMOVEDC = 0x40  # FFT flag: pre-remove DC bias
+DATA_FFT_COMPLEX = 0x80  # FFT flag: return complex data
+DATA_FFT_NYQUIST = 0x100  # FFT flag: return extra Nyquist value
+
+# BASS_ChannelGetLevelEx flags
+LEVEL_MONO = 1  # get a mono level
+LEVEL_STEREO = 2  # get a stereo level
+LEVEL_RMS = 4  # get the RMS level instead of the peak
+LEVEL_VOLPAN = 8  # apply VOL/PAN attributes to the level
+
+# Returned by BASS_ChannelGetData and other DWORD functions on error
+DW_ERROR = 0xFFFFFFFF
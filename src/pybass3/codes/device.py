@@ -0,0 +1,39 @@
+# BASS_Init flags
+DEVICE_8BITS = 1  # 8 bit
+DEVICE_MONO = 2  # mono
+DEVICE_3D = 4  # enable 3D functionality
+DEVICE_16BITS = 8  # limit output to 16 bit
+DEVICE_LATENCY = 0x100  # calculate device latency (BASS_INFO struct)
+DEVICE_CPSPEAKERS = 0x400  # detect speakers via Windows control panel
+DEVICE_SPEAKERS = 0x800  # force enabling of speaker assignment
+DEVICE_NOSPEAKER = 0x1000  # ignore speaker arrangement
+DEVICE_DMIX = 0x2000  # use ALSA "dmix" plugin
+DEVICE_FREQ = 0x4000  # set device sample rate
+DEVICE_STEREO = 0x8000  # limit output to stereo
+DEVICE_HOG = 0x10000  # hog/exclusive mode
+DEVICE_AUDIOTRACK = 0x20000  # use AudioTrack output
+DEVICE_DSOUND = 0x40000  # use DirectSound output
+
+# Special device numbers
+DEVICE_DEFAULT_ID = -1  # the default output device
+DEVICE_NOSOUND = 0  # "no sound", channels play silently, useful for tests and decoding
+NODEVICE = 0x20000  # BASS_ChannelSetDevice: detach a channel from any device
+
+# BASS_DEVICEINFO flags
+DEVICE_ENABLED = 1
+DEVICE_DEFAULT = 2
+DEVICE_INIT = 4
+DEVICE_LOOPBACK = 8
+
+DEVICE_TYPE_MASK = 0xff000000
+DEVICE_TYPE_NETWORK = 0x01000000
+DEVICE_TYPE_SPEAKERS = 0x02000000
+DEVICE_TYPE_LINE = 0x03000000
+DEVICE_TYPE_HEADPHONES = 0x04000000
+DEVICE_TYPE_MICROPHONE = 0x05000000
+DEVICE_TYPE_HEADSET = 0x06000000
+DEVICE_TYPE_HANDSET = 0x07000000
+DEVICE_TYPE_DIGITAL = 0x08000000
+DEVICE_TYPE_SPDIF = 0x09000000
+DEVICE_TYPE_HDMI = 0x0a000000
+DEVICE_TYPE_DISPLAYPORT = 0x40000000
@@ -69,7 +69,7 @@ error_descriptions[ERROR_CODEC] = 'codec is not available/supported'
 ERROR_ENDED = 45
 error_descriptions[ERROR_ENDED] = 'the channel/file has ended'
 ERROR_BUSY = 46
-error_descriptions[ERROR_ENDED] = 'the device is busy'
+error_descriptions[ERROR_BUSY] = 'the device is busy'
 ERROR_UNKNOWN = -1
 error_descriptions[ERROR_UNKNOWN] = 'some other mystery problem'
 
@@ -0,0 +1,18 @@
+# BASS_ChannelSetFX effect types
+FX_DX8_CHORUS = 0
+FX_DX8_COMPRESSOR = 1
+FX_DX8_DISTORTION = 2
+FX_DX8_ECHO = 3
+FX_DX8_FLANGER = 4
+FX_DX8_GARGLE = 5
+FX_DX8_I3DL2REVERB = 6
+FX_DX8_PARAMEQ = 7
+FX_DX8_REVERB = 8
+FX_VOLUME = 9
+
+# BASS_DX8_CHORUS/FLANGER lPhase
+DX8_PHASE_NEG_180 = 0
+DX8_PHASE_NEG_90 = 1
+DX8_PHASE_ZERO = 2
+DX8_PHASE_90 = 3
+DX8_PHASE_180 = 4
@@ -0,0 +1,31 @@
+# BASS_SAMPLE_xxx flags shared by samples, streams and musics
+SAMPLE_8BITS = 1  # 8 bit
+SAMPLE_FLOAT = 256  # 32 bit floating-point
+SAMPLE_MONO = 2  # mono
+SAMPLE_LOOP = 4  # looped
+SAMPLE_3D = 8  # 3D functionality
+SAMPLE_SOFTWARE = 16  # not using hardware mixing
+
+# BASS_StreamCreate/File/User/URL flags
+STREAM_PRESCAN = 0x20000  # enable pin-point seeking/length (MP3/MP2/MP1)
+STREAM_AUTOFREE = 0x40000  # automatically free the stream when it stop/ends
+STREAM_RESTRATE = 0x80000  # restrict the download rate of internet file streams
+STREAM_BLOCK = 0x100000  # download/play internet file stream in small blocks
+STREAM_DECODE = 0x200000  # don't play the stream, only decode (BASS_ChannelGetData)
+STREAM_STATUS = 0x800000  # give server status info (HTTP/ICY tags) in DOWNLOADPROC
+
+UNICODE = 0x80000000  # file name is UTF-16 (Windows) / UTF-8
+
+# STREAMPROC return flag, also passed to BASS_StreamPutData to end a push stream
+STREAMPROC_END = 0x80000000  # end of user stream flag
+
+# Special STREAMPROCs for BASS_StreamCreate
+STREAMPROC_DUMMY = 0  # "dummy" stream
+STREAMPROC_PUSH = -1  # push stream
+STREAMPROC_DEVICE = -2  # device mix stream
+STREAMPROC_DEVICE_3D = -3  # device 3D mix stream
+
+# BASS_StreamCreateFileUser file systems
+STREAMFILE_NOBUFFER = 0  # BASS reads from the file as it needs data, the file must be seekable for most formats
+STREAMFILE_BUFFER = 1  # BASS reads ahead into its own buffer on a background thread, suits unseekable sources
+STREAMFILE_BUFFERPUSH = 2  # Like BUFFER but the data is pushed with BASS_StreamPutFileData
@@ -0,0 +1,18 @@
+# BASS_ChannelSetSync types
+SYNC_POS = 0  # position reached, param = position in bytes
+SYNC_END = 2  # end of the channel (or loop point)
+SYNC_META = 4  # metadata received
+SYNC_SLIDE = 5  # attribute slide completed
+SYNC_STALL = 6  # playback stalled/resumed
+SYNC_DOWNLOAD = 7  # download of internet file stream completed
+SYNC_FREE = 8  # channel freed
+SYNC_MUSICPOS = 10
+SYNC_SETPOS = 11  # position changed
+SYNC_OGG_CHANGE = 12  # new logical bitstream in a chained OGG stream
+SYNC_DEV_FAIL = 14  # output device failure
+SYNC_DEV_FORMAT = 15  # output device format changed
+
+# BASS_ChannelSetSync flags
+SYNC_THREAD = 0x20000000  # flag: call sync in other thread
+SYNC_MIXTIME = 0x40000000  # flag: sync at mixtime, else at playtime
+SYNC_ONETIME = 0x80000000  # flag: sync only once, else continuously
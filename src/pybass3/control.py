@@ -0,0 +1,295 @@
+"""
+    Playlist control thread
+
+    Playlist and Song aren't thread safe: `queue_position`, the current and fading in songs and every stream
+    handle are changed by whichever thread calls in (a Qt timer, a curses loop, API worker threads) and
+    `Song.__del__` frees streams on whichever thread drops the last reference.   `PlaylistController` gives a
+    playlist a single owner thread:
+
+    * every call from another thread is queued as a command and answered with a `concurrent.futures.Future`
+    * BASS sync callbacks are posted to the same queue, so track changes are ordered with the commands.   The
+      playlist's mixtime and direct end syncs are the only ones run on BASS's threads; they never change the
+      playlist, they only read it and restart or start streams that are already open (see
+      `Playlist._on_end_mixtime` and `Playlist._on_end_heard`), then the posted end sync does the bookkeeping
+    * streams of songs collected on other threads are handed back to it to be freed (see `BaseSong.reaper`)
+
+    Readers never wait for it.   After every command, and every `refresh` seconds while idle, the thread
+    publishes a new immutable `PlaylistSnapshot`; reading `controller.snapshot` is a plain attribute read.
+
+    Usage::
+
+        controller = PlaylistController()
+        controller.add_directory(Path("/music")).result()
+        controller.play()
+        print(controller.snapshot.current_id, controller.snapshot.position)
+"""
+from concurrent.futures import Future
+import dataclasses
+import logging
+from pathlib import Path
+import queue
+import threading
+import typing as T
+
+from .playlist import Playlist, PlaylistState, PlaylistMode
+from .scanner import ProgressCallback
+from .song import BaseSong
+from .sync import SyncDispatcher
+
+log = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class PlaylistSnapshot:
+    version: int  # Increases with every snapshot published
+    state: PlaylistState
+    mode: PlaylistMode
+    play_mode: PlaylistMode
+    queue_position: int
+    queue_length: int
+    track_count: int
+    current_id: T.Any  # None when nothing is playing
+    fadein_id: T.Any  # Song fading in, None otherwise
+    position: float  # Seconds into the current song
+    duration: float  # Seconds, 0 when nothing is playing
+
+
+class ControllerClosed(RuntimeError):
+    pass
+
+
+class PlaylistController:
+    """
+        Owns a Playlist and runs every call on it from one thread.
+    """
+
+    def __init__(self, playlist: Playlist = None, refresh: float = 0.25, reap: bool = True, **playlist_kwargs):
+        """
+
+        Args:
+            playlist: Playlist to own, a new one is made from `playlist_kwargs` if None.  It must not be used
+                directly from other threads afterwards.
+            refresh: Seconds between snapshots while no commands come in, keeps `position` moving
+            reap: Free the streams of songs collected on other threads on this controller's thread.  Only one
+                controller can do so, the first one created gets the job.
+        """
+        self.playlist = playlist if playlist is not None else Playlist(**playlist_kwargs)
+        self.refresh = refresh
+
+        self._commands = queue.SimpleQueue()
+        self._closed = False
+        self._version = 0
+        self._snapshot = None
+
+        self._thread = threading.Thread(target=self._loop, name="pybass3-control", daemon=True)
+        self._reaping = reap is True and BaseSong.reaper is None
+        if self._reaping is True:
+            BaseSong.reaper = self.free_handle
+
+        self.dispatcher = SyncDispatcher(post=self._post)
+        self._thread.start()
+        self.call(self.playlist.use_sync_events, self.dispatcher)
+
+    def __enter__(self) -> "PlaylistController":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def snapshot(self) -> PlaylistSnapshot:
+        """
+            The latest published state, never blocks
+        """
+        return self._snapshot
+
+    @property
+    def on_control_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def _post(self, job: T.Callable[[], None]):
+        # BASS threads and the reaper, nobody waits for the result
+        self._commands.put((job, (), None))
+
+    def submit(self, function: T.Callable, *args) -> Future:
+        """
+            Queue `function(*args)` to run on the control thread, eg `controller.submit(playlist.loop_queue)`.
+            Called from the control thread itself (eg inside another command) it runs right away.
+
+        Returns:
+            Future for its result
+
+        Raises:
+            ControllerClosed
+        """
+        future = Future()
+        if self.on_control_thread is True:
+            self._execute(function, args, future)
+            return future
+
+        if self._closed is True:
+            raise ControllerClosed("The controller has been closed")
+
+        self._commands.put((function, args, future))
+        return future
+
+    def call(self, function: T.Callable, *args, timeout: float = None):
+        """
+            Like `submit` but waits for and returns the result, re-raising whatever the command raised
+        """
+        return self.submit(function, *args).result(timeout)
+
+    def free_handle(self, handle: int) -> None:
+        """
+            BaseSong.reaper, frees a stream handle on the control thread
+        """
+        if self.on_control_thread is True or self._closed is True:
+            self._execute(BaseSong.free_handle, (handle,), None)
+        else:
+            self._commands.put((BaseSong.free_handle, (handle,), None))
+
+    @staticmethod
+    def _execute(function, args, future):
+        if future is not None and future.set_running_or_notify_cancel() is False:
+            return
+
+        try:
+            result = function(*args)
+        except BaseException as exc:
+            if future is None:
+                log.exception("Control command %r failed", function)
+            else:
+                future.set_exception(exc)
+        else:
+            if future is not None:
+                future.set_result(result)
+
+    def _loop(self):
+        self._publish()
+        while True:
+            try:
+                command = self._commands.get(timeout=self.refresh)
+            except queue.Empty:
+                self._publish()
+                continue
+
+            if command is None:
+                break
+
+            self._execute(*command)
+            self._publish()
+
+    def _publish(self):
+        playlist = self.playlist
+        current = playlist.current
+        fadein = playlist.fadein_song
+
+        position = duration = 0.0
+        if current is not None and current._handle is not None:
+            try:
+                position = current.position
+                duration = current.duration
+            except Exception:
+                log.exception("Couldn't read the position of %r", current)
+
+        self._version += 1
+        # Swapping the reference is atomic, readers get either the old snapshot or the new one
+        self._snapshot = PlaylistSnapshot(
+            version=self._version,
+            state=playlist.state,
+            mode=playlist.mode,
+            play_mode=playlist.play_mode,
+            queue_position=playlist.queue_position,
+            queue_length=len(playlist.queue),
+            track_count=len(playlist),
+            current_id=None if current is None else current.id,
+            fadein_id=None if fadein is None else fadein.id,
+            position=position,
+            duration=duration,
+        )
+
+    def close(self, timeout: float = None) -> None:
+        """
+            Free the playlist and stop the thread, commands already queued run first
+        """
+        if self._closed is True:
+            return
+
+        self.submit(self.playlist.free)
+        self._closed = True
+        self._commands.put(None)
+        if self.on_control_thread is False:
+            self._thread.join(timeout)
+
+        if self._reaping is True and BaseSong.reaper == self.free_handle:
+            BaseSong.reaper = None
+
+    # Playlist commands, each returns a Future
+
+    def add_song(self, song_path: Path, add2queue=True, duration: float = None) -> Future:
+        return self.submit(self.playlist.add_song, song_path, add2queue, duration)
+
+    def add_directory(self, dir_path: Path, recurse=True, workers: int = None,
+                      progress: ProgressCallback = None) -> Future:
+        """
+            Scan on a thread of its own and add the results on the control thread in batches, so commands and
+            syncs keep running while a large library is scanned.
+
+        Returns:
+            Future for the track ids added
+        """
+        scanner = self.playlist.make_scanner(workers, progress)
+        future = Future()
+
+        def scan():
+            if future.set_running_or_notify_cancel() is False:
+                return
+
+            try:
+                pending = [self.submit(self.playlist.add_scan_results, batch)
+                           for batch in scanner.scan_batches(dir_path, recurse)]
+                track_ids = [track_id for added in pending for track_id in added.result()]
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(track_ids)
+
+        threading.Thread(target=scan, name="pybass3-control-scan", daemon=True).start()
+        return future
+
+    def remove_song(self, song_id) -> Future:
+        return self.submit(self.playlist.remove_song, song_id)
+
+    def play(self) -> Future:
+        return self.submit(self.playlist.play)
+
+    def play_song_by_id(self, song_id) -> Future:
+        return self.submit(self.playlist.play_song_by_id, song_id)
+
+    def pause(self) -> Future:
+        return self.submit(self.playlist.pause)
+
+    def stop(self) -> Future:
+        return self.submit(self.playlist.stop)
+
+    def next(self) -> Future:
+        return self.submit(self.playlist.next)
+
+    def previous(self) -> Future:
+        return self.submit(self.playlist.previous)
+
+    def restart(self) -> Future:
+        return self.submit(self.playlist.restart)
+
+    def set_randomize(self, restart_and_play=True) -> Future:
+        return self.submit(self.playlist.set_randomize, restart_and_play)
+
+    def set_sequential(self, restart_and_play=True) -> Future:
+        return self.submit(self.playlist.set_sequential, restart_and_play)
+
+    def seek(self, seconds: float) -> Future:
+        def seek_current():
+            if self.playlist.current is not None:
+                self.playlist.current.move2position_seconds(seconds)
+
+        return self.submit(seek_current)
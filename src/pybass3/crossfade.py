@@ -0,0 +1,198 @@
+"""
+    Crossfade engine
+
+    Volume ramps are done by BASS_ChannelSlideAttribute so nothing runs in Python while a fade plays.
+    Linear and logarithmic curves are a single BASS slide.   Other curves are broken into a handful of
+    linear segments, each one started from a mixtime SYNC_SLIDE callback when the previous one finishes.
+
+    `FadeCurve.points` is the single definition of every curve's shape, the offline renderer uses the
+    same points so rendered fades match what is heard during playback.
+"""
+from collections import deque
+import enum
+import logging
+import math
+import threading
+import typing as T
+
+from .bass_channel import BassChannel
+from .codes import attrib
+from .codes import sync
+from .sync import SyncDispatcher
+
+log = logging.getLogger(__name__)
+
+
+class FadeCurve(enum.Enum):
+    linear = enum.auto()
+    logarithmic = enum.auto()  # BASS_SLIDE_LOG, perceptually even
+    equal_power = enum.auto()  # sin/cos, keeps loudness constant through a crossfade
+    s_curve = enum.auto()  # slow start and end, quick middle
+
+    def gain(self, position: float) -> float:
+        """
+            Fade-in gain at `position` (0..1) through the fade, a fade-out is `gain(1 - position)`
+        """
+        position = min(max(position, 0.0), 1.0)
+        if self is FadeCurve.equal_power:
+            return math.sin(position * math.pi / 2)
+        if self is FadeCurve.s_curve:
+            return position * position * (3 - 2 * position)
+        if self is FadeCurve.logarithmic:
+            # -60dB..0dB, matches what BASS_SLIDE_LOG sounds like
+            return 0.0 if position == 0 else 10 ** (3 * (position - 1))
+        return position
+
+    def points(self, segments: int = 8) -> T.List[T.Tuple[float, float]]:
+        """
+            Breakpoints (position, gain) for a fade-in, linear is exactly two points
+        """
+        if self is FadeCurve.linear:
+            return [(0.0, 0.0), (1.0, 1.0)]
+
+        return [(i / segments, self.gain(i / segments)) for i in range(segments + 1)]
+
+
+class Crossfader:
+    """
+        Usage::
+
+            crossfader = Crossfader(FadeCurve.equal_power)
+            crossfader.crossfade(old_song.handle, new_song.handle, seconds=5)
+    """
+
+    def __init__(self, curve: FadeCurve = FadeCurve.equal_power,
+                 segments: int = 8,
+                 dispatcher: SyncDispatcher = None):
+        """
+
+        Args:
+            curve: Default curve for fades
+            segments: Number of linear slides used to approximate curves BASS can't do natively
+            dispatcher: Used for the segment chaining syncs, defaults to the process wide dispatcher
+        """
+        self.curve = curve
+        self.segments = segments
+        self.dispatcher = dispatcher
+        self._lock = threading.Lock()
+        self._plans = {}  # stream handle -> deque of (target volume, milliseconds)
+        self._hooked = set()  # stream handles with a SYNC_SLIDE registered
+
+    def _hook(self, handle: int):
+        if handle in self._hooked:
+            return
+
+        dispatcher = self.dispatcher or SyncDispatcher.default()
+        dispatcher.set_sync(handle, sync.SYNC_SLIDE, self._on_slide_done, mixtime=True)
+        dispatcher.set_sync(handle, sync.SYNC_FREE, self._on_freed, mixtime=True)
+        self._hooked.add(handle)
+
+    def _on_freed(self, channel, data):
+        with self._lock:
+            self._plans.pop(channel, None)
+        self._hooked.discard(channel)
+
+    def _on_slide_done(self, channel, data):
+        # Mixer thread, start the next segment straight away
+        if data & 0xFFFFFF != attrib.ATTRIB_VOL:
+            return
+
+        with self._lock:
+            plan = self._plans.get(channel)
+            if not plan:
+                self._plans.pop(channel, None)
+                return
+            value, milliseconds = plan.popleft()
+
+        BassChannel.SlideAttribute(channel, attrib.ATTRIB_VOL, value, milliseconds)
+
+    def fade(self, handle: int, start: float, end: float, seconds: float, curve: FadeCurve = None) -> None:
+        """
+            Ramp the volume of `handle` from `start` to `end`
+
+        Args:
+            handle: A valid Bass stream handle
+            start: Starting volume, None to start from wherever the volume currently is
+            end: Final volume
+            seconds: Length of the fade
+            curve: Defaults to the crossfader's curve
+        """
+        curve = curve or self.curve
+        milliseconds = max(int(seconds * 1000), 1)
+
+        if start is None:
+            start = BassChannel.GetAttribute(handle, attrib.ATTRIB_VOL)
+            start = 1.0 if start is None else start
+
+        with self._lock:
+            self._plans.pop(handle, None)
+
+        BassChannel.SetAttribute(handle, attrib.ATTRIB_VOL, start)
+
+        if curve is FadeCurve.linear:
+            BassChannel.SlideAttribute(handle, attrib.ATTRIB_VOL, end, milliseconds)
+            return
+
+        if curve is FadeCurve.logarithmic:
+            BassChannel.SlideAttribute(handle, attrib.ATTRIB_VOL | attrib.SLIDE_LOG, end, milliseconds)
+            return
+
+        # fading out walks the fade-in curve backwards
+        rising = end >= start
+        steps = []
+        previous = 0.0
+        for position, gain in curve.points(self.segments)[1:]:
+            shape = gain if rising else 1.0 - curve.gain(1.0 - position)
+            steps.append((start + (end - start) * shape, int(round((position - previous) * milliseconds)) or 1))
+            previous = position
+
+        self._hook(handle)
+        first_value, first_ms = steps[0]
+        with self._lock:
+            self._plans[handle] = deque(steps[1:])
+
+        BassChannel.SlideAttribute(handle, attrib.ATTRIB_VOL, first_value, first_ms)
+
+    def cancel(self, handle: int, level: float = None) -> None:
+        """
+            Stop a fade of `handle`, remaining segments of a chained curve included.
+
+        Args:
+            handle: A valid Bass stream handle
+            level: Volume to put the channel back to, None to leave it wherever the fade had got to
+        """
+        with self._lock:
+            self._plans.pop(handle, None)
+
+        if level is None:
+            if not BassChannel.IsSliding(handle, attrib.ATTRIB_VOL):
+                return
+            level = BassChannel.GetAttribute(handle, attrib.ATTRIB_VOL)
+            if level is None:
+                return
+
+        # BASS_ChannelSetAttribute doesn't stop a slide (and is overwritten by it), a zero length slide replaces it
+        BassChannel.SlideAttribute(handle, attrib.ATTRIB_VOL, level, 0)
+
+    def fade_in(self, handle: int, seconds: float, level: float = 1.0, curve: FadeCurve = None) -> None:
+        self.fade(handle, 0.0, level, seconds, curve)
+
+    def fade_out(self, handle: int, seconds: float, curve: FadeCurve = None) -> None:
+        self.fade(handle, None, 0.0, seconds, curve)
+
+    def crossfade(self, out_handle: int, in_handle: int, seconds: float,
+                  level: float = 1.0, curve: FadeCurve = None) -> None:
+        """
+            Fade `out_handle` down while `in_handle` starts playing and fades up.
+
+        Args:
+            out_handle: The song that is ending
+            in_handle: The song that is starting, it is started by this call
+            seconds: Length of the crossfade
+            level: Final volume of the incoming song
+            curve: Defaults to the crossfader's curve
+        """
+        self.fade_in(in_handle, seconds, level, curve)
+        BassChannel.Play(in_handle, False)
+        if out_handle is not None:
+            self.fade_out(out_handle, seconds, curve)
@@ -1,6 +1,17 @@
 import ctypes
+import platform
 
-QWORD = ctypes.c_int64
+# BASS callbacks are stdcall on Windows
+if platform.system().lower() == "windows":
+    func_type = ctypes.WINFUNCTYPE
+else:
+    func_type = ctypes.CFUNCTYPE
+
+BYTE = ctypes.c_ubyte
+WORD = ctypes.c_uint16
+DWORD = ctypes.c_uint32
+BOOL = ctypes.c_int
+QWORD = ctypes.c_int64  # unsigned in bass.h, kept signed so -1 error returns read as -1
 def LOBYTE(a): return (ctypes.c_byte)(a)
 def HIBYTE(a): return (ctypes.c_byte)((a)>>8)
 def LOWORD(a): return (ctypes.c_ushort)(a)
@@ -9,13 +20,14 @@ def MAKEWORD(a,b): return (ctypes.c_ushort)(((a)&0xff)|((b)<<8))
 def MAKELONG(a,b): return (ctypes.c_ulong)(((a)&0xffff)|((b)<<16))
 
 
-HANDLE = ctypes.c_ulong
-HMUSIC = ctypes.c_ulong	  # MOD music handle
-HSAMPLE = ctypes.c_ulong  # sample handle
-HCHANNEL = ctypes.c_ulong # playing sample's channel handle
-HSTREAM = ctypes.c_ulong  # sample stream handle
-HRECORD = ctypes.c_ulong  # recording handle
-HSYNC = ctypes.c_ulong  # synchronizer handle
-HDSP = ctypes.c_ulong  # DSP handle
-HFX = ctypes.c_ulong		# DX8 effect handle
-HPLUGIN = ctypes.c_ulong	# Plugin handle
\ No newline at end of file
+# BASS handles are 32 bit DWORDs on every platform, c_ulong is 64 bits on 64 bit Linux/macOS
+HANDLE = DWORD
+HMUSIC = DWORD	  # MOD music handle
+HSAMPLE = DWORD  # sample handle
+HCHANNEL = DWORD # playing sample's channel handle
+HSTREAM = DWORD  # sample stream handle
+HRECORD = DWORD  # recording handle
+HSYNC = DWORD  # synchronizer handle
+HDSP = DWORD  # DSP handle
+HFX = DWORD		# DX8 effect handle
+HPLUGIN = DWORD	# Plugin handle
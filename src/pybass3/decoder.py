@@ -0,0 +1,151 @@
+"""
+    Decoder
+
+    Pulls PCM out of a decode-only BASS stream into a single preallocated buffer, as fast as the CPU
+    allows and without an output device.  Intended for analysis, transcoding and fingerprinting.
+
+    Usage::
+
+        with Decoder(path) as decoder:
+            for block in decoder.blocks():
+                ...  # block is a float32 view of the reused buffer, only valid until the next block
+
+    Any writable, contiguous buffer-protocol object can be used as the buffer, including a numpy array
+    whose dtype matches the sample format (float32, int16 or uint8).  When a numpy array is given the
+    blocks handed back are numpy views of it.
+"""
+from pathlib import Path
+import ctypes
+import logging
+import typing as T
+
+from .bass_module import Bass
+from .bass_channel import BassChannel
+from .bass_stream import BassStream
+from .codes import errors
+from .codes import stream
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 64 * 1024  # bytes
+
+
+class Decoder:
+
+    handle: int
+    freq: int  # Sample rate
+    chans: int  # Channel count
+    sample_width: int  # Bytes per sample, 4 for float, 2 for 16 bit, 1 for 8 bit
+    length_bytes: int  # Total decoded length
+
+    def __init__(self, file_path: T.Union[str, Path],
+                 float_samples: bool = True,
+                 buffer=None,
+                 block_size: int = DEFAULT_BLOCK_SIZE,
+                 prescan: bool = False):
+        """
+
+        Args:
+            file_path: A music file
+            float_samples: Decode to 32 bit floats, otherwise 16 bit integers
+            buffer: Optional preallocated writable buffer, if omitted a bytearray of `block_size` is allocated once
+            block_size: Size in bytes of the buffer when one isn't given
+            prescan: Scan the whole file first for exact length/seeking (MP3/MP2/MP1)
+        """
+        Bass.InitForDecoding()
+
+        self.file_path = Path(file_path)
+        self.handle = BassStream.CreateDecodeFile(bytes(self.file_path), float_samples=float_samples, prescan=prescan)
+
+        info = BassChannel.GetInfo(self.handle)
+        self.freq = info.freq
+        self.chans = info.chans
+        if info.flags & stream.SAMPLE_FLOAT:
+            self.sample_width, fmt, kind = 4, "f", "f"
+        elif info.flags & stream.SAMPLE_8BITS:
+            self.sample_width, fmt, kind = 1, "B", "u"
+        else:
+            self.sample_width, fmt, kind = 2, "h", "i"
+
+        self.length_bytes = BassChannel.GetLengthBytes(self.handle)
+
+        if buffer is None:
+            buffer = bytearray(block_size - block_size % (self.sample_width * self.chans))
+
+        self.buffer = buffer
+        view = memoryview(buffer)
+        if view.readonly:
+            raise ValueError("Decoder buffer must be writable")
+
+        # Resolved once, every read goes straight to this address
+        self._c_buffer = (ctypes.c_char * view.nbytes).from_buffer(view)
+        self._address = ctypes.addressof(self._c_buffer)
+        self._nbytes = view.nbytes
+
+        if hasattr(buffer, "dtype"):
+            if buffer.dtype.itemsize != self.sample_width or buffer.dtype.kind != kind:
+                raise ValueError(f"{buffer.dtype=} doesn't match the {self.sample_width} byte {fmt!r} sample format")
+            self._items = buffer.reshape(-1)
+        else:
+            self._items = view.cast("B").cast(fmt)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def close(self) -> None:
+        if getattr(self, "handle", None) is not None:
+            BassStream.Free(self.handle)
+            self.handle = None
+
+    @property
+    def duration(self) -> float:
+        return BassChannel.GetLengthSeconds(self.handle, self.length_bytes)
+
+    @property
+    def position_bytes(self) -> int:
+        return BassChannel.GetPositionBytes(self.handle)
+
+    def seek_seconds(self, seconds: float) -> bool:
+        return BassChannel.SetPositionBySeconds(self.handle, seconds)
+
+    def seek_bytes(self, position: int) -> bool:
+        return BassChannel.SetPositionByBytes(self.handle, position)
+
+    def read(self) -> int:
+        """
+            Decode the next block into the buffer.
+
+        Returns:
+            Number of bytes written, 0 once the stream has ended
+
+        Raises:
+            BassException if decoding fails, rather than cutting the stream short
+        """
+        count = BassChannel.GetDataPtr(self.handle, self._address, self._nbytes)
+        if count >= 0:
+            return count
+
+        if Bass.GetError().code == errors.ERROR_ENDED:
+            return 0
+        Bass.RaiseError(f"decoding {self.file_path}")
+
+    def blocks(self) -> T.Iterator[T.Any]:
+        """
+            Decode the whole stream block by block.
+
+        Returns:
+            Generator of views over the filled part of the buffer.   Each view is reused by the next
+            block so copy it if it needs to outlive the loop iteration.
+        """
+        while True:
+            count = self.read()
+            if count == 0:
+                break
+
+            yield self._items[:count // self.sample_width]
@@ -0,0 +1,297 @@
+"""
+    Output devices and zones
+
+    BASS can have several output devices initialized at once, but which one a call uses is a per thread
+    setting (BASS_SetDevice); a stream is created on the calling thread's device and stays there unless it
+    is moved with BASS_ChannelSetDevice.   `Bass.Init` only knows about one device, `DeviceManager`
+    initializes as many as needed and gives each zone (a Playlist bound to a device) its own output:
+
+        manager = DeviceManager()
+        kitchen = manager.add_zone("kitchen", device=1)
+        patio = manager.add_zone("patio", device=2)
+        kitchen.add_directory(Path("/music/jazz"))
+        patio.add_directory(Path("/music/rock"))
+        kitchen.play(); patio.play()
+
+    Songs bound to a device open their streams inside `use_device`, so it doesn't matter which thread
+    (Qt, prefetch, sync callbacks) ends up opening them.   All zones share one SyncDispatcher, so every
+    zone's track changes are handled by a single thread.
+"""
+import atexit
+from contextlib import contextmanager
+import dataclasses
+import logging
+import threading
+import typing as T
+
+from .bindings import bass
+from .bass_module import Bass, BassException, BassMissingDevice
+from .codes import device as codes
+from .codes import errors
+from .codes.data import DW_ERROR
+from .structs.info import BASS_DEVICEINFO
+
+log = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class DeviceInfo:
+    id: int
+    name: str
+    driver: str
+    flags: int
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.flags & codes.DEVICE_ENABLED)
+
+    @property
+    def is_default(self) -> bool:
+        return bool(self.flags & codes.DEVICE_DEFAULT)
+
+    @property
+    def initialized(self) -> bool:
+        return bool(self.flags & codes.DEVICE_INIT)
+
+
+def list_devices() -> T.List[DeviceInfo]:
+    """
+        Every output device BASS knows about, device 0 is always the "no sound" device
+    """
+    devices = []
+    info = BASS_DEVICEINFO()
+    device_id = 0
+    while bass.BASS_GetDeviceInfo(device_id, info) is True:
+        devices.append(DeviceInfo(device_id,
+                                  (info.name or b"").decode("utf-8", "replace"),
+                                  (info.driver or b"").decode("utf-8", "replace"),
+                                  info.flags))
+        device_id += 1
+    return devices
+
+
+def current_device() -> T.Optional[int]:
+    """
+        The calling thread's device, None if no device has been initialized
+    """
+    device = bass.BASS_GetDevice()
+    return None if device == DW_ERROR else device
+
+
+@contextmanager
+def use_device(device: int):
+    """
+        Make `device` the calling thread's device for the duration of the block, eg to create a
+        stream on it, then put back whatever the thread was using before.
+
+    Raises:
+        BassMissingDevice if `device` isn't initialized
+    """
+    previous = current_device()
+    if previous != device and bass.BASS_SetDevice(device) is not True:
+        raise BassMissingDevice(device)
+    try:
+        yield device
+    finally:
+        if previous is not None and previous != device:
+            bass.BASS_SetDevice(previous)
+
+
+def move_channel(handle: int, device: int) -> None:
+    """
+        Move a playing or stopped channel to another initialized device, it keeps its position and state
+
+    Raises:
+        BassException
+    """
+    if bass.BASS_ChannelSetDevice(handle, device) is not True:
+        Bass.RaiseError(f"{handle=} {device=}")
+
+
+def channel_device(handle: int) -> T.Optional[int]:
+    device = bass.BASS_ChannelGetDevice(handle)
+    return None if device == DW_ERROR else device
+
+
+@dataclasses.dataclass
+class Zone:
+    name: str
+    device: int
+    playlist: T.Any  # Playlist
+
+
+class DeviceManager:
+    """
+        Initializes and frees output devices and keeps track of the zones playing on them.
+    """
+
+    def __init__(self, dispatcher=None, tick_interval: float = 0.1):
+        """
+
+        Args:
+            dispatcher: SyncDispatcher shared by every zone, defaults to the process wide one
+            tick_interval: Seconds between ticks for zones that aren't driven by sync events, see `start`
+        """
+        self._lock = threading.RLock()
+        self._devices = {}  # device id -> freq it was initialized with
+        self.zones = {}  # name -> Zone
+        self.dispatcher = dispatcher
+        self.tick_interval = tick_interval
+        self._scheduler = None
+        self._stopping = threading.Event()
+        atexit.register(self.free_all)
+
+    @property
+    def devices(self) -> T.List[int]:
+        """
+            Initialized device ids
+        """
+        return list(self._devices)
+
+    def init(self, device: int = codes.DEVICE_DEFAULT_ID, freq: int = 44100, flags: int = 0) -> int:
+        """
+            Initialize an output device, initializing one that is already up is harmless.
+
+        Args:
+            device: Device id from `list_devices`, -1 for the default output, 0 for no sound
+            freq: Output sample rate
+            flags: codes.device DEVICE_xxx flags
+
+        Returns:
+            The device id, the real one when `device` was -1
+
+        Raises:
+            BassException
+        """
+        with self._lock:
+            if device in self._devices:
+                return device
+
+            # BASS_Init makes the device the calling thread's device, keep whatever the thread had
+            previous = current_device()
+            if bass.BASS_Init(device, freq, flags, 0, None) is not True:
+                error = Bass.GetError()
+                if error.code != errors.ERROR_ALREADY:
+                    raise BassException(error.code, error.desc, f"{device=}")
+                if device != codes.DEVICE_DEFAULT_ID:
+                    bass.BASS_SetDevice(device)
+
+            device = current_device()
+            self._devices[device] = freq
+            Bass.LIB_INITED = True
+            log.debug("Initialized device %s at %sHz", device, freq)
+
+            if previous is not None and previous != device:
+                bass.BASS_SetDevice(previous)
+
+            return device
+
+    def free(self, device: int) -> None:
+        """
+            Free a device, streams still on it are freed by BASS
+        """
+        with self._lock:
+            if self._devices.pop(device, None) is None:
+                return
+
+            for name in [name for name, zone in self.zones.items() if zone.device == device]:
+                self.remove_zone(name)
+
+            with use_device(device):
+                bass.BASS_Free()
+
+            if len(self._devices) == 0:
+                Bass.LIB_INITED = False
+
+    def free_all(self) -> None:
+        self.stop()
+        for device in self.devices:
+            self.free(device)
+
+    def add_zone(self, name: str, device: int, playlist=None, sync_events: bool = True, **playlist_kwargs):
+        """
+            Bind a playlist to an output device, initializing the device if needed.
+
+        Args:
+            name: Zone name
+            device: Output device id
+            playlist: Existing Playlist to bind, a new one is created from `playlist_kwargs` otherwise
+            sync_events: Drive the playlist with the manager's shared SyncDispatcher, otherwise it is
+                ticked by the manager's scheduler thread (see `start`)
+
+        Returns:
+            The zone's Playlist
+        """
+        from .playlist import Playlist
+        from .sync import SyncDispatcher
+
+        with self._lock:
+            if name in self.zones:
+                raise ValueError(f"There is already a zone named {name!r}")
+
+            device = self.init(device)
+            if playlist is None:
+                playlist = Playlist(**playlist_kwargs)
+
+            playlist.set_device(device)
+            if sync_events is True:
+                playlist.use_sync_events(self.dispatcher or SyncDispatcher.default())
+
+            self.zones[name] = Zone(name, device, playlist)
+            return playlist
+
+    def remove_zone(self, name: str):
+        """
+            Stop and forget a zone
+
+        Returns:
+            Its Playlist
+        """
+        with self._lock:
+            zone = self.zones.pop(name)
+
+        zone.playlist.free()
+        return zone.playlist
+
+    def move_zone(self, name: str, device: int) -> None:
+        """
+            Move a zone, including whatever it is playing right now, to another device
+        """
+        with self._lock:
+            zone = self.zones[name]
+            zone.device = self.init(device)
+            zone.playlist.set_device(zone.device)
+
+    def start(self) -> None:
+        """
+            Start the scheduler thread ticking every zone that isn't driven by sync events, one thread
+            serves all of them.
+        """
+        if self._scheduler is not None:
+            return
+
+        self._stopping.clear()
+        self._scheduler = threading.Thread(target=self._schedule, name="pybass3-zones", daemon=True)
+        self._scheduler.start()
+
+    def stop(self) -> None:
+        if self._scheduler is None:
+            return
+
+        self._stopping.set()
+        self._scheduler.join()
+        self._scheduler = None
+
+    def _schedule(self):
+        while self._stopping.wait(self.tick_interval) is False:
+            with self._lock:
+                zones = list(self.zones.values())
+
+            for zone in zones:
+                playlist = zone.playlist
+                if playlist.sync_dispatcher is not None or playlist.current is None:
+                    continue
+                try:
+                    playlist.tick()
+                except Exception:
+                    log.exception("Tick of zone %s failed", zone.name)
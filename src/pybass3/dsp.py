@@ -0,0 +1,234 @@
+"""
+    DSP chains
+
+    Needs numpy.   BASS hands DSP functions every buffer of a channel's output just before it is mixed, on the
+    mixer thread.   `DSPChain` registers one DSPPROC per channel and runs any number of Python callbacks on each
+    buffer, highest priority first, giving them a numpy view straight onto BASS's memory:
+
+        def half_volume(samples):
+            samples *= 0.5  # in place, samples is (frames, channels)
+
+        Bass.SetConfig(config.FLOATDSP, True)  # float32 for every channel, otherwise the channel's own format
+        chain = DSPChain.of(song.handle)
+        chain.add(half_volume, priority=10)
+
+    Callbacks must change `samples` in place and must be quick: they run while BASS is filling the playback
+    buffer, and a chain that takes longer than the audio it processes causes dropouts.   Every callback is timed,
+    see `DSPChain.stats`, and a callback that raises is disabled rather than being called again.
+"""
+import ctypes
+import dataclasses
+import logging
+import threading
+import time
+import typing as T
+
+import numpy as np
+
+from .bass_module import Bass
+from .bass_channel import BassChannel, DSPPROC
+from .codes import config
+from .codes import stream
+from .codes import sync
+from .sync import SyncDispatcher
+
+log = logging.getLogger(__name__)
+
+DSPCallback = T.Callable[[np.ndarray], None]
+
+
+@dataclasses.dataclass
+class DSPStats:
+    calls: int = 0
+    total: float = 0.0  # Seconds spent in the callback
+    longest: float = 0.0  # Seconds
+    last: float = 0.0  # Seconds
+    overruns: int = 0  # Calls that took longer than the chain's `max_load` share of the buffer's duration
+    audio: float = 0.0  # Seconds of audio processed
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+    @property
+    def load(self) -> float:
+        """
+            Share of real time spent processing, 1.0 or more can't keep up with playback
+        """
+        return self.total / self.audio if self.audio else 0.0
+
+    def record(self, elapsed: float, audio: float, limit: float) -> None:
+        self.calls += 1
+        self.total += elapsed
+        self.audio += audio
+        self.last = elapsed
+        if elapsed > self.longest:
+            self.longest = elapsed
+        if elapsed > limit:
+            self.overruns += 1
+
+
+@dataclasses.dataclass
+class DSPEntry:
+    callback: DSPCallback
+    priority: int
+    name: str
+    stats: DSPStats = dataclasses.field(default_factory=DSPStats)
+    enabled: bool = True
+
+
+def sample_dtype(handle: int) -> np.dtype:
+    """
+        Format DSP functions of `handle` receive: float32 if the channel decodes to floats or FLOATDSP is set,
+        otherwise 16 or 8 bit integers
+    """
+    info = BassChannel.GetInfo(handle)
+    if info is None:
+        Bass.RaiseError(f"{handle=}")
+
+    if Bass.GetConfig(config.FLOATDSP) == 1 or info.flags & stream.SAMPLE_FLOAT:
+        return np.dtype(np.float32)
+    if info.flags & stream.SAMPLE_8BITS:
+        return np.dtype(np.uint8)
+    return np.dtype(np.int16)
+
+
+class DSPChain:
+    """
+        Prioritized Python DSP callbacks on one channel, see `of` to get a channel's chain.
+    """
+
+    # channel handle -> chain, keeps the DSPPROC alive for as long as BASS may call it
+    _chains = {}
+    _chains_lock = threading.Lock()
+
+    def __init__(self, handle: int, priority: int = 0, max_load: float = 0.5):
+        """
+
+        Args:
+            handle: A valid channel handle
+            priority: BASS priority of the whole chain relative to other DSPs and FX on the channel
+            max_load: A callback taking longer than this share of its buffer's duration counts as an overrun
+        """
+        info = BassChannel.GetInfo(handle)
+        if info is None:
+            Bass.RaiseError(f"{handle=}")
+
+        self.handle = handle
+        self.max_load = max_load
+        self.dtype = sample_dtype(handle)
+        self.chans = info.chans
+        self.bytes_per_second = info.freq * info.chans * self.dtype.itemsize
+        self.stats = DSPStats()  # The chain as a whole
+
+        self._lock = threading.Lock()
+        self._entries = ()  # Replaced, never mutated, the mixer thread iterates it without locking
+        self._view_key = None  # (address, length) of the cached view
+        self._view = None
+
+        self._proc = DSPPROC(self._trampoline)
+        self.dsp = BassChannel.SetDSP(handle, self._proc, None, priority)
+        if self.dsp == 0:
+            Bass.RaiseError(f"{handle=}")
+
+        with self._chains_lock:
+            self._chains[handle] = self
+        SyncDispatcher.default().set_sync(handle, sync.SYNC_FREE, self._on_freed, mixtime=True)
+
+    def __repr__(self):
+        return f"<DSPChain {self.handle} {[entry.name for entry in self._entries]}>"
+
+    def __len__(self):
+        return len(self._entries)
+
+    @classmethod
+    def of(cls, handle: int, **kwargs) -> "DSPChain":
+        """
+            The channel's chain, created (with `kwargs`) the first time it is asked for
+        """
+        with cls._chains_lock:
+            chain = cls._chains.get(handle)
+        return chain if chain is not None else cls(handle, **kwargs)
+
+    def add(self, callback: DSPCallback, priority: int = 0, name: str = None) -> DSPEntry:
+        """
+            Run `callback(samples)` on every buffer, after callbacks with a higher priority.
+
+        Args:
+            callback: Changes the (frames, channels) numpy view in place, it is only valid during the call
+            priority: Higher runs first, callbacks with the same priority run in the order they were added
+            name: Label used in stats, defaults to the callback's name
+
+        Returns:
+            DSPEntry, pass it to `remove`
+        """
+        entry = DSPEntry(callback, priority, name or getattr(callback, "__name__", repr(callback)))
+        with self._lock:
+            self._entries = tuple(sorted(self._entries + (entry,), key=lambda item: -item.priority))
+        return entry
+
+    def remove(self, entry: DSPEntry) -> None:
+        with self._lock:
+            self._entries = tuple(item for item in self._entries if item is not entry)
+
+    def callback_stats(self) -> T.Dict[str, DSPStats]:
+        """
+            Copies of every callback's stats by name
+        """
+        return {entry.name: dataclasses.replace(entry.stats) for entry in self._entries}
+
+    def reset_stats(self) -> None:
+        self.stats = DSPStats()
+        for entry in self._entries:
+            entry.stats = DSPStats()
+
+    def _samples(self, address: int, length: int) -> np.ndarray:
+        # BASS reuses the same buffer for a channel, so the view is normally built once
+        key = (address, length)
+        if key != self._view_key:
+            raw = (ctypes.c_char * length).from_address(address)
+            self._view = np.frombuffer(raw, dtype=self.dtype).reshape(-1, self.chans)
+            self._view_key = key
+        return self._view
+
+    def _trampoline(self, dsp, channel, buffer, length, user):
+        # Mixer thread, must never raise
+        entries = self._entries
+        if length == 0 or not entries or buffer is None:
+            return
+
+        samples = self._samples(buffer, length)
+        audio = length / self.bytes_per_second
+        limit = audio * self.max_load
+        clock = time.perf_counter
+        started = clock()
+
+        for entry in entries:
+            if entry.enabled is False:
+                continue
+
+            before = clock()
+            try:
+                entry.callback(samples)
+            except Exception:
+                entry.enabled = False
+                log.exception("DSP callback %s failed and has been disabled", entry.name)
+            entry.stats.record(clock() - before, audio, limit)
+
+        self.stats.record(clock() - started, audio, limit)
+
+    def _on_freed(self, channel, data):
+        with self._chains_lock:
+            self._chains.pop(channel, None)
+
+    def close(self) -> None:
+        """
+            Remove the chain from its channel
+        """
+        with self._chains_lock:
+            if self._chains.get(self.handle) is not self:
+                return
+            del self._chains[self.handle]
+
+        BassChannel.RemoveDSP(self.handle, self.dsp)
+        self._entries = ()
@@ -0,0 +1,270 @@
+"""
+    Effects
+
+    BASS's built in effects (the DX8 set: parametric EQ, compressor, reverb, echo, chorus...) run natively on the
+    mixer thread, far cheaper than doing the same work in a Python DSP callback.
+
+    An `EffectChain` is a list of effects that can be applied to any number of channels.   Changing an effect's
+    parameters updates every channel it is on, and Songs and Playlists apply their chain whenever they open a
+    stream, so a playlist's EQ follows it from track to track:
+
+        playlist.effects.add_eq_band(100, gain=4.0)
+        playlist.effects.add_compressor(fThreshold=-20, fRatio=4)
+        bass_boost = playlist.effects.effects[0]
+        playlist.effects.update(bass_boost, fGain=6.0)  # the playing song changes right away
+
+    Parameters are the field names of the structs.fx parameter structs; fields that aren't given keep BASS's
+    defaults for the effect.
+"""
+import ctypes
+import logging
+import threading
+import typing as T
+
+from .bindings import bass
+from .bass_module import Bass, BassException
+from .bass_channel import BassChannel
+from .codes import fx
+from .codes import sync
+from .structs.fx import PARAMETERS
+from .sync import SyncDispatcher
+
+log = logging.getLogger(__name__)
+
+
+class BassFX:
+
+    @classmethod
+    def SetParameters(cls, fx_handle: int, params: ctypes.Structure) -> bool:
+        """
+
+        Args:
+            fx_handle: From BassChannel.SetFX
+            params: The effect type's structs.fx parameter struct
+        """
+        return bass.BASS_FXSetParameters(fx_handle, ctypes.addressof(params))
+
+    @classmethod
+    def GetParameters(cls, fx_handle: int, params: ctypes.Structure) -> bool:
+        """
+            Fill `params`, the effect type's structs.fx parameter struct, with the effect's current parameters
+        """
+        return bass.BASS_FXGetParameters(fx_handle, ctypes.addressof(params))
+
+    @classmethod
+    def Reset(cls, fx_handle: int) -> bool:
+        """
+            Clear the effect's state (eg reverb tail), keeping its parameters
+        """
+        return bass.BASS_FXReset(fx_handle)
+
+    @classmethod
+    def SetPriority(cls, fx_handle: int, priority: int) -> bool:
+        return bass.BASS_FXSetPriority(fx_handle, priority)
+
+
+class Effect:
+    """
+        One effect of an EffectChain, see `EffectChain.add`
+    """
+
+    def __init__(self, fx_type: int, priority: int = 0, **params):
+        """
+
+        Args:
+            fx_type: codes.fx FX_xxx effect type
+            priority: Higher priorities are applied first, relative to every effect and DSP on the channel
+            params: Parameter struct fields to set
+
+        Raises:
+            ValueError for unknown effect types or parameters
+        """
+        if fx_type not in PARAMETERS:
+            raise ValueError(f"Unknown effect type {fx_type}")
+
+        self.fx_type = fx_type
+        self.priority = priority
+        self.params = {}
+        self._check(params)
+        self.params.update(params)
+
+    def __repr__(self):
+        return f"<Effect {PARAMETERS[self.fx_type].__name__} priority={self.priority} {self.params}>"
+
+    def _check(self, params: dict):
+        fields = {name for name, _ in PARAMETERS[self.fx_type]._fields_}
+        unknown = set(params) - fields
+        if unknown:
+            raise ValueError(f"{PARAMETERS[self.fx_type].__name__} has no {sorted(unknown)}, use {sorted(fields)}")
+
+    def configure(self, fx_handle: int) -> None:
+        """
+            Apply this effect's parameters to an instance of it
+        """
+        if not self.params:
+            return
+
+        params = PARAMETERS[self.fx_type]()
+        BassFX.GetParameters(fx_handle, params)
+        for name, value in self.params.items():
+            setattr(params, name, value)
+
+        if BassFX.SetParameters(fx_handle, params) is not True:
+            Bass.RaiseError(f"{self!r}")
+
+
+class EffectChain:
+
+    def __init__(self, effects: T.Iterable[Effect] = ()):
+        self._lock = threading.RLock()
+        self._effects = list(effects)
+        self._channels = {}  # channel handle -> {id(effect): fx handle}
+
+    def __repr__(self):
+        return f"<EffectChain {len(self._effects)} effects on {len(self._channels)} channels>"
+
+    def __len__(self):
+        return len(self._effects)
+
+    def __iter__(self):
+        return iter(self.effects)
+
+    @property
+    def effects(self) -> T.List[Effect]:
+        with self._lock:
+            return list(self._effects)
+
+    @property
+    def channels(self) -> T.List[int]:
+        """
+            Handles of the channels the chain is applied to
+        """
+        with self._lock:
+            return list(self._channels)
+
+    def add(self, effect: T.Union[Effect, int], priority: int = 0, **params) -> Effect:
+        """
+            Add an effect, every channel the chain is applied to gets it right away.
+
+        Args:
+            effect: An Effect, or a codes.fx FX_xxx type to create one from `priority` and `params`
+
+        Returns:
+            The Effect, pass it to `update` or `remove`
+
+        Raises:
+            BassException if a channel refuses the effect (eg ERROR_NOFX, platforms without the DX8 set), the
+            chain is left unchanged
+        """
+        if not isinstance(effect, Effect):
+            effect = Effect(effect, priority, **params)
+
+        with self._lock:
+            try:
+                for handle, instances in self._channels.items():
+                    self._set(handle, effect, instances)
+            except BassException:
+                for handle, instances in self._channels.items():
+                    fx_handle = instances.pop(id(effect), None)
+                    if fx_handle is not None:
+                        BassChannel.RemoveFX(handle, fx_handle)
+                raise
+
+            self._effects.append(effect)
+
+        return effect
+
+    def add_eq_band(self, center: float, gain: float, bandwidth: float = 12.0, priority: int = 0) -> Effect:
+        """
+            Parametric EQ band
+
+        Args:
+            center: Frequency in Hz, must be below a third of the channel's sample rate
+            gain: -15..15 dB
+            bandwidth: 1..36 semitones
+        """
+        return self.add(fx.FX_DX8_PARAMEQ, priority, fCenter=center, fGain=gain, fBandwidth=bandwidth)
+
+    def add_compressor(self, priority: int = 0, **params) -> Effect:
+        """
+            See structs.fx.BASS_DX8_COMPRESSOR, eg fThreshold=-20, fRatio=4
+        """
+        return self.add(fx.FX_DX8_COMPRESSOR, priority, **params)
+
+    def add_reverb(self, priority: int = 0, **params) -> Effect:
+        """
+            See structs.fx.BASS_DX8_REVERB, eg fReverbMix=-10, fReverbTime=1500
+        """
+        return self.add(fx.FX_DX8_REVERB, priority, **params)
+
+    def update(self, effect: Effect, **params) -> None:
+        """
+            Change some of an effect's parameters on every channel it is on
+        """
+        effect._check(params)
+        with self._lock:
+            effect.params.update(params)
+            for instances in self._channels.values():
+                fx_handle = instances.get(id(effect))
+                if fx_handle is not None:
+                    effect.configure(fx_handle)
+
+    def remove(self, effect: Effect) -> None:
+        with self._lock:
+            self._effects = [item for item in self._effects if item is not effect]
+            for handle, instances in self._channels.items():
+                fx_handle = instances.pop(id(effect), None)
+                if fx_handle is not None:
+                    BassChannel.RemoveFX(handle, fx_handle)
+
+    def clear(self) -> None:
+        for effect in self.effects:
+            self.remove(effect)
+
+    def reset(self) -> None:
+        """
+            Clear every effect's state, eg after seeking so a reverb tail doesn't carry over
+        """
+        with self._lock:
+            for instances in self._channels.values():
+                for fx_handle in instances.values():
+                    BassFX.Reset(fx_handle)
+
+    def _set(self, handle: int, effect: Effect, instances: dict):
+        fx_handle = BassChannel.SetFX(handle, effect.fx_type, effect.priority)
+        if fx_handle == 0:
+            Bass.RaiseError(f"{handle=} {effect!r}")
+        instances[id(effect)] = fx_handle
+        effect.configure(fx_handle)
+
+    def apply(self, handle: int) -> None:
+        """
+            Put the chain's effects on a channel, and any added later.   Called by Song when it opens a stream,
+            so an effect BASS refuses is logged and skipped rather than stopping playback.
+        """
+        with self._lock:
+            if handle in self._channels:
+                return
+
+            instances = self._channels[handle] = {}
+            for effect in self._effects:
+                try:
+                    self._set(handle, effect, instances)
+                except BassException as bexc:
+                    log.warning("Couldn't put %r on %s: %s", effect, handle, bexc)
+
+        SyncDispatcher.default().set_sync(handle, sync.SYNC_FREE, self._on_freed, mixtime=True)
+
+    def detach(self, handle: int) -> None:
+        """
+            Take the chain's effects off a channel
+        """
+        with self._lock:
+            instances = self._channels.pop(handle, {})
+            for fx_handle in instances.values():
+                BassChannel.RemoveFX(handle, fx_handle)
+
+    def _on_freed(self, channel, data):
+        # BASS removes the effects of a freed channel itself
+        with self._lock:
+            self._channels.pop(channel, None)
@@ -0,0 +1,214 @@
+"""
+    Stream handle pool
+
+    Songs open their BASS stream the first time anything needs it and normally keep it until they are
+    freed.   A `HandlePool` caps how many streams (and roughly how much memory) are open at once across
+    every Song that uses it, closing the least recently used ones when a new stream pushes it over the
+    limit.   Channels that are playing, paused or stalled are never closed and callers can pin songs they
+    are about to use (Playlist pins its current song, the Prefetcher the song it is opening).
+
+    Usage::
+
+        Song.handle_pool = HandlePool(max_handles=32)
+        ...
+        print(Song.handle_pool.stats())
+"""
+from collections import OrderedDict
+import dataclasses
+import logging
+import threading
+import weakref
+
+from .bass_module import Bass
+from .bass_channel import BassChannel
+from .bass_stream import BassStream
+from .codes import channel
+from .codes import config
+from .codes import stream
+
+log = logging.getLogger(__name__)
+
+BUSY_STATES = (channel.ACTIVE_PLAYING, channel.ACTIVE_STALLED, channel.ACTIVE_PAUSED, channel.ACTIVE_PAUSED_DEVICE)
+
+
+@dataclasses.dataclass
+class PoolStats:
+    open: int  # Streams currently open through the pool
+    pinned: int  # Songs pinned, open or not
+    bytes: int  # Estimated memory held by the open streams
+    hits: int  # Songs used again, after another stream was opened, without reopening their own
+    misses: int  # Streams opened
+    evictions: int  # Streams closed to stay under the caps
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
+class HandlePool:
+
+    def __init__(self, max_handles: int = 64, max_bytes: int = None):
+        """
+
+        Args:
+            max_handles: Most streams open at once, busy and pinned streams may push it past this
+            max_bytes: Optional cap on the estimated memory of the open streams
+        """
+        self.max_handles = max_handles
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # id(song) -> (weakref to song, estimated bytes, `_opens` when last counted), least recently used first
+        self._entries = OrderedDict()
+        self._opens = 0  # Streams opened so far, a song's first use after another one opened counts as a hit
+        self._pins = {}  # id(song) -> pin count
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, song):
+        return id(song) in self._entries
+
+    @staticmethod
+    def estimate_bytes(handle: int) -> int:
+        """
+            Rough memory held by an open stream; the playback buffer (decode channels don't have one) plus
+            any buffer pinned by BassStream.CreateFromMemory.   BASS's own decoder state isn't included.
+        """
+        size = 0
+        info = BassChannel.GetInfo(handle)
+        if info is not None and info.flags & stream.STREAM_DECODE == 0:
+            buffer_ms = Bass.GetConfig(config.BUFFER)
+            size += max(BassChannel.Seconds2Bytes(handle, buffer_ms / 1000), 0)
+
+        size += getattr(BassStream.RESOURCES.get(handle), "nbytes", 0)
+        return size
+
+    def touch(self, song) -> None:
+        """
+            Mark `song`'s already open stream as just used.   Polling a song (position, snapshot...) counts one
+            hit at most until another stream is opened, so `hits` counts the reopens the pool avoided.
+        """
+        key = id(song)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if entry[2] != self._opens:
+                    self._entries[key] = (entry[0], entry[1], self._opens)
+                    self.hits += 1
+
+    def opened(self, song) -> None:
+        """
+            Called by Song after it opens a stream, may close other songs' streams to make room.
+        """
+        size = self.estimate_bytes(song._handle)
+        key = id(song)
+        with self._lock:
+            self.misses += 1
+            self._opens += 1
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (weakref.ref(song), size, self._opens)
+            self._bytes += size
+            victims = self._select_victims(key)
+
+        for victim in victims:
+            if self._evictable(victim) is False:
+                continue
+            log.debug("Evicting stream of %s", victim.file_path)
+            with self._lock:
+                self.evictions += 1
+            victim.free_stream()
+
+    def forget(self, song) -> None:
+        """
+            Called by Song when its stream is freed
+        """
+        with self._lock:
+            entry = self._entries.pop(id(song), None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def _over(self, count, size) -> bool:
+        if count > self.max_handles:
+            return True
+        return self.max_bytes is not None and size > self.max_bytes
+
+    def _select_victims(self, keep) -> list:
+        # Called with the lock held, victims are freed by the caller after releasing it
+        count, size = len(self._entries), self._bytes
+        victims = []
+        for key, (ref, entry_size, _) in list(self._entries.items()):
+            if self._over(count, size) is False:
+                break
+            if key == keep or key in self._pins:
+                continue
+
+            song = ref()
+            if song is None:
+                del self._entries[key]
+                self._bytes -= entry_size
+                count, size = count - 1, size - entry_size
+                continue
+
+            if BassChannel.IsActive(song._handle) in BUSY_STATES:
+                continue
+
+            victims.append(song)
+            count, size = count - 1, size - entry_size
+
+        return victims
+
+    def _evictable(self, song) -> bool:
+        # Checked again right before freeing, another thread may have pinned or started the song since it was picked
+        handle = song._handle
+        return handle is not None and self.is_pinned(song) is False and BassChannel.IsActive(handle) not in BUSY_STATES
+
+    def pin(self, song) -> None:
+        """
+            Keep `song`'s stream open until a matching `unpin`, pins are counted.
+        """
+        if song is None:
+            return
+        with self._lock:
+            self._pins[id(song)] = self._pins.get(id(song), 0) + 1
+
+    def unpin(self, song) -> None:
+        if song is None:
+            return
+        key = id(song)
+        with self._lock:
+            count = self._pins.get(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+            else:
+                self._pins.pop(key, None)
+
+    def is_pinned(self, song) -> bool:
+        return id(song) in self._pins
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(len(self._entries), len(self._pins), self._bytes, self.hits, self.misses, self.evictions)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def clear(self) -> None:
+        """
+            Close every idle, unpinned stream in the pool
+        """
+        with self._lock:
+            songs = [(key, entry[0]()) for key, entry in self._entries.items() if key not in self._pins]
+
+        for key, song in songs:
+            if song is not None and self._evictable(song) is True:
+                song.free_stream()
@@ -0,0 +1,269 @@
+"""
+    Loudness analysis
+
+    Needs numpy.   Measures the integrated loudness (EBU R128 / ITU-R BS.1770 style, in LUFS) and sample peak of
+    a file from a decode-only stream and works out the gain that brings it to a reference loudness, the way
+    ReplayGain 2.0 does.
+
+    The K-weighting filter is applied in the frequency domain: every 100ms segment is transformed once with
+    numpy's real FFT and its power spectrum weighted by the filter's magnitude response, which by Parseval gives
+    the K-weighted mean square without running an IIR filter sample by sample in Python.   400ms gating blocks
+    overlapping by 75% are the mean of four consecutive segments.   Results agree with a time domain
+    implementation to within a few tenths of a LU on music.
+
+    Usage::
+
+        index = MetadataIndex("library.db")
+        for result in analyze_many(paths, index=index):
+            print(result.path, result.loudness, result.gain)
+
+        playlist = Playlist(index=index, normalize=True)  # songs are played at their stored gain
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import dataclasses
+import logging
+import math
+import multiprocessing
+import os
+from pathlib import Path
+import typing as T
+
+import numpy as np
+
+from .decoder import Decoder
+
+if T.TYPE_CHECKING:
+    from .metadata_index import MetadataIndex
+
+log = logging.getLogger(__name__)
+
+REFERENCE_LUFS = -18.0  # ReplayGain 2.0 reference, EBU R128 broadcast is -23
+ABSOLUTE_GATE = -70.0  # LUFS
+RELATIVE_GATE = -10.0  # LU below the absolutely gated loudness
+SEGMENTS_PER_BLOCK = 4  # 400ms blocks made of 100ms segments
+
+# ITU-R BS.1770 K-weighting, the high shelf and the RLB high pass, as 48kHz biquads (b0, b1, b2), (a0, a1, a2)
+SHELF = ((1.53512485958697, -2.69169618940638, 1.19839281085285), (1.0, -1.69065929318241, 0.73248077421585))
+HIGH_PASS = ((1.0, -2.0, 1.0), (1.0, -1.99004745483398, 0.99007225036621))
+
+
+@dataclasses.dataclass
+class LoudnessResult:
+    path: Path
+    size: int = 0  # File size in bytes
+    mtime: float = 0.0  # File modification time
+    loudness: float = None  # Integrated loudness in LUFS, None for silence
+    peak: float = None  # Sample peak, 1.0 is full scale
+    gain: float = None  # dB to add to reach the reference loudness, None for silence
+    duration: float = None  # Seconds
+    length_bytes: int = None  # Decoded length in bytes
+    freq: int = None
+    chans: int = None
+    cached: bool = False  # True if this came from a MetadataIndex
+    error: Exception = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def k_weighting(frequencies: np.ndarray) -> np.ndarray:
+    """
+        Power response |H(f)|^2 of the K-weighting filter at `frequencies` (Hz), above 24kHz it is flat.
+    """
+    w = 2 * np.pi * np.minimum(frequencies, 24000.0) / 48000.0
+    z = np.exp(-1j * w)
+    power = np.ones(len(frequencies))
+    for b, a in (SHELF, HIGH_PASS):
+        response = (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+        power *= np.abs(response) ** 2
+    return power
+
+
+def channel_weights(chans: int) -> np.ndarray:
+    """
+        BS.1770 channel weights, surround channels count 1.41 and LFE not at all in 5.1 layouts
+    """
+    if chans == 6:
+        return np.array([1.0, 1.0, 1.0, 0.0, 1.41, 1.41])
+    return np.ones(chans)
+
+
+def integrated_loudness(segment_power: np.ndarray) -> T.Optional[float]:
+    """
+        Gated integrated loudness from the channel weighted, K-weighted mean square of consecutive 100ms segments.
+
+    Returns:
+        LUFS, None if nothing is above the absolute gate
+    """
+    if len(segment_power) == 0:
+        return None
+
+    if len(segment_power) < SEGMENTS_PER_BLOCK:
+        blocks = np.array([segment_power.mean()])
+    else:
+        totals = np.cumsum(np.concatenate(([0.0], segment_power)))
+        blocks = (totals[SEGMENTS_PER_BLOCK:] - totals[:-SEGMENTS_PER_BLOCK]) / SEGMENTS_PER_BLOCK
+
+    with np.errstate(divide="ignore"):
+        loudness = -0.691 + 10 * np.log10(blocks)
+
+    gated = blocks[loudness > ABSOLUTE_GATE]
+    if len(gated) == 0:
+        return None
+
+    threshold = -0.691 + 10 * math.log10(gated.mean()) + RELATIVE_GATE
+    gated = blocks[(loudness > ABSOLUTE_GATE) & (loudness > threshold)]
+    return -0.691 + 10 * math.log10(gated.mean())
+
+
+def track_gain(loudness: T.Optional[float], peak: T.Optional[float], reference: float = REFERENCE_LUFS,
+               prevent_clipping: bool = True) -> T.Optional[float]:
+    """
+        dB to apply to bring `loudness` to `reference`, limited so `peak` doesn't go over full scale
+    """
+    if loudness is None:
+        return None
+
+    gain = reference - loudness
+    if prevent_clipping is True and peak:
+        gain = min(gain, -20 * math.log10(peak))
+    return gain
+
+
+def analyze(file_path: T.Union[str, Path], reference: float = REFERENCE_LUFS, prevent_clipping: bool = True,
+            segments_per_read: int = 20) -> LoudnessResult:
+    """
+        Decode `file_path` once and measure it.
+
+    Args:
+        file_path: A music file
+        reference: Target loudness in LUFS for the gain
+        prevent_clipping: Lower the gain if it would push the peak over full scale
+        segments_per_read: 100ms segments decoded and transformed per batch
+
+    Returns:
+        LoudnessResult
+
+    Raises:
+        BassException if BASS can't open the file
+    """
+    st = os.stat(file_path)
+    result = LoudnessResult(Path(file_path), st.st_size, st.st_mtime)
+
+    with Decoder(file_path, buffer=np.empty(1, dtype=np.float32)) as probe:
+        freq, chans = probe.freq, probe.chans
+
+    segment = freq // 10
+    weights = k_weighting(np.fft.rfftfreq(segment, 1.0 / freq))
+    # Parseval for a real FFT: bins other than DC (and Nyquist for even lengths) stand for two
+    weights[1:(segment + 1) // 2] *= 2
+    weights /= segment * segment
+    gains = channel_weights(chans)
+
+    powers = []
+    peak = 0.0
+    carry = np.empty((0, chans), dtype=np.float32)
+    buffer = np.empty(segment * chans * segments_per_read, dtype=np.float32)
+
+    with Decoder(file_path, buffer=buffer) as decoder:
+        result.duration = decoder.duration
+        result.length_bytes = decoder.length_bytes
+
+        for block in decoder.blocks():
+            frames = block[:len(block) - len(block) % chans].reshape(-1, chans)
+            if len(frames) == 0:
+                continue
+
+            peak = max(peak, float(np.abs(frames).max()))
+            if len(carry):
+                frames = np.concatenate((carry, frames))
+
+            count = len(frames) // segment
+            if count:
+                spectra = np.fft.rfft(frames[:count * segment].reshape(count, segment, chans), axis=1)
+                # (segments, bins, chans) -> K-weighted mean square per segment and channel -> channel weighted sum
+                mean_squares = np.einsum("sbc,b->sc", spectra.real ** 2 + spectra.imag ** 2, weights)
+                powers.append(mean_squares @ gains)
+
+            # Copy, the decoder reuses its buffer for the next block
+            carry = frames[count * segment:].copy()
+
+    result.freq, result.chans = freq, chans
+    result.peak = peak
+    result.loudness = integrated_loudness(np.concatenate(powers) if powers else np.empty(0))
+    result.gain = track_gain(result.loudness, peak, reference, prevent_clipping)
+    return result
+
+
+def _analyze(file_path: str, reference: float, prevent_clipping: bool) -> LoudnessResult:
+    # Runs in a worker process
+    try:
+        return analyze(file_path, reference, prevent_clipping)
+    except Exception as exc:
+        return LoudnessResult(Path(file_path), error=exc)
+
+
+def analyze_many(paths: T.Iterable[T.Union[str, Path]], workers: int = None, index: "MetadataIndex" = None,
+                 reference: float = REFERENCE_LUFS, prevent_clipping: bool = True) -> T.Iterator[LoudnessResult]:
+    """
+        Measure many files on a process pool, decoding and the FFTs are CPU bound.
+
+    Args:
+        paths: Music files
+        workers: Number of processes, defaults to the CPU count
+        index: Optional MetadataIndex, files it already has a loudness for are skipped and new results are
+            stored in it
+        reference: Target loudness in LUFS
+        prevent_clipping: See `track_gain`
+
+    Returns:
+        Generator of LoudnessResult in completion order, failures have `error` set
+    """
+    # spawn: a forked child would inherit BASS's state without its threads
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = []
+        for path in paths:
+            measured = None if index is None else index.lookup_loudness(path)
+            if measured is not None:
+                loudness, peak, gain = measured
+                yield LoudnessResult(Path(path), loudness=loudness, peak=peak, gain=gain, cached=True)
+            else:
+                futures.append(pool.submit(_analyze, os.fspath(path), reference, prevent_clipping))
+
+        for future in as_completed(futures):
+            result = future.result()
+            if result.ok is False:
+                log.warning("Couldn't measure the loudness of %s: %r", result.path, result.error)
+            elif index is not None:
+                index.store_loudness(result)
+            yield result
+
+    if index is not None:
+        index.flush()
+
+
+def analyze_playlist(playlist, workers: int = None, reference: float = REFERENCE_LUFS,
+                     prevent_clipping: bool = True) -> int:
+    """
+        Measure every track of a Playlist and record the gains in it (and in its MetadataIndex, if it has one).
+        Songs created afterwards are played at their gain when the playlist has `normalize` set.
+
+    Returns:
+        Number of tracks that got a gain
+    """
+    ids_by_path = {}
+    for track_id in playlist.rows.tolist():
+        ids_by_path.setdefault(playlist.tracks.path(track_id), []).append(track_id)
+
+    count = 0
+    for result in analyze_many(ids_by_path, workers, playlist.index, reference, prevent_clipping):
+        if result.gain is None:
+            continue
+        for track_id in ids_by_path.get(os.fspath(result.path), ()):
+            playlist.set_gain(track_id, result.gain)
+            count += 1
+
+    return count
@@ -0,0 +1,240 @@
+"""
+    Persistent metadata index
+
+    SQLite backed cache of what a library scan learns about each file (duration, decoded length,
+    sample rate, channel count and tags).  Entries are keyed by absolute path and are only trusted
+    while the file's size and modification time are unchanged, so unchanged files never have to be
+    opened by BASS again.   Loudness measurements (see loudness.analyze_many) are kept alongside and survive
+    rescans of unchanged files.
+"""
+from pathlib import Path
+import json
+import logging
+import os
+import sqlite3
+import threading
+import typing as T
+
+from .scanner import ScanResult
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    duration REAL NOT NULL,
+    length_bytes INTEGER NOT NULL,
+    freq INTEGER,
+    chans INTEGER,
+    tags TEXT,
+    loudness REAL,
+    peak REAL,
+    gain REAL
+)
+"""
+
+
+class MetadataIndex:
+    """
+        Usage::
+
+            index = MetadataIndex("library.db")
+            playlist = Playlist(index=index)
+            playlist.add_directory(Path("~/Music").expanduser())
+
+        The connection is shared between threads and guarded by a lock, writes are batched
+        and committed every `batch_size` stores or on `flush`/`close`.
+    """
+
+    SCHEMA_VERSION = 2
+
+    def __init__(self, db_path: T.Union[str, Path], batch_size: int = 500):
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(os.fspath(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            log.debug("Metadata index %s is schema %s, rebuilding as %s", self.db_path, version, self.SCHEMA_VERSION)
+            self._conn.execute("DROP TABLE IF EXISTS tracks")
+            self._conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+
+    @staticmethod
+    def _key(file_path: T.Union[str, Path]) -> str:
+        return os.path.abspath(os.fspath(file_path))
+
+    @staticmethod
+    def _stat(file_path, size: int, mtime: float) -> T.Tuple[T.Optional[int], T.Optional[float]]:
+        if size is None or mtime is None:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                return None, None
+            size, mtime = st.st_size, st.st_mtime
+        return size, mtime
+
+    def lookup(self, file_path: T.Union[str, Path], size: int = None, mtime: float = None) -> ScanResult:
+        """
+            Find a still valid entry for `file_path`
+
+        Args:
+            file_path: A music file
+            size: File size if already known, otherwise the file is stat'd
+            mtime: Modification time if already known
+
+        Returns:
+            ScanResult or None if the file isn't indexed or has changed since it was
+        """
+        size, mtime = self._stat(file_path, size, mtime)
+        if size is None:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT duration, length_bytes, freq, chans, tags, gain FROM tracks WHERE path=? AND size=? AND mtime=?",
+                (self._key(file_path), size, mtime)).fetchone()
+
+        if row is None:
+            return None
+
+        duration, length_bytes, freq, chans, tags, gain = row
+        return ScanResult(Path(file_path), size, mtime,
+                          duration=duration,
+                          length_bytes=length_bytes,
+                          freq=freq,
+                          chans=chans,
+                          tags=json.loads(tags) if tags else {},
+                          gain=gain,
+                          cached=True)
+
+    def store(self, result: ScanResult) -> None:
+        """
+            Add or replace the entry for a successfully probed file.   Failed probes are ignored
+            so they are retried on the next scan.
+        """
+        if result.ok is False or result.duration is None:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO tracks (path, size, mtime, duration, length_bytes, freq, chans, tags)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(path) DO UPDATE SET"
+                " duration=excluded.duration, length_bytes=excluded.length_bytes, freq=excluded.freq,"
+                " chans=excluded.chans, tags=excluded.tags,"
+                # A loudness measured for this very file is still good, one for an older version of it isn't
+                " loudness=CASE WHEN size=excluded.size AND mtime=excluded.mtime THEN loudness END,"
+                " peak=CASE WHEN size=excluded.size AND mtime=excluded.mtime THEN peak END,"
+                " gain=CASE WHEN size=excluded.size AND mtime=excluded.mtime THEN gain END,"
+                " size=excluded.size, mtime=excluded.mtime",
+                (self._key(result.path), result.size, result.mtime,
+                 result.duration, result.length_bytes, result.freq, result.chans,
+                 json.dumps(result.tags) if result.tags else None))
+
+            self._bump()
+
+    def lookup_loudness(self, file_path: T.Union[str, Path], size: int = None,
+                        mtime: float = None) -> T.Optional[T.Tuple[float, float, float]]:
+        """
+            Stored loudness measurement of `file_path`
+
+        Returns:
+            (loudness in LUFS, sample peak, gain in dB), loudness and gain are None for silent files.   None if
+            the file hasn't been measured or has changed since.
+        """
+        size, mtime = self._stat(file_path, size, mtime)
+        if size is None:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT loudness, peak, gain FROM tracks WHERE path=? AND size=? AND mtime=? AND peak IS NOT NULL",
+                (self._key(file_path), size, mtime)).fetchone()
+
+        return None if row is None else tuple(row)
+
+    def lookup_gain(self, file_path: T.Union[str, Path], size: int = None, mtime: float = None) -> T.Optional[float]:
+        measured = self.lookup_loudness(file_path, size, mtime)
+        return None if measured is None else measured[2]
+
+    def store_loudness(self, result) -> None:
+        """
+            Record a loudness.LoudnessResult, creating the entry if the file was never scanned
+        """
+        if result.ok is False or result.peak is None:
+            return
+
+        values = (result.loudness, result.peak, result.gain, self._key(result.path), result.size, result.mtime)
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tracks SET loudness=?, peak=?, gain=? WHERE path=? AND size=? AND mtime=?", values)
+
+            if cursor.rowcount == 0 and result.duration is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO tracks (path, size, mtime, duration, length_bytes, freq, chans,"
+                    " loudness, peak, gain) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (self._key(result.path), result.size, result.mtime, result.duration, result.length_bytes,
+                     result.freq, result.chans, result.loudness, result.peak, result.gain))
+
+            self._bump()
+
+    def forget(self, file_path: T.Union[str, Path]) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tracks WHERE path=?", (self._key(file_path),))
+            self._bump()
+
+    def _bump(self) -> None:
+        # Called with the lock held after every write
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self._conn.commit()
+            self._pending = 0
+
+    def prune(self) -> int:
+        """
+            Drop entries for files that no longer exist.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            paths = [row[0] for row in self._conn.execute("SELECT path FROM tracks")]
+
+        missing = [(path,) for path in paths if os.path.isfile(path) is False]
+        with self._lock:
+            self._conn.executemany("DELETE FROM tracks WHERE path=?", missing)
+            self._conn.commit()
+            self._pending = 0
+
+        return len(missing)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
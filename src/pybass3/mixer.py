@@ -0,0 +1,464 @@
+"""
+    Software mixer
+
+    Needs numpy.   Every Song plays on its own output channel with its own playback buffer, which is fine for a
+    crossfade between two songs but not for dozens of overlapping jingles, ads and beds.   A `Mixer` is a single
+    float output stream (BASS_StreamCreate with a STREAMPROC) that pulls every source it holds into one set of
+    preallocated slabs and sums them with one matrix product per buffer, so adding a source costs a read, not
+    another output channel:
+
+        mixer = Mixer()
+        mixer.add_file("bed.mp3", volume=0.3)
+        jingle = mixer.add_file("jingle.ogg", on_end=lambda source: log.info("jingle done"))
+
+        tone = PushSource(chans=2)
+        mixer.add(tone)
+        tone.push(samples)  # float32 (frames, 2), eg generated speech or a network feed
+
+        mixer.play()
+
+    Decode sources read files from decode-only streams (with their gain and effects), converted to the mixer's
+    sample rate and channel count.   Push sources play whatever the application pushes and silence when it
+    falls behind.   Sources are read on BASS's update thread, so `read` must never block.
+"""
+from collections import deque
+import ctypes
+import logging
+from pathlib import Path
+import threading
+import typing as T
+
+import numpy as np
+
+from .bass_module import Bass
+from .bass_channel import BassChannel
+from .bass_stream import BassStream, STREAMPROC
+from .codes import stream
+from .decoder import Decoder
+from .devices import use_device
+
+if T.TYPE_CHECKING:
+    from .fx import EffectChain
+
+log = logging.getLogger(__name__)
+
+
+class MixerSource:
+    """
+        Something a Mixer can pull float32 (frames, chans) samples from
+    """
+
+    volume: float  # Linear gain, changes are heard from the next buffer on
+    paused: bool  # Paused sources are skipped, they keep their position
+    ended: bool  # Set once the source has nothing more to give, the mixer then removes it
+    on_end: T.Optional[T.Callable[["MixerSource"], None]]  # Called on BASS's update thread when the source ends
+
+    def __init__(self, volume: float = 1.0, on_end: T.Callable[["MixerSource"], None] = None):
+        self.volume = volume
+        self.paused = False
+        self.ended = False
+        self.on_end = on_end
+
+    def convert(self, freq: int, chans: int) -> None:
+        """
+            Set the format `read` has to produce, called when the source is added to a mixer
+        """
+
+    def read(self, out: np.ndarray) -> int:
+        """
+            Fill `out` (frames, chans) with the next frames
+
+        Returns:
+            Number of frames written, the rest of `out` is treated as silence
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class DecodeSource(MixerSource):
+    """
+        A file's decode stream converted to an output sample rate and channel count.   Also used by the
+        offline renderer.
+    """
+
+    def __init__(self, file_path: T.Union[str, Path], gain: float = None, block_frames: int = 16 * 1024,
+                 effects: "EffectChain" = None, volume: float = None,
+                 on_end: T.Callable[[MixerSource], None] = None):
+        """
+
+        Args:
+            file_path: A music file
+            gain: Loudness normalization in dB, sets `volume`
+            block_frames: Frames decoded per read
+            effects: fx.EffectChain applied to the decode stream
+            volume: Linear gain, instead of `gain`
+            on_end: See MixerSource
+
+        Raises:
+            BassException if BASS can't open the file
+        """
+        if volume is None:
+            volume = 1.0 if gain is None else 10 ** (gain / 20)
+        super().__init__(volume, on_end)
+
+        self.file_path = Path(file_path)
+        self.decoder = decoder = Decoder(file_path, prescan=True, block_size=block_frames * 4 * 2)
+        if effects is not None:
+            # FX on a decoding channel are applied as its data is read
+            effects.apply(decoder.handle)
+
+        self._samples = np.frombuffer(decoder.buffer, dtype=np.float32)
+        self.convert(decoder.freq, decoder.chans)
+
+    def __repr__(self):
+        return f"<DecodeSource {self.file_path.name} volume={self.volume}>"
+
+    def convert(self, freq: int, chans: int) -> None:
+        decoder = self.decoder
+        self.chans = chans
+        self.ratio = decoder.freq / freq  # Source frames per output frame
+        self.remaining = int(decoder.length_bytes // (4 * decoder.chans) / self.ratio)  # Output frames
+
+        self._pending = np.empty((0, chans), dtype=np.float32)
+        self._offset = 0
+        self._previous = None  # Last source frame of the previous block, for interpolating across blocks
+        self._position = 1.0  # Next output frame's position, in frames of [previous] + block
+
+    def close(self) -> None:
+        self.decoder.close()
+
+    def read(self, out: np.ndarray) -> int:
+        done = 0
+        wanted = len(out)
+        while done < wanted:
+            if self._offset >= len(self._pending) and self._refill() is False:
+                self.ended = True
+                break
+
+            count = min(wanted - done, len(self._pending) - self._offset)
+            out[done:done + count] = self._pending[self._offset:self._offset + count]
+            self._offset += count
+            done += count
+
+        self.remaining = max(self.remaining - done, 0)
+        return done
+
+    def _refill(self) -> bool:
+        decoder = self.decoder
+        count = decoder.read()
+        if count == 0:
+            return False
+
+        frames = self._samples[:count // 4].reshape(-1, decoder.chans)
+        frames = self._mix_channels(frames)
+        if self.ratio != 1.0:
+            frames = self._resample(frames)
+
+        # Without conversion this is a view of the decoder's buffer, nothing is copied until `read`
+        self._pending = frames
+        self._offset = 0
+        return True
+
+    def _mix_channels(self, frames: np.ndarray) -> np.ndarray:
+        if frames.shape[1] == self.chans:
+            return frames
+        if frames.shape[1] == 1:
+            return np.repeat(frames, self.chans, axis=1)
+        if self.chans == 1:
+            return frames.mean(axis=1, keepdims=True)
+        return frames[:, :self.chans]
+
+    def _resample(self, frames: np.ndarray) -> np.ndarray:
+        # Index 0 is the last frame of the previous block so positions between blocks interpolate too
+        previous = frames[:1] if self._previous is None else self._previous
+        source = np.concatenate((previous, frames))
+        last = len(source) - 1
+
+        count = int((last - self._position) // self.ratio) + 1 if self._position <= last else 0
+        positions = self._position + self.ratio * np.arange(count)
+        indexes = np.arange(len(source))
+        resampled = np.empty((count, self.chans), dtype=np.float32)
+        for chan in range(self.chans):
+            resampled[:, chan] = np.interp(positions, indexes, source[:, chan])
+
+        self._position += count * self.ratio - last
+        self._previous = source[-1:].copy()
+        return resampled
+
+
+class PushSource(MixerSource):
+    """
+        Samples pushed by the application, already in the mixer's format.   Plays silence when nothing is
+        queued and ends once `finish` has been called and everything queued has played.
+    """
+
+    def __init__(self, chans: int = 2, volume: float = 1.0, on_end: T.Callable[[MixerSource], None] = None):
+        super().__init__(volume, on_end)
+        self.chans = chans
+        self.underruns = 0  # Reads that found fewer frames queued than asked for
+        self._lock = threading.Lock()
+        self._queue = deque()
+        self._offset = 0  # Frames of the first queued block already played
+        self._queued = 0  # Frames
+        self._finished = False
+
+    def __repr__(self):
+        return f"<PushSource {self._queued} frames queued volume={self.volume}>"
+
+    @property
+    def queued_frames(self) -> int:
+        return self._queued
+
+    def convert(self, freq: int, chans: int) -> None:
+        if chans != self.chans:
+            raise ValueError(f"PushSource has {self.chans} channels, the mixer {chans}")
+
+    def push(self, samples: np.ndarray) -> None:
+        """
+            Queue float samples, (frames, chans) or interleaved.   They are copied.
+        """
+        block = np.array(samples, dtype=np.float32).reshape(-1, self.chans)
+        with self._lock:
+            if self._finished is True:
+                raise ValueError("PushSource has been finished")
+            self._queue.append(block)
+            self._queued += len(block)
+
+    def finish(self) -> None:
+        """
+            Nothing more will be pushed, the source ends when the queue runs dry
+        """
+        with self._lock:
+            self._finished = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._queue.clear()
+            self._offset = 0
+            self._queued = 0
+
+    def read(self, out: np.ndarray) -> int:
+        done = 0
+        wanted = len(out)
+        with self._lock:
+            while done < wanted and self._queue:
+                block = self._queue[0]
+                count = min(wanted - done, len(block) - self._offset)
+                out[done:done + count] = block[self._offset:self._offset + count]
+                self._offset += count
+                done += count
+                if self._offset == len(block):
+                    self._queue.popleft()
+                    self._offset = 0
+
+            self._queued -= done
+            if done < wanted:
+                if self._finished is True:
+                    self.ended = True
+                else:
+                    self.underruns += 1
+        return done
+
+
+class Mixer:
+    """
+        One float output stream summing any number of MixerSources.
+    """
+
+    def __init__(self, freq: int = 44100, chans: int = 2, device: int = None, end_when_empty: bool = False):
+        """
+
+        Args:
+            freq: Output sample rate
+            chans: Output channel count
+            device: Output device id, None for the calling thread's device
+            end_when_empty: End the output stream once the last source has ended, otherwise it plays silence
+                until sources are added
+        """
+        self.freq = freq
+        self.chans = chans
+        self.device = device
+        self.end_when_empty = end_when_empty
+        self.handle = None
+
+        self._lock = threading.Lock()
+        self._sources = ()  # Replaced, never mutated, the update thread iterates it without locking
+        self._retired = []  # Removed sources, closed by the update thread once it can't be reading them
+        self._slab = np.zeros((0, 0), dtype=np.float32)  # (sources, frames * chans), grown as needed
+        self._volumes = np.zeros(0, dtype=np.float32)
+        self._view_key = None
+        self._view = None
+
+        self._proc = STREAMPROC(self._stream_proc)
+        if device is None:
+            Bass.Init()
+            self.handle = BassStream.Create(freq, chans, self._proc, stream.SAMPLE_FLOAT, resource=self)
+        else:
+            with use_device(device):
+                self.handle = BassStream.Create(freq, chans, self._proc, stream.SAMPLE_FLOAT, resource=self)
+
+    def __repr__(self):
+        return f"<Mixer {self.handle} {len(self._sources)} sources>"
+
+    def __len__(self):
+        return len(self._sources)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def sources(self) -> T.Tuple[MixerSource, ...]:
+        return self._sources
+
+    def add(self, source: MixerSource, volume: float = None) -> MixerSource:
+        """
+            Start mixing `source` in, from the next buffer BASS asks for
+
+        Returns:
+            `source`
+        """
+        source.convert(self.freq, self.chans)
+        if volume is not None:
+            source.volume = volume
+
+        with self._lock:
+            self._sources = self._sources + (source,)
+        return source
+
+    def add_file(self, file_path: T.Union[str, Path], volume: float = None, gain: float = None,
+                 effects: "EffectChain" = None, on_end: T.Callable[[MixerSource], None] = None) -> DecodeSource:
+        """
+            Mix a file in, see DecodeSource
+
+        Raises:
+            BassException if BASS can't open the file
+        """
+        return self.add(DecodeSource(file_path, gain, effects=effects, volume=volume, on_end=on_end))
+
+    def add_song(self, song, volume: float = None,
+                 on_end: T.Callable[[MixerSource], None] = None) -> DecodeSource:
+        """
+            Mix a Song's file in with its gain and effects.   The Song's own stream isn't used.
+        """
+        return self.add(DecodeSource(song.file_path, song.gain, effects=song.effects, volume=volume, on_end=on_end))
+
+    def remove(self, source: MixerSource) -> None:
+        """
+            Stop mixing `source` in.   It is closed on the update thread before the next buffer is mixed (it may be
+            in the middle of being read) or when the mixer is closed.
+        """
+        with self._lock:
+            if source not in self._sources:
+                return
+            self._sources = tuple(item for item in self._sources if item is not source)
+            self._retired.append(source)
+
+    def play(self, restart: bool = False) -> bool:
+        return BassChannel.Play(self.handle, restart)
+
+    def pause(self) -> bool:
+        return BassChannel.Pause(self.handle)
+
+    def stop(self) -> bool:
+        return BassChannel.Stop(self.handle)
+
+    def close(self) -> None:
+        """
+            Free the output stream and every source
+        """
+        if self.handle is not None:
+            # Calls `release`
+            BassStream.Free(self.handle)
+
+    def release(self) -> None:
+        # BassStream.RESOURCES hook, the output stream has been freed so nothing is reading the sources anymore
+        self.handle = None
+        with self._lock:
+            sources, self._sources = self._sources, ()
+            retired, self._retired = self._retired, []
+        for source in retired + list(sources):
+            source.close()
+
+    def _output(self, address: int, length: int) -> np.ndarray:
+        # BASS normally fills the same buffer every time, so the view is normally built once
+        key = (address, length)
+        if key != self._view_key:
+            raw = (ctypes.c_char * length).from_address(address)
+            self._view = np.frombuffer(raw, dtype=np.float32)
+            self._view_key = key
+        return self._view
+
+    def _stream_proc(self, handle, buffer, length, user):
+        # BASS's update thread, must never raise
+        try:
+            return self._mix(buffer, length)
+        except Exception:
+            log.exception("Mixer %s failed to fill its buffer", handle)
+            ctypes.memset(buffer, 0, length)
+            return length
+
+    def _mix(self, buffer: int, length: int) -> int:
+        if self._retired:
+            # Removed before this call, so the last read of them has finished and this one won't see them
+            with self._lock:
+                retired, self._retired = self._retired, []
+            for source in retired:
+                source.close()
+
+        out = self._output(buffer, length)
+        sources = [source for source in self._sources if source.paused is False]
+        count = len(sources)
+        if count == 0:
+            if self.end_when_empty is True and not self._sources:
+                return stream.STREAMPROC_END
+            out.fill(0.0)
+            return length
+
+        width = len(out)
+        if self._slab.shape[0] < count or self._slab.shape[1] < width:
+            self._slab = np.zeros((max(count, self._slab.shape[0]), max(width, self._slab.shape[1])),
+                                  dtype=np.float32)
+            self._volumes = np.zeros(self._slab.shape[0], dtype=np.float32)
+
+        slab = self._slab
+        volumes = self._volumes
+        frames = width // self.chans
+        ended = []
+        for row, source in enumerate(sources):
+            samples = slab[row, :width].reshape(frames, self.chans)
+            try:
+                got = source.read(samples)
+            except Exception:
+                # Drop the source rather than the whole buffer
+                log.exception("Reading %r failed, removing it", source)
+                got = 0
+                source.ended = True
+            if got < frames:
+                samples[got:] = 0.0
+            volumes[row] = source.volume
+            if source.ended is True:
+                ended.append(source)
+
+        # Every source scaled by its volume and summed in one go
+        np.matmul(volumes[:count], slab[:count, :width], out=out)
+
+        if ended:
+            self._finish(ended)
+        return length
+
+    def _finish(self, ended: T.List[MixerSource]):
+        with self._lock:
+            self._sources = tuple(source for source in self._sources if source not in ended)
+
+        for source in ended:
+            source.close()
+            if source.on_end is not None:
+                try:
+                    source.on_end(source)
+                except Exception:
+                    log.exception("on_end of %r failed", source)
@@ -0,0 +1,133 @@
+"""
+    Ordered id index
+
+    A list of ids that also knows where every id is, so both `index[row]` and `index.index(song_id)`
+    are O(1).   Playlist keeps one for the row order of its songs and one for the play queue, which lets
+    a Qt table model ask for rows by number and numbers by song id on every paint of a 100k song playlist.
+
+    Removing an id only marks the positions after it as stale, they are renumbered in one pass the
+    next time a position is asked for so removing many songs in a row stays cheap.
+
+    Ids may repeat (eg a track queued twice), positions then follow list semantics: `index` finds the first
+    occurrence and `remove` drops it.
+"""
+import typing as T
+
+
+class OrderedIndex:
+
+    __slots__ = ("_ids", "_positions", "_repeats", "_stale_from")
+
+    def __init__(self, ids: T.Iterable = ()):
+        self._ids = []
+        self._positions = {}  # id -> position of its first occurrence
+        self._repeats = {}  # id -> occurrences, only for ids that occur more than once
+        self._stale_from = 0
+        self.extend(ids)
+
+    def __repr__(self):
+        return f"<OrderedIndex {len(self._ids)} ids>"
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __contains__(self, item_id):
+        return item_id in self._positions
+
+    def __getitem__(self, row):
+        return self._ids[row]
+
+    def __eq__(self, other):
+        if isinstance(other, OrderedIndex):
+            return self._ids == other._ids
+        return self._ids == other
+
+    def _reindex(self):
+        ids, positions, start = self._ids, self._positions, self._stale_from
+        # Backwards so a repeated id ends up with its first stale occurrence, ids first seen before `start` are
+        # still right
+        for position in range(len(ids) - 1, start - 1, -1):
+            item_id = ids[position]
+            if positions[item_id] >= start:
+                positions[item_id] = position
+        self._stale_from = len(ids)
+
+    def append(self, item_id) -> int:
+        """
+            Add `item_id` at the end
+
+        Returns:
+            Its position
+        """
+        position = len(self._ids)
+        self._ids.append(item_id)
+        if item_id in self._positions:
+            self._repeats[item_id] = self._repeats.get(item_id, 1) + 1
+        else:
+            self._positions[item_id] = position
+        if self._stale_from == position:
+            self._stale_from += 1
+        return position
+
+    def extend(self, ids: T.Iterable) -> None:
+        for item_id in ids:
+            self.append(item_id)
+
+    def index(self, item_id) -> int:
+        """
+            Position of `item_id`, same contract as list.index
+
+        Raises:
+            ValueError if `item_id` isn't indexed
+        """
+        try:
+            position = self._positions[item_id]
+        except KeyError:
+            raise ValueError(f"{item_id!r} is not in the index") from None
+
+        if position >= self._stale_from:
+            self._reindex()
+            position = self._positions[item_id]
+
+        return position
+
+    def get(self, item_id, default: int = None) -> T.Optional[int]:
+        """
+            Position of `item_id` or `default` if it isn't indexed
+        """
+        if item_id not in self._positions:
+            return default
+        return self.index(item_id)
+
+    def remove(self, item_id) -> int:
+        """
+            Drop the first occurrence of `item_id`, everything after it moves up one position.
+
+        Returns:
+            The position it had
+
+        Raises:
+            ValueError if `item_id` isn't indexed
+        """
+        position = self.index(item_id)
+        del self._ids[position]
+        count = self._repeats.pop(item_id, 1) - 1
+        if count > 1:
+            self._repeats[item_id] = count
+        if count == 0:
+            del self._positions[item_id]
+        # A repeated id's next occurrence is found by the renumbering, it is at or after `position`
+        self._stale_from = min(self._stale_from, position)
+        return position
+
+    def clear(self) -> None:
+        self._ids.clear()
+        self._positions.clear()
+        self._repeats.clear()
+        self._stale_from = 0
+
+    def tolist(self) -> list:
+        return list(self._ids)
@@ -11,9 +11,21 @@ import pathlib
 from pathlib import Path
 import random
 import logging
+import typing as T
 
 from .bass_module import BassException
+from .bass_channel import BassChannel
+from .codes import errors
+from .codes import sync
 from .song import Song
+from .scanner import LibraryScanner, ScanResult, ProgressCallback
+from .metadata_index import MetadataIndex
+from .prefetch import Prefetcher
+from .sync import SyncDispatcher
+from .crossfade import Crossfader
+from .fx import EffectChain
+from .ordered_index import OrderedIndex
+from .track_store import TrackStore, TrackInfo, SongsView
 
 log = logging.getLogger(__name__)
 
@@ -39,8 +51,10 @@ class Playlist:
 
     VALID_TYPES = [".mp3", ".mp4", ".ogg", ".opus"]
 
-    songs: dict # The songs the playlist knows about
-    queue: list # The order songs will be played in
+    tracks: TrackStore # Compact storage for every track, song ids are track ids
+    songs: SongsView # track id -> Song, Songs are created on demand
+    rows: OrderedIndex # Song ids in the order they were added, row <-> id in O(1)
+    _queue: OrderedIndex # The order songs will be played in, see the queue property
     state: PlaylistState # Is the playlist playing songs, stopped, or paused?
     mode: PlaylistMode # Is the playlist running sequential or random
     play_mode: PlaylistMode # is the playlist looping the whole queue, just a song, or running to end?
@@ -50,12 +64,22 @@ class Playlist:
     _fade_in_song: Song # if fade_in is not None, this is the next song to play
     _fade_in: int # How soon should the next song start playing, None if lock step
     song_cls: Song # What is the container for a song (eg Song or QtSong)
-
-
-
-    def __init__(self, song_cls = Song):
-        self.songs = {}
-        self.queue = []
+    index: MetadataIndex # Optional persistent cache of song lengths/tags used when scanning directories
+    prefetcher: Prefetcher # Opens the upcoming song in the background, None to disable
+    sync_dispatcher: SyncDispatcher # When set, track changes are driven by BASS syncs instead of tick()
+    crossfader: Crossfader # Volume ramps used when fade_in > 0
+    device: int # Output device songs are played on, None for the calling thread's device
+    normalize: bool # Play songs at their loudness normalization gain, see loudness.analyze_playlist
+    _effects: EffectChain # Native effects every song is played through, see `effects`
+
+
+
+    def __init__(self, song_cls = Song, index: MetadataIndex = None, prefetch: bool = True, sync_events: bool = False,
+                 device: int = None, normalize: bool = False):
+        self.tracks = TrackStore()
+        self.rows = OrderedIndex()
+        self.songs = SongsView(self.tracks, self.rows, self._make_song)
+        self._queue = OrderedIndex()
         self.state = PlaylistState.stopped
         self.mode = PlaylistMode.sequential
         self.play_mode = PlaylistMode.one_time
@@ -68,22 +92,74 @@ class Playlist:
         self._fade_in = 0
         self._fade_in_song = None
         self.song_cls = song_cls
+        self.index = index
+        self.prefetcher = Prefetcher() if prefetch is True else None
+        self.device = device
+        self.normalize = normalize
+        self._effects = None
+
+        self.crossfader = Crossfader()
+
+        self.sync_dispatcher = None
+        self._armed = set() # Stream handles with end/fade syncs registered
+        self._fade_sync = None # (stream handle, HSYNC) of the current song's fade point
+        if sync_events is True:
+            self.use_sync_events()
 
         log.debug("Playlist Initialized")
 
     def free(self):
+        if self.prefetcher is not None:
+            self.prefetcher.shutdown(in_use=(self.current, self.fadein_song))
+
         del self.current
         del self.fadein_song
-        self.songs = []
-        self.queue = []
+        self.songs.clear()
+        self.tracks.clear()
+        self.rows.clear()
+        self._queue.clear()
 
     def clear(self):
         self.free()
 
+    @property
+    def effects(self) -> EffectChain:
+        """
+            Native effects (EQ, compressor, reverb...) applied to every song of the playlist.   Changes reach the
+            playing song right away and the chain follows the playlist from track to track.
+        """
+        if self._effects is None:
+            self._effects = EffectChain()
+            for song in self.songs.cached_songs():
+                song.effects = self._effects
+                if song._handle is not None:
+                    self._effects.apply(song._handle)
+        return self._effects
+
+    def set_device(self, device: int) -> None:
+        """
+            Play on another output device, the current, fading in and prefetched songs move over
+            without interrupting playback.
+
+        Args:
+            device: An initialized device id, see devices.DeviceManager
+        """
+        self.device = device
+        for song in self.songs.cached_songs():
+            song.set_device(device)
+
+
+    @property
+    def queue(self) -> OrderedIndex:
+        return self._queue
+
+    @queue.setter
+    def queue(self, song_ids):
+        self._queue = song_ids if isinstance(song_ids, OrderedIndex) else OrderedIndex(song_ids)
 
     def get_song_by_row(self, row_position:int) -> Song:
         try:
-            key = list(self.songs.keys())[row_position]
+            key = self.rows[row_position]
         except IndexError:
             return None
 
@@ -92,51 +168,206 @@ class Playlist:
     def get_song_by_id(self, song_id) -> Song:
         return self.songs.get(song_id, None)
 
-    def add_song(self, song_path: pathlib.Path, add2queue=True):
+    def get_track_by_row(self, row_position: int) -> TrackInfo:
+        """
+            Path and duration of the track at `row_position` without creating a Song, None past the end
+        """
+        try:
+            return self.tracks.info(self.rows[row_position])
+        except IndexError:
+            return None
+
+    def _make_song(self, track_id: int) -> Song:
+        # The path was checked when the track was added
+        return self.song_cls(self.tracks.path(track_id), duration=self.tracks.duration(track_id), song_id=track_id,
+                             trusted=True, device=self.device, gain=self._track_gain(track_id), effects=self._effects)
+
+    def _track_gain(self, track_id: int):
+        if self.normalize is False:
+            return None
+
+        gain = self.tracks.gain(track_id)
+        if gain is None and self.index is not None:
+            gain = self.index.lookup_gain(self.tracks.path(track_id))
+            self.tracks.set_gain(track_id, gain)
+        return gain
+
+    def set_gain(self, track_id: int, gain: float) -> None:
+        """
+            Record a track's loudness normalization gain in dB, used from the next time its stream is opened
+            when `normalize` is set.
+        """
+        self.tracks.set_gain(track_id, gain)
+        song = self.songs.cached(track_id)
+        if song is not None and self.normalize is True:
+            song.gain = gain
+
+    def get_row_by_id(self, song_id) -> int:
+        """
+            Row of a song in the order songs were added, None if the playlist doesn't have it
+        """
+        return self.rows.get(song_id)
+
+    def get_queue_position_by_id(self, song_id) -> int:
+        """
+            Where a song is in the play queue, None if it isn't queued
+        """
+        return self.queue.get(song_id)
+
+    def remove_song(self, song_id) -> bool:
+        """
+            Take a song out of the playlist and the play queue, stopping it first if it is playing.
+
+        Returns:
+            False if the playlist doesn't have the song
+        """
+        if song_id not in self.tracks:
+            return False
+
+        song = self.songs.cached(song_id)
+        self.songs.discard(song_id)
+        self.tracks.remove(song_id)
+        self.rows.remove(song_id)
+
+        if song is not None and self.prefetcher is not None and self.prefetcher.song is song:
+            self.prefetcher.discard(in_use=(self.current, self.fadein_song))
+        if song is not None and song is self.fadein_song:
+            del self.fadein_song
+        if song is not None and song is self.current:
+            del self.current
+
+        while song_id in self.queue:
+            position = self.queue.remove(song_id)
+            if position < self.queue_position:
+                self.queue_position -= 1
+
+        if song is not None:
+            song.free_stream()
+        return True
+
+    def add_track(self, song_path: pathlib.Path, duration: float = None, add2queue=True, length_bytes: int = None,
+                  gain: float = None) -> int:
+        """
+            Add a track whose length is already known (eg from a library scan) without opening it
+            or creating a Song for it.
+
+        Args:
+            song_path: Path to a music file
+            duration: Length in seconds
+            add2queue: Append the track to the play queue
+            length_bytes: Decoded length in bytes if known
+            gain: Loudness normalization gain in dB if known
+
+        Returns:
+            The track/song id
+        """
+        track_id = self.tracks.add(song_path, duration, length_bytes, gain)
+        self._track_added(track_id, add2queue)
+        return track_id
+
+    def _track_added(self, track_id: int, add2queue: bool):
+        self.rows.append(track_id)
+        if add2queue is True:
+            self.queue.append(track_id)
+
+    def add_song(self, song_path: pathlib.Path, add2queue=True, duration: float = None):
+        """
+
+        Args:
+            song_path: A valid file path to a music file
+            add2queue: Append the song to the play queue
+            duration: Length in seconds if already known, skips opening the file to probe it.
+
+        Returns:
+            The new song or None if it couldn't be loaded
+        """
         log.debug("Playlist.add_song called with %s", song_path)
-        song = self.song_cls(song_path)
+        track_id = self.tracks.add(song_path, duration)
         try:
+            # Created here rather than through self.songs so the path is checked
+            song = self.song_cls(song_path, duration=duration, song_id=track_id, device=self.device,
+                                 gain=self._track_gain(track_id), effects=self._effects)
+            self.songs.adopt(track_id, song)
             song.duration
         except BassException as bexc:
-            if bexc.code == 41:
+            self.songs.discard(track_id)
+            self.tracks.remove(track_id)
+            if bexc.code == errors.ERROR_FILEFORM:
                 # bad formatted song
                 log.error("Unsupported file format: %s", song_path)
                 return None
             log.exception("Failed to properly load: %s", song_path)
+        except BaseException:
+            self.songs.discard(track_id)
+            self.tracks.remove(track_id)
+            raise
 
         else:
             song.free_stream()
-            self.songs[song.id] = song
-            if add2queue is True:
-                self.queue.append(song.id)
+            self.tracks.set_duration(track_id, song.duration)
+            self._track_added(track_id, add2queue)
 
             return song
 
         return None
 
-    def add_directory(self, dir_path: Path, recurse=True):
-        log.debug("Playlist.add_directory called with %s", dir_path)
-
-        files = (file for file in dir_path.iterdir() if file.is_file() and file.suffix in self.VALID_TYPES)
-        dirs = (fdir for fdir in dir_path.iterdir() if fdir.is_dir())
-
-        song_ids = []
+    def iter_directory(self, dir_path: Path, recurse=True, workers: int = None, progress: ProgressCallback = None):
+        """
+            Scan `dir_path` on a pool of worker threads and add each song as soon as it has been probed.
+
+        Args:
+            dir_path: Directory to scan
+            recurse: Descend into sub-directories
+            workers: Number of probe threads, defaults to the CPU count
+            progress: Optional callable(ScanResult, ScanProgress) for reporting throughput
+
+        Returns:
+            Generator of the Songs added
+        """
+        log.debug("Playlist.iter_directory called with %s", dir_path)
+        for track_id in self._scan_directory(dir_path, recurse, workers, progress):
+            yield self.songs[track_id]
+
+    def _scan_directory(self, dir_path: Path, recurse=True, workers: int = None, progress: ProgressCallback = None):
+        # Same as iter_directory but yields track ids, so no Songs are created
+        for result in self.make_scanner(workers, progress).scan(dir_path, recurse):
+            track_id = self.add_scan_result(result)
+            if track_id is not None:
+                yield track_id
+
+    def make_scanner(self, workers: int = None, progress: ProgressCallback = None) -> LibraryScanner:
+        return LibraryScanner(self.VALID_TYPES, workers=workers, progress=progress, index=self.index)
+
+    def add_scan_result(self, result: ScanResult, add2queue=True) -> int:
+        """
+            Add a track from a LibraryScanner result, logging and skipping files that failed to probe.
+
+        Returns:
+            The track id or None
+        """
+        if result.ok is False:
+            if isinstance(result.error, BassException) and result.error.code == errors.ERROR_FILEFORM:
+                log.error("Unsupported file format: %s", result.path)
+            else:
+                log.error("Failed to properly load: %s - %r", result.path, result.error)
+            return None
 
-        for song_path in files:
-            try:
-                song = self.add_song(song_path)
-                if song is not None:
-                    song_ids.append(song.id)
-            except TypeError:
-                pass
+        return self.add_track(result.path, result.duration, add2queue, length_bytes=result.length_bytes,
+                              gain=result.gain)
 
+    def add_scan_results(self, results: T.Iterable[ScanResult], add2queue=True) -> T.List[int]:
+        """
+            `add_scan_result` for a batch, eg from LibraryScanner.scan_batches
 
-        if recurse is True:
-            for fdir in dirs:
-                sub_song_ids = self.add_directory(fdir, recurse)
-                song_ids.extend(sub_song_ids)
+        Returns:
+            Track ids of the results that were added
+        """
+        track_ids = (self.add_scan_result(result, add2queue) for result in results)
+        return [track_id for track_id in track_ids if track_id is not None]
 
-        return song_ids
+    def add_directory(self, dir_path: Path, recurse=True, workers: int = None, progress: ProgressCallback = None):
+        log.debug("Playlist.add_directory called with %s", dir_path)
+        return list(self._scan_directory(dir_path, recurse, workers, progress))
 
     @property
     def fade_in(self):
@@ -145,16 +376,18 @@ class Playlist:
     @fade_in.setter
     def fade_in(self, value):
         self._fade_in = value
+        self._arm_fade(self.current, catch_up=True)
 
     @fade_in.deleter
     def fade_in(self):
         self._fade_in = 0
+        self._arm_fade(self.current)
 
     def set_randomize(self, restart_and_play=True):
         if self.current is not None:
             self.stop()
 
-        ids = list(self.songs.keys())
+        ids = self.rows.tolist()
         random.shuffle(ids)
         self.queue = ids
         self.mode = PlaylistMode.random
@@ -167,7 +400,7 @@ class Playlist:
         if self.current is not None:
             self.stop()
 
-        self.queue = list(self.songs.keys())
+        self.queue = self.rows.tolist()
         self.mode = PlaylistMode.sequential
         if restart_and_play is True:
             self.queue_position = 0
@@ -189,12 +422,15 @@ class Playlist:
         if self._current_song is not None:
             del self.current
 
-        self._current_song = new_song
+        self._current_song = self._ready(new_song)
+        self._pin(self._current_song)
+        self._arm_syncs(self._current_song)
         return self._current_song
 
     @current.deleter
     def current(self):
         if self._current_song is not None:
+            self._unpin(self._current_song)
             self._current_song.stop()
             self._current_song.free_stream()
             self._current_song = None
@@ -221,8 +457,181 @@ class Playlist:
 
 
 
+    def _prefetch_upcoming(self):
+        """
+            Start opening the next song in the background so the track change doesn't stall on disk I/O
+        """
+        if self.prefetcher is not None:
+            self.prefetcher.prefetch(self.upcoming, in_use=(self.current, self.fadein_song))
+
+    @staticmethod
+    def _pin(song: Song):
+        # Keeps the song's stream out of reach of the Song.handle_pool eviction while it is the current song
+        if song is not None and song.handle_pool is not None:
+            song.handle_pool.pin(song)
+
+    @staticmethod
+    def _unpin(song: Song):
+        if song is not None and song.handle_pool is not None:
+            song.handle_pool.unpin(song)
+
+    def _ready(self, song: Song) -> Song:
+        """
+            Make sure a background prefetch of `song` is finished before it is used on this thread
+        """
+        if self.prefetcher is not None and song is not None:
+            self.prefetcher.wait(song)
+        return song
+
+    def use_sync_events(self, dispatcher: SyncDispatcher = None):
+        """
+            Switch from polling with tick() to BASS sync callbacks.   Songs advance, loop and fade in when
+            BASS reports the end/fade position instead of up to a tick late, and tick() becomes a no-op.
+
+            Sync handlers change the playlist from the dispatcher's thread, see SyncDispatcher for how to
+            route them onto an application's own thread.
+
+        Args:
+            dispatcher: Defaults to the process wide SyncDispatcher
+        """
+        self.sync_dispatcher = dispatcher or SyncDispatcher.default()
+        self._arm_syncs(self.current)
+
+    def _arm_syncs(self, song: Song):
+        if self.sync_dispatcher is None or song is None:
+            return
+
+        handle = song.handle
+        if handle in self._armed:
+            return
+
+        self._armed.add(handle)
+        dispatcher = self.sync_dispatcher
+        dispatcher.set_sync(handle, sync.SYNC_FREE, self._on_stream_freed)
+        dispatcher.set_sync(handle, sync.SYNC_END, self._on_end_mixtime, mixtime=True)
+        dispatcher.set_sync(handle, sync.SYNC_END, self._on_end_heard, direct=True)
+        dispatcher.set_sync(handle, sync.SYNC_END, self._on_song_end)
+        self._arm_fade(song)
+
+    def _arm_fade(self, song: Song, catch_up: bool = False):
+        """
+            (Re)place the fade point sync of `song` for the current `fade_in`
+
+        Args:
+            catch_up: Start the fade right away if `song` is already past the new fade point
+        """
+        dispatcher = self.sync_dispatcher
+        if dispatcher is None:
+            return
+
+        if self._fade_sync is not None:
+            handle, hsync = self._fade_sync
+            self._fade_sync = None
+            dispatcher.remove_sync(handle, hsync)
+
+        if song is None or song._handle is None or self.fade_in <= 0:
+            return
+
+        handle = song._handle
+        fade_point = BassChannel.Seconds2Bytes(handle, max(song.duration - self.fade_in, 0))
+        if catch_up is True and BassChannel.GetPositionBytes(handle) >= fade_point:
+            if self.fadein_song is None and self.upcoming is not None:
+                self._begin_fade_in()
+            return
+
+        hsync = dispatcher.set_sync(handle, sync.SYNC_POS, self._on_fade_point, param=fade_point, onetime=True)
+        self._fade_sync = (handle, hsync)
+
+    def _is_current(self, channel: int) -> bool:
+        current = self._current_song
+        return current is not None and current._handle == channel
+
+    def _on_stream_freed(self, channel, data):
+        self._armed.discard(channel)
+        if self._fade_sync is not None and self._fade_sync[0] == channel:
+            self._fade_sync = None
+
+    def _on_end_mixtime(self, channel, data):
+        """
+            Runs on the BASS mixer thread as the end of the current song is mixed.   Looping the same channel
+            from here is seamless.   Only reads attributes and touches the already open handle.
+        """
+        if self.play_mode == PlaylistMode.loop_single and self._is_current(channel):
+            BassChannel.SetPositionByBytes(channel, 0)
+
+    def _on_end_heard(self, channel, data):
+        """
+            Runs on BASS's sync thread as the end of the current song is heard, one playback buffer after it
+            was mixed, and starts the upcoming song if its stream is already open (prefetched).   Songs are
+            never created here, `_on_song_end` catches the playlist up on the dispatcher's thread.
+        """
+        if self.play_mode == PlaylistMode.loop_single or self._fade_in_song is not None:
+            return
+        if self._is_current(channel) is False:
+            return
+
+        try:
+            track_id = self._upcoming_id()
+        except (IndexError, KeyError):
+            # The queue is being changed on the playlist's thread, let _on_song_end sort it out
+            return
+
+        song = None if track_id is None else self.songs.cached(track_id)
+        handle = None if song is None else song._handle
+        if handle is not None:
+            BassChannel.Play(handle, False)
+
+    def _on_song_end(self, channel, data):
+        if self._is_current(channel) is False or self.play_mode == PlaylistMode.loop_single:
+            return
+
+        if self.fadein_song is not None:
+            self.current = self.fadein_song
+            self.fadein_song = None
+            self.queue_position += 1
+            self._prefetch_upcoming()
+        else:
+            self.next()
+
+    def _cancel_fade(self):
+        """
+            Abort a crossfade in progress, the incoming song is freed and the current one is put back to its volume
+        """
+        if self.fadein_song is None:
+            return
+
+        del self.fadein_song
+        if self.current is not None and self.current._handle is not None:
+            self.crossfader.cancel(self.current._handle, self.current.volume)
+
+    def _on_fade_point(self, channel, data):
+        if self._is_current(channel) is False:
+            return
+
+        if self.fadein_song is None and self.upcoming is not None:
+            self._begin_fade_in()
+
+    def _begin_fade_in(self):
+        """
+            Start the upcoming song underneath the current one and crossfade them over whatever is left
+             of the current song, up to `fade_in` seconds.
+        """
+        self.fadein_song = self._ready(self.upcoming)
+
+        seconds = self.fade_in
+        out_handle = None
+        if self.current is not None:
+            seconds = min(seconds, max(self.current.remaining_seconds, 0.0))
+            out_handle = self.current.handle
+
+        self.crossfader.crossfade(out_handle, self.fadein_song.handle, seconds, level=self.fadein_song.volume)
+
     @property
     def upcoming(self) -> Song:
+        song_id = self._upcoming_id()
+        return None if song_id is None else self.songs[song_id]
+
+    def _upcoming_id(self):
         qpos = self.queue_position + 1
         # Is the next song past the queue's length?
         if qpos >= len(self.queue):
@@ -231,9 +640,7 @@ class Playlist:
             else:
                 return None
 
-        song_id = self.queue[qpos]
-
-        return self.songs[song_id]
+        return self.queue[qpos]
 
 
     @property
@@ -271,8 +678,11 @@ class Playlist:
         elif self.current is not None and (self.current.is_paused or self.current.is_stopped):
             self.current.play()
 
+        if self.current is not None:
+            self._prefetch_upcoming()
+
     def play_first(self) -> Song:
-        del self.fadein_song
+        self._cancel_fade()
 
         self.queue_position = 0
         try:
@@ -283,6 +693,7 @@ class Playlist:
             raise RuntimeError("Song queue is corrupt/out of sync with song list")
 
         self.current.play()
+        self._prefetch_upcoming()
 
         return self.current
 
@@ -292,7 +703,7 @@ class Playlist:
             #TODO raise an error here?
             return None
 
-        del self.fadein_song
+        self._cancel_fade()
         del self.current
 
         self.current = song
@@ -301,15 +712,14 @@ class Playlist:
     def play_song_by_index(self, song_index):
         song = self.get_song_by_row(song_index)
 
-        del self.fadein_song
+        self._cancel_fade()
         del self.current
         self.current = song
         self.play()
 
 
     def stop(self):
-        if self.fadein_song is not None:
-            self.fadein_song.stop()
+        self._cancel_fade()
 
         if self.current is not None:
             self.current.stop()
@@ -326,8 +736,7 @@ class Playlist:
 
 
     def restart(self):
-        if self.fadein_song is not None:
-            del self.fadein_song
+        self._cancel_fade()
 
         if self.current is not None:
             return self.current.move2position_seconds(0)
@@ -380,6 +789,8 @@ class Playlist:
         if self.current is not None and self.current.is_playing is False:
             self.current.play()
 
+        self._prefetch_upcoming()
+
         return self.current
 
 
@@ -400,7 +811,7 @@ class Playlist:
     def _previous(self):
         prior = self.prior
         if self.fadein_song is not None:
-            del self.fadein_song
+            self._cancel_fade()
             self.current.move2position_seconds(0)
             self.current.play()
         else:
@@ -419,9 +830,15 @@ class Playlist:
                 else:
                     self.queue_position = 0
 
+        self._prefetch_upcoming()
+
         return self.current
 
     def tick(self):
+        if self.sync_dispatcher is not None:
+            # Event driven, nothing to poll
+            return
+
         remaining = self.current.remaining_bytes
         remaining_seconds = self.current.remaining_seconds
 
@@ -433,15 +850,16 @@ class Playlist:
                 self.current = self.fadein_song
                 self.fadein_song = None
                 self.queue_position += 1
+                self._prefetch_upcoming()
             elif self.fadein_song is None and self.upcoming is not None:
-                self.fadein_song = self.upcoming
-                self.fadein_song.play()
+                self._begin_fade_in()
 
         elif remaining <= 0:
             del self.current
             self.next()
             self.queue_position += 1
             self.current.play()
+            self._prefetch_upcoming()
 
     def items(self):
         # TODO yield from instead?
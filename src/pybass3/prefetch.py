@@ -0,0 +1,128 @@
+"""
+    Next track prefetch
+
+    Opens (and optionally pre-buffers) the song that will play next on a background thread so the
+    track change doesn't have to wait on the disk and the decoder.
+"""
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import logging
+
+from .bass_module import BassException
+from .bass_channel import BassChannel
+
+log = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """
+        Holds at most one prefetched song.   Asking for a different song releases the previous one
+        unless the caller says it is still in use.
+    """
+
+    def __init__(self, prebuffer: bool = True, timeout: float = 2.0):
+        """
+
+        Args:
+            prebuffer: Fill the playback buffer of the prefetched stream as well as opening it
+            timeout: Seconds after which a prefetch that is still opening gets a warning logged.   Callers always
+                wait for it to finish, giving up early would let them open a second stream for the same song
+        """
+        self.prebuffer = prebuffer
+        self.timeout = timeout
+        self._executor = None  # Started by the first prefetch after creation or `shutdown`
+        self._song = None
+        self._future = None
+
+    @property
+    def song(self):
+        return self._song
+
+    @staticmethod
+    def _unpin(song):
+        if song.handle_pool is not None:
+            song.handle_pool.unpin(song)
+
+    def _open(self, song):
+        handle = song.handle
+        if self.prebuffer is True:
+            BassChannel.Update(handle, 0)
+        return handle
+
+    def prefetch(self, song, in_use=()) -> None:
+        """
+            Start opening `song` in the background.
+
+        Args:
+            song: The upcoming song, None just releases whatever was prefetched
+            in_use: Songs that must not be freed if they were the previous prefetch (eg the current song)
+        """
+        if song is self._song:
+            return
+
+        self.discard(in_use)
+        if song is None:
+            return
+
+        self._song = song
+        if song.handle_pool is not None:
+            # Don't let the handle pool close the stream between opening it and the track change
+            song.handle_pool.pin(song)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pybass3-prefetch")
+        self._future = self._executor.submit(self._open, song)
+
+    def wait(self, song) -> bool:
+        """
+            Block until `song`'s prefetch has finished so the caller can use its handle.
+
+        Returns:
+            True if `song` was prefetched and its stream is open
+        """
+        if song is None or song is not self._song or self._future is None:
+            return False
+
+        future, self._song, self._future = self._future, None, None
+        try:
+            self._finish(song, future)
+        except BassException:
+            log.exception("Prefetch of %s failed", song.file_path)
+            return False
+        finally:
+            self._unpin(song)
+
+        return True
+
+    def _finish(self, song, future):
+        # Never return while the worker may still be assigning the song's handle
+        try:
+            future.result(self.timeout)
+        except TimeoutError:
+            log.warning("Prefetch of %s is taking longer than %s seconds", song.file_path, self.timeout)
+            future.result()
+
+    def discard(self, in_use=()) -> None:
+        """
+            Forget the prefetched song, freeing its stream if nothing else is using it.
+        """
+        song, future = self._song, self._future
+        self._song = self._future = None
+        if song is None:
+            return
+
+        try:
+            self._finish(song, future)
+        except Exception:
+            pass
+
+        self._unpin(song)
+        if all(song is not other for other in in_use):
+            song.free_stream()
+
+    def shutdown(self, in_use=()) -> None:
+        """
+            Discard the prefetched song and stop the worker thread, the next `prefetch` starts a new one.
+        """
+        self.discard(in_use)
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
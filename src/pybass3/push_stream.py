@@ -0,0 +1,208 @@
+"""
+    Push streams
+
+    A `PushStream` plays PCM the application produces itself (speech synthesis, generated tones, audio from a
+    network decoder).   Data is handed to BASS_StreamPutData straight from the caller's memory: numpy arrays,
+    bytes, bytearrays, memoryviews, array.array... are pinned for the duration of the call and BASS copies them
+    into its own queue, so nothing is copied on the Python side and the buffer can be reused right away.
+
+    Backpressure keeps latency and memory bounded: `put` waits while more than `max_queued` bytes are waiting to
+    be played.   BASS moves data into the stream's playback buffer (config.BUFFER) as soon as there is room, only
+    what doesn't fit there counts as queued:
+
+        with PushStream(freq=22050, chans=1, max_queued=22050 * 4 // 2) as pushed:  # half a second of float
+            pushed.play()
+            for chunk in tts.synthesize(text):  # float32 numpy arrays
+                pushed.put(chunk, timeout=5.0)
+            pushed.end()
+
+    A stream that isn't playing never drains, so `put` on it waits until its timeout.   See mixer.PushSource to
+    push into a Mixer instead of a stream of its own.
+"""
+import logging
+import threading
+import time
+
+from .bass_module import Bass
+from .bass_channel import BassChannel
+from .bass_stream import BassStream
+from .buffers import PinnedBuffer
+from .codes import channel
+from .codes import data
+from .codes import stream
+from .devices import use_device
+
+log = logging.getLogger(__name__)
+
+
+class PushStream:
+
+    handle: int
+    freq: int  # Sample rate
+    chans: int  # Channel count
+    sample_width: int  # Bytes per sample, 4 for float, 2 for 16 bit
+    max_queued: int  # Bytes `put` lets BASS hold before it waits
+
+    def __init__(self, freq: int = 44100, chans: int = 2, float_samples: bool = True, max_queued: int = None,
+                 device: int = None, flags: int = 0):
+        """
+
+        Args:
+            freq: Sample rate
+            chans: Channel count
+            float_samples: Samples are 32 bit floats, otherwise 16 bit integers
+            max_queued: Bytes that may wait in BASS's queue, on top of the playback buffer, before `put` blocks,
+                defaults to half a second
+            device: Output device id, None for the calling thread's device
+            flags: Any additional codes.stream flags, eg STREAM_DECODE
+        """
+        self.freq = freq
+        self.chans = chans
+        self.sample_width = 4 if float_samples is True else 2
+        self.sample_kind = "f" if float_samples is True else "i"  # numpy dtype kind
+        self.frame_bytes = self.sample_width * chans
+        self.bytes_per_second = freq * self.frame_bytes
+        self.max_queued = self.bytes_per_second // 2 if max_queued is None else max_queued
+        self.ended = False
+
+        self._lock = threading.Lock()
+
+        if float_samples is True:
+            flags |= stream.SAMPLE_FLOAT
+
+        if device is None:
+            Bass.Init()
+            self.handle = BassStream.CreatePush(freq, chans, flags)
+        else:
+            with use_device(device):
+                self.handle = BassStream.CreatePush(freq, chans, flags)
+
+    def __repr__(self):
+        return f"<PushStream {self.handle} {self.freq}Hz {self.chans}ch queued={self.queued}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    @property
+    def queued(self) -> int:
+        """
+            Bytes waiting to be played, 0 once the stream is closed
+        """
+        if self.handle is None:
+            return 0
+
+        queued = BassStream.PutData(self.handle, None, 0)
+        return 0 if queued == data.DW_ERROR else queued
+
+    @property
+    def queued_seconds(self) -> float:
+        return self.queued / self.bytes_per_second
+
+    @property
+    def space(self) -> int:
+        """
+            Bytes that can be put without waiting
+        """
+        return max(self.max_queued - self.queued, 0)
+
+    @property
+    def stalled(self) -> bool:
+        """
+            True if the stream is playing but ran out of data
+        """
+        return BassChannel.IsActive(self.handle) == channel.ACTIVE_STALLED
+
+    def wait(self, nbytes: int = 0, timeout: float = None) -> bool:
+        """
+            Wait until `nbytes` more fit under `max_queued`.   More than `max_queued` only fits an empty queue.
+
+        Returns:
+            False if `timeout` seconds passed first
+        """
+        limit = max(self.max_queued - nbytes, 0)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            excess = self.queued - limit
+            if excess <= 0:
+                return True
+
+            # Sleep about as long as BASS takes to play the excess, but keep an eye on the deadline
+            delay = min(max(excess / self.bytes_per_second, 0.005), 0.05)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                delay = min(delay, remaining)
+            time.sleep(delay)
+
+    def put(self, samples, block: bool = True, timeout: float = None) -> int:
+        """
+            Queue sample data, waiting for room first.
+
+        Args:
+            samples: Any contiguous buffer-protocol object in the stream's sample format, whole frames only
+            block: Wait while the queue is over `max_queued`, otherwise queue regardless
+            timeout: Seconds to wait at most, None to wait as long as it takes
+
+        Returns:
+            Bytes queued in BASS afterwards
+
+        Raises:
+            ValueError if `samples` doesn't match the stream's format or the stream has ended
+            TimeoutError if there was no room within `timeout`
+            BassException if BASS refuses the data
+        """
+        if self.ended is True:
+            raise ValueError("PushStream has ended")
+
+        dtype = getattr(samples, "dtype", None)
+        if dtype is not None and (dtype.itemsize != self.sample_width or dtype.kind != self.sample_kind):
+            raise ValueError(f"{dtype=} doesn't match the stream's {self.sample_width} byte sample format")
+
+        with PinnedBuffer(samples) as pinned:
+            if pinned.nbytes % self.frame_bytes:
+                raise ValueError(f"{pinned.nbytes} bytes isn't a whole number of {self.frame_bytes} byte frames")
+            if pinned.nbytes == 0:
+                return self.queued
+
+            with self._lock:
+                if block is True and self.wait(pinned.nbytes, timeout) is False:
+                    raise TimeoutError(f"No room for {pinned.nbytes} bytes within {timeout}s, {self.queued} queued")
+
+                queued = BassStream.PutData(self.handle, pinned.address, pinned.nbytes)
+
+        if queued == data.DW_ERROR:
+            Bass.RaiseError(f"{self!r}")
+        return queued
+
+    def end(self) -> None:
+        """
+            No more data will be put, the stream ends once the queue has played
+        """
+        if self.ended is True:
+            return
+
+        if BassStream.PutData(self.handle, None, stream.STREAMPROC_END) == data.DW_ERROR:
+            Bass.RaiseError(f"{self!r}")
+        self.ended = True
+
+    def play(self, restart: bool = False) -> bool:
+        return BassChannel.Play(self.handle, restart)
+
+    def pause(self) -> bool:
+        return BassChannel.Pause(self.handle)
+
+    def stop(self) -> bool:
+        return BassChannel.Stop(self.handle)
+
+    def close(self) -> None:
+        if getattr(self, "handle", None) is not None:
+            BassStream.Free(self.handle)
+            self.handle = None
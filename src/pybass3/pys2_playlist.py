@@ -12,6 +12,7 @@ Qt = QtCore.Qt
 
 from .pys2_song import Pys2Song
 from .playlist import Playlist, PlaylistMode
+from .sync import SyncDispatcher
 
 log = logging.getLogger(__name__)
 
@@ -22,46 +23,81 @@ class Pys2Playlist(QtCore.QObject, Playlist):
     the state (play, pause, stop) occurs.
 
     """
-    song_added = QtCore.Signal(str)  # Song ID, Qt DOES NOT like when I try to pass the Song object
+    # Song IDs are integer track ids, object rather than int so they aren't squeezed into a C int
+    song_added = QtCore.Signal(object)  # Song ID, Qt DOES NOT like when I try to pass the Song object
     songs_added = QtCore.Signal(list) # list of Song ID's
-    song_changed = QtCore.Signal(str)  # Song ID
-    music_paused = QtCore.Signal(str)
-    music_playing = QtCore.Signal(str)
-    music_stopped = QtCore.Signal(str)
+    song_removed = QtCore.Signal(object)  # Song ID
+    song_changed = QtCore.Signal(object)  # Song ID
+    music_paused = QtCore.Signal(object)
+    music_playing = QtCore.Signal(object)
+    music_stopped = QtCore.Signal(object)
 
     ticked = QtCore.Signal()
 
-    def __init__(self, tick_precision = 500):
+    _sync_event = QtCore.Signal(object) # carries sync callbacks from BASS threads onto the Qt thread
+
+    def __init__(self, tick_precision = 500, index = None, prefetch = True, device = None, normalize = False):
         QtCore.QObject.__init__(self)
-        Playlist.__init__(self, Pys2Song)
+        Playlist.__init__(self, Pys2Song, index=index, prefetch=prefetch, device=device, normalize=normalize)
         self.ticker = QtCore.QTimer()
         self.ticker.setInterval(tick_precision)
 
         self.ticker.timeout.connect(self.tick)
+        self._sync_event.connect(self._run_sync_event)
 
         log.debug("Initialized playlist: Precision is %s", tick_precision)
 
 
-    def add_song(self, song_path) -> Pys2Song:
+    def add_song(self, song_path, add2queue=True, duration: float = None) -> Pys2Song:
         log.debug("Pys2Playlist.add_song %s", song_path)
-        song = super(Pys2Playlist, self).add_song(song_path)
-        if song is not None:
-            self.song_added.emit(song.id)
+        return super(Pys2Playlist, self).add_song(song_path, add2queue, duration)
 
-        return song
+    def _track_added(self, track_id: int, add2queue: bool):
+        # add_song, add_track and add_directory all end up here
+        super(Pys2Playlist, self)._track_added(track_id, add2queue)
+        self.song_added.emit(track_id)
 
     def get_indexof_song_by_id(self, song_id):
         """
-            Find out where in the songs list a specific song is lcoated.   Only works reliably with
-            Python >= 3.7 where dict is naturally ordered.
-
-            Drastically slower but works for now.
+            Find out where in the songs list a specific song is located.
 
         :param song_id:
-        :return:
+        :return: Row of the song
+        :raises ValueError: if the playlist doesn't have the song
+        """
+        return self.rows.index(song_id)
+
+    def remove_song(self, song_id) -> bool:
+        log.debug("Pys2Playlist.remove_song %s", song_id)
+        was_current = self.current is not None and self.current.id == song_id
+        removed = super(Pys2Playlist, self).remove_song(song_id)
+        if removed is True:
+            if was_current is True:
+                self.music_stopped.emit(song_id)
+            self.song_removed.emit(song_id)
+
+        return removed
+
+    def use_sync_events(self, dispatcher: SyncDispatcher = None):
         """
-        songs = list(self.songs.keys())
-        return songs.index(song_id)
+            Same as Playlist.use_sync_events but by default sync callbacks are queued onto the Qt thread
+        """
+        if dispatcher is None:
+            dispatcher = SyncDispatcher(post=self._sync_event.emit)
+
+        super(Pys2Playlist, self).use_sync_events(dispatcher)
+
+    @QtCore.Slot(object)
+    def _run_sync_event(self, job):
+        job()
+
+    def _on_song_end(self, channel, data):
+        fading = self.fadein_song is not None
+        super(Pys2Playlist, self)._on_song_end(channel, data)
+
+        # next() emits song_changed itself
+        if fading is True and self.current is not None:
+            self.song_changed.emit(self.current.id)
 
     def play(self):
         log.debug("Pys2Playlist.play self.current is %s", self.current)
@@ -90,6 +126,7 @@ class Pys2Playlist(QtCore.QObject, Playlist):
         self.current = self.songs[song_id]
         self.current.play()
         self.ticker.start()
+        self._prefetch_upcoming()
 
         self.song_changed.emit(song_id)
         self.music_playing.emit(song_id)
@@ -138,6 +175,11 @@ class Pys2Playlist(QtCore.QObject, Playlist):
 
     def tick(self):
 
+        if self.sync_dispatcher is not None:
+            # Song changes are driven by BASS syncs, the timer only keeps the UI refreshing
+            self.ticked.emit()
+            return
+
         if self.current is not None:
             remaining = self.current.remaining_bytes
             remaining_seconds = self.current.remaining_seconds
@@ -160,12 +202,12 @@ class Pys2Playlist(QtCore.QObject, Playlist):
                 self.current = self.fadein_song
                 self.fadein_song = None
                 self.queue_position += 1
+                self._prefetch_upcoming()
                 self.song_changed.emit(self.current.id)
 
             elif self.fadein_song is None and self.upcoming is not None:
                 log.debug("TICK - fading in song")
-                self.fadein_song = self.upcoming
-                self.fadein_song.play()
+                self._begin_fade_in()
 
         elif remaining <= 0 and self.current is not None:
             log.debug("TICK - current is finished, moving to next song")
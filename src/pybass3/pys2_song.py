@@ -12,14 +12,15 @@ class Pys2Song(QtCore.QObject, Song):
 
     timer: QtCore.QTimer
 
-    def __init__(self, file_path, precision: int = 500):
+    def __init__(self, file_path, precision: int = 500, **kwargs):
         """
 
         :param file_path: A valid file path to a music file
         :param precision: how often, in milliseconds, to pulse/emit song position in seconds
+        :param kwargs: passed through to Song, eg duration, buffer or reader
         """
         QtCore.QObject.__init__(self)
-        Song.__init__(self, file_path)
+        Song.__init__(self, file_path, **kwargs)
 
         self.timer = QtCore.QTimer(self)
         self.timer.setInterval(precision)
@@ -41,7 +42,7 @@ class Pys2Song(QtCore.QObject, Song):
          this entire thing crash and burn than create a growing memory leak.
         Returns: None
         """
-        self.free_stream()
+        super(Pys2Song, self).__del__()
 
     def play(self):
         super(Pys2Song, self).play()
@@ -0,0 +1,222 @@
+"""
+    Python readers as BASS file streams
+
+    `FileProcs` turns any object with `readinto` (and optionally `seek`/`tell`) into the BASS_FILEPROCS
+    callbacks used by `BassStream.CreateFileUser`.  BASS hands the read callback its own buffer and
+    `readinto` writes straight into it, so no intermediate bytes objects are created per read.
+
+    Usage::
+
+        archive = zipfile.ZipFile("album.zip")
+        song = Song.from_reader(archive.open("01.mp3"), name="01.mp3")
+        song.play()
+
+    `AsyncReaderAdapter` wraps a coroutine based reader (eg an object store client) so it can be
+    used the same way from BASS's file thread.
+"""
+import asyncio
+import concurrent.futures
+import ctypes
+import io
+import logging
+import os
+import typing as T
+
+from .structs.stream import BASS_FILEPROCS, FILECLOSEPROC, FILELENPROC, FILEREADPROC, FILESEEKPROC
+from .codes import stream
+from .codes.data import DW_ERROR
+
+log = logging.getLogger(__name__)
+
+
+class FileProcs:
+    """
+        Owns the ctypes callbacks for one user file stream.   BASS calls these from whichever thread
+        is reading the file so they must never raise, errors are logged and reported to BASS as a failed read.
+    """
+
+    procs: BASS_FILEPROCS
+    system: int  # Recommended codes.stream STREAMFILE_xxx for this reader
+
+    def __init__(self, reader, length: int = None, close_reader: bool = False):
+        """
+
+        Args:
+            reader: Object with `readinto`, seekable readers should also provide `seek`, `tell` and `seekable`
+            length: Total size in bytes if known, otherwise it is looked up from the reader (0 = unknown)
+            close_reader: Close `reader` when BASS is done with the stream
+        """
+        if hasattr(reader, "readinto") is False:
+            raise TypeError(f"{reader!r} has no readinto method")
+
+        self.reader = reader
+        self.close_reader = close_reader
+        self.seekable = bool(getattr(reader, "seekable", lambda: False)())
+        self.base = reader.tell() if self.seekable else 0
+        self.length = length if length is not None else self._find_length()
+        self.system = stream.STREAMFILE_NOBUFFER if self.seekable else stream.STREAMFILE_BUFFER
+
+        # Keep references to the ctypes callbacks, if they are garbage collected BASS calls freed memory
+        self._close = FILECLOSEPROC(self._on_close)
+        self._length = FILELENPROC(self._on_length)
+        self._read = FILEREADPROC(self._on_read)
+        self._seek = FILESEEKPROC(self._on_seek)
+        self.procs = BASS_FILEPROCS(self._close, self._length, self._read, self._seek)
+
+    def __repr__(self):
+        return f"<FileProcs {self.reader!r} {self.length=}>"
+
+    def _find_length(self) -> int:
+        try:
+            return os.fstat(self.reader.fileno()).st_size - self.base
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            pass
+
+        if self.seekable:
+            end = self.reader.seek(0, io.SEEK_END)
+            self.reader.seek(self.base)
+            return end - self.base
+
+        return 0
+
+    def _on_close(self, user):
+        if self.close_reader is True:
+            try:
+                self.reader.close()
+            except Exception:
+                log.exception("Failed to close %r", self.reader)
+
+    def _on_length(self, user):
+        return self.length
+
+    def _on_read(self, buffer, length, user):
+        try:
+            view = memoryview((ctypes.c_char * length).from_address(buffer)).cast("B")
+            count = self.reader.readinto(view)
+        except Exception:
+            log.exception("Read of %s bytes from %r failed", length, self.reader)
+            return DW_ERROR
+
+        # None means a non-blocking reader had nothing available
+        return count or 0
+
+    def _on_seek(self, offset, user):
+        if self.seekable is False:
+            return False
+
+        try:
+            self.reader.seek(self.base + offset)
+        except Exception:
+            log.exception("Seek to %s in %r failed", offset, self.reader)
+            return False
+
+        return True
+
+    def release(self) -> None:
+        """
+            Called by BassStream.Free once BASS has closed the stream.   A seekable reader is put back where
+            it was when this adapter was made so another stream can be created from the same adapter.
+        """
+        if self.seekable and self.close_reader is False:
+            try:
+                self.reader.seek(self.base)
+            except Exception:
+                log.exception("Failed to rewind %r", self.reader)
+
+
+class AsyncReaderAdapter(io.RawIOBase):
+    """
+        Blocking file-like front for a coroutine based reader, for use with `FileProcs`.
+
+        The reader needs an `async readinto(buffer)` or `async read(size)` method and optionally
+        `async seek(offset)`.   Every call is run on `loop` and waited on from BASS's thread, which means
+        the stream must not be created or read from the loop's own thread (use `loop.run_in_executor`).
+    """
+
+    def __init__(self, reader, loop: asyncio.AbstractEventLoop, size: int = None, timeout: float = 30.0):
+        """
+
+        Args:
+            reader: Coroutine based reader
+            loop: The event loop `reader` belongs to
+            size: Total size in bytes if known, required for seeking
+            timeout: Seconds to wait for each read before reporting an error to BASS.   A timed out call is
+                cancelled and the adapter is broken from then on, every later read fails
+        """
+        super(AsyncReaderAdapter, self).__init__()
+        self.reader = reader
+        self.loop = loop
+        self.size = size
+        self.timeout = timeout
+        self._position = 0
+        self._seek_pending = False
+        self.broken = False
+
+    def _run(self, coro) -> T.Any:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self.loop:
+            coro.close()
+            raise RuntimeError("AsyncReaderAdapter can't block on its own event loop, create the stream in an executor")
+
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(self.timeout)
+        except concurrent.futures.TimeoutError:
+            # The reader's position is unknown from here on, and a late result must not be mistaken for the next
+            future.cancel()
+            self.broken = True
+            raise
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return self.size is not None and hasattr(self.reader, "seek")
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            if self.size is None:
+                raise io.UnsupportedOperation("Seeking from the end needs the reader's size")
+            offset += self.size
+
+        # Deferred to the next read so seeking never blocks, eg FileProcs finding the length on the loop's thread
+        self._seek_pending = offset != self._position or self._seek_pending
+        self._position = offset
+        return offset
+
+    def readinto(self, buffer) -> int:
+        if self.broken is True:
+            raise OSError(f"{self.reader!r} timed out earlier, its position is unknown")
+
+        if self._seek_pending is True:
+            self._run(self.reader.seek(self._position))
+            self._seek_pending = False
+
+        if hasattr(self.reader, "readinto"):
+            # Released if the read times out, so a reader still running can't write into a buffer BASS has reused
+            view = memoryview(buffer)
+            try:
+                count = self._run(self.reader.readinto(view))
+            except concurrent.futures.TimeoutError:
+                try:
+                    view.release()
+                except BufferError:
+                    log.warning("%r still holds a slice of the read buffer after timing out", self.reader)
+                raise
+        else:
+            # Only a read(size) api, one copy into the BASS buffer can't be avoided
+            data = self._run(self.reader.read(len(buffer)))
+            count = len(data)
+            buffer[:count] = data
+
+        self._position += count or 0
+        return count
@@ -0,0 +1,253 @@
+"""
+    Offline rendering
+
+    Needs numpy.   Renders a Playlist (or any list of files) into a 16 bit PCM WAV file as fast as the CPU allows:
+    every track is read from a decode-only stream, so nothing waits on a sound card, and the playlist's gain,
+    effects and crossfades are applied the way playback applies them.   Crossfade envelopes come from the same
+    `FadeCurve.points` breakpoints the Crossfader slides through, so a rendered fade matches what is heard.
+
+    Usage::
+
+        playlist.fade_in = 4  # seconds of crossfade between tracks, 0 for gapless
+        stats = Renderer().render_playlist(playlist, "mix.wav")
+        print(f"{stats.seconds:.0f}s of audio at {stats.realtime:.0f}x realtime")
+
+    Blocks are mixed in one preallocated float32 buffer and converted into one preallocated int16 buffer that
+    is handed to `wave` without copying.   Tracks with another sample rate or channel count than the output are
+    converted with linear interpolation / simple up and down mixing, BASS only resamples during playback.
+"""
+import dataclasses
+import logging
+import os
+from pathlib import Path
+import time
+import typing as T
+import wave
+
+import numpy as np
+
+from .bass_module import BassException
+from .crossfade import FadeCurve
+from .mixer import DecodeSource
+
+if T.TYPE_CHECKING:
+    from .fx import EffectChain
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_FRAMES = 16 * 1024
+SCALE = 32767  # float -> int16
+
+# (file path, gain in dB or None)
+RenderItem = T.Tuple[T.Union[str, Path], T.Optional[float]]
+
+
+@dataclasses.dataclass
+class RenderStats:
+    path: Path
+    freq: int = 0
+    chans: int = 0
+    tracks: int = 0  # Tracks rendered
+    skipped: int = 0  # Tracks that couldn't be opened
+    frames: int = 0  # Frames written
+    elapsed: float = 0.0  # Wall clock seconds
+
+    @property
+    def seconds(self) -> float:
+        """
+            Length of the rendered audio
+        """
+        return self.frames / self.freq if self.freq else 0.0
+
+    @property
+    def realtime(self) -> float:
+        """
+            Seconds of audio rendered per second of wall clock time
+        """
+        return self.seconds / self.elapsed if self.elapsed else 0.0
+
+
+class Renderer:
+
+    def __init__(self, freq: int = None, chans: int = None, curve: FadeCurve = None, segments: int = None,
+                 block_frames: int = DEFAULT_BLOCK_FRAMES):
+        """
+
+        Args:
+            freq: Output sample rate, defaults to the first track's
+            chans: Output channel count, defaults to the first track's
+            curve: Crossfade curve, defaults to the playlist crossfader's or equal power
+            segments: Breakpoints of curves other than linear, defaults to the playlist crossfader's or 8
+            block_frames: Frames mixed and written per block
+        """
+        self.freq = freq
+        self.chans = chans
+        self.curve = curve
+        self.segments = segments
+        self.block_frames = block_frames
+
+        self._curve_x = None
+        self._curve_y = None
+
+        self._mix = None
+        self._aux = None
+        self._pcm = None
+
+    def render_song(self, song, out_path: T.Union[str, Path]) -> RenderStats:
+        """
+            Transcode one Song (with its gain and effects) to WAV
+        """
+        return self.render([(song.file_path, song.gain)], out_path, effects=song.effects)
+
+    def render_playlist(self, playlist, out_path: T.Union[str, Path], fade: float = None) -> RenderStats:
+        """
+            Render the playlist's queue from the first track to the last, with its gains (when it has `normalize`
+            set), its effects and its crossfades.   Loop modes are ignored, the queue is rendered once.
+
+        Args:
+            playlist: A Playlist
+            out_path: WAV file to write
+            fade: Crossfade seconds, defaults to the playlist's `fade_in`
+        """
+        items = [(playlist.tracks.path(track_id), playlist._track_gain(track_id)) for track_id in playlist.queue]
+        fade = playlist.fade_in if fade is None else fade
+        crossfader = playlist.crossfader
+        return self.render(items, out_path, fade=fade, effects=playlist._effects,
+                           curve=self.curve or crossfader.curve, segments=self.segments or crossfader.segments)
+
+    def render(self, items: T.Iterable[RenderItem], out_path: T.Union[str, Path], fade: float = 0.0,
+               effects: "EffectChain" = None, curve: FadeCurve = None, segments: int = None) -> RenderStats:
+        """
+            Render files one after the other into a WAV file.
+
+        Args:
+            items: (file path, gain in dB or None) pairs
+            out_path: WAV file to write, replaced if it exists
+            fade: Seconds the next track overlaps the end of the previous one, 0 for gapless
+            effects: Applied to every track
+            curve: Crossfade curve, defaults to the renderer's
+            segments: Breakpoints of the curve, defaults to the renderer's
+
+        Returns:
+            RenderStats, also logged
+
+        Raises:
+            ValueError if none of the files could be opened
+        """
+        started = time.perf_counter()
+        stats = RenderStats(Path(out_path))
+        curve = curve or self.curve or FadeCurve.equal_power
+        positions, gains = zip(*curve.points(segments or self.segments or 8))
+        self._curve_x = np.array(positions)
+        self._curve_y = np.array(gains)
+
+        pending = list(items)
+
+        current = self._open_next(pending, stats, effects)
+        if current is None:
+            raise ValueError("Nothing to render, no file could be opened")
+
+        with wave.open(os.fspath(out_path), "wb") as writer:
+            writer.setnchannels(stats.chans)
+            writer.setsampwidth(2)
+            writer.setframerate(stats.freq)
+            self._allocate(stats.chans)
+            fade_frames = int(fade * stats.freq) if fade else 0
+
+            while current is not None:
+                upcoming = self._open_next(pending, stats, effects) if pending else None
+
+                if upcoming is None:
+                    self._copy(current, None, writer, stats)
+                else:
+                    # The playlist starts the next song `fade` seconds before the end and fades over what is left
+                    overlap = min(fade_frames, current.remaining)
+                    self._copy(current, current.remaining - overlap, writer, stats)
+                    if overlap:
+                        self._crossfade(current, upcoming, overlap, writer, stats)
+                    else:
+                        self._copy(current, None, writer, stats)
+
+                current.close()
+                current = upcoming
+
+        stats.elapsed = time.perf_counter() - started
+        log.info("Rendered %d tracks, %.1fs of audio in %.2fs (%.1fx realtime) to %s", stats.tracks, stats.seconds,
+                 stats.elapsed, stats.realtime, stats.path)
+        return stats
+
+    def _open_next(self, pending: list, stats: RenderStats, effects: "EffectChain") -> T.Optional[DecodeSource]:
+        while pending:
+            file_path, gain = pending.pop(0)
+            try:
+                source = DecodeSource(file_path, gain, self.block_frames, effects)
+            except BassException as bexc:
+                log.warning("Skipping %s, couldn't open it: %s", file_path, bexc)
+                stats.skipped += 1
+                continue
+
+            if stats.freq == 0:
+                stats.freq = self.freq or source.decoder.freq
+                stats.chans = self.chans or source.decoder.chans
+            source.convert(stats.freq, stats.chans)
+
+            stats.tracks += 1
+            return source
+
+        return None
+
+    def _allocate(self, chans: int):
+        shape = (self.block_frames, chans)
+        if self._mix is None or self._mix.shape != shape:
+            self._mix = np.empty(shape, dtype=np.float32)
+            self._aux = np.empty(shape, dtype=np.float32)
+            self._pcm = np.empty(shape, dtype=np.int16)
+
+    def _write(self, count: int, writer: wave.Wave_write, stats: RenderStats):
+        mix = self._mix[:count]
+        np.clip(mix, -1.0, 1.0, out=mix)
+        mix *= SCALE
+        np.rint(mix, out=mix)
+        pcm = self._pcm[:count]
+        np.copyto(pcm, mix, casting="unsafe")
+        writer.writeframesraw(memoryview(pcm))
+        stats.frames += count
+
+    def _copy(self, source: DecodeSource, frames: T.Optional[int], writer: wave.Wave_write, stats: RenderStats):
+        # `frames` frames of `source` at its volume, None for everything that is left
+        done = 0
+        while frames is None or done < frames:
+            wanted = self.block_frames if frames is None else min(self.block_frames, frames - done)
+            count = source.read(self._mix[:wanted])
+            if count == 0:
+                break
+
+            if source.volume != 1.0:
+                self._mix[:count] *= source.volume
+            self._write(count, writer, stats)
+            done += count
+
+    def _envelope(self, positions: np.ndarray) -> np.ndarray:
+        return np.interp(positions, self._curve_x, self._curve_y).astype(np.float32)
+
+    def _crossfade(self, outgoing: DecodeSource, incoming: DecodeSource, frames: int, writer: wave.Wave_write,
+                   stats: RenderStats):
+        done = 0
+        while done < frames:
+            count = min(self.block_frames, frames - done)
+            mix = self._mix[:count]
+            aux = self._aux[:count]
+
+            got = outgoing.read(mix)
+            mix[got:] = 0.0
+            got = incoming.read(aux)
+            aux[got:] = 0.0
+
+            positions = (np.arange(done, done + count) + 0.5) / frames
+            # Fading out walks the fade-in curve backwards, as Crossfader.fade does
+            mix *= (self._envelope(1.0 - positions) * outgoing.volume)[:, None]
+            aux *= (self._envelope(positions) * incoming.volume)[:, None]
+            mix += aux
+
+            self._write(count, writer, stats)
+            done += count
@@ -0,0 +1,291 @@
+"""
+    Library scanner
+
+    Walks a directory tree with `os.scandir` and probes every music file on a pool of worker threads
+    using decode-only BASS streams (no output device, no playback buffer).  Results are streamed back
+    as they become available so a UI can show tracks while the rest of the library is still being read.
+"""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+import dataclasses
+import logging
+import os
+import time
+import typing as T
+
+from .bass_module import Bass, BassException
+from .bass_channel import BassChannel
+from .bass_stream import BassStream
+
+if T.TYPE_CHECKING:
+    from .metadata_index import MetadataIndex
+
+log = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class ScanResult:
+    path: Path
+    size: int  # File size in bytes
+    mtime: float  # File modification time
+    duration: float = None  # Seconds
+    length_bytes: int = None  # Decoded length in bytes
+    freq: int = None  # Sample rate
+    chans: int = None  # Channel count
+    tags: dict = None  # Lower case tag name to value, see BassChannel.GetTags
+    gain: float = None  # Loudness normalization gain in dB, only known from a MetadataIndex
+    cached: bool = False  # True if this came from a MetadataIndex instead of BASS
+    error: Exception = None  # Set if the file couldn't be read or BASS couldn't open it
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclasses.dataclass
+class ScanProgress:
+    found: int = 0  # Files matching VALID_TYPES seen by the directory walk
+    probed: int = 0  # Files that have been handed back to the caller
+    cached: int = 0  # Files answered by the metadata index without opening them
+    failed: int = 0  # Files BASS refused to open
+    started: float = dataclasses.field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        """
+            Throughput in files per second
+        """
+        elapsed = self.elapsed
+        return self.probed / elapsed if elapsed > 0 else 0.0
+
+
+ProgressCallback = T.Callable[[ScanResult, ScanProgress], None]
+
+
+class LibraryScanner:
+    """
+        Finds and probes music files.
+
+        `scan` is a generator, results come back in directory walk order (files of a directory
+        first, then its sub-directories) unless `ordered` is False in which case they are handed back as
+        soon as a worker finishes with them.
+    """
+
+    def __init__(self, valid_types: T.Iterable[str],
+                 workers: int = None,
+                 progress: ProgressCallback = None,
+                 ordered: bool = True,
+                 index: "MetadataIndex" = None):
+        """
+
+        Args:
+            valid_types: File suffixes (including the leading period) to probe, eg [".mp3", ".ogg"]
+            workers: Number of probe threads, defaults to the CPU count
+            progress: Optional callable(result, progress) called for every file handed back
+            ordered: Keep walk order instead of completion order
+            index: Optional MetadataIndex, unchanged files are answered from it and new probes are stored in it
+        """
+        self.valid_types = frozenset(valid_types)
+        self.workers = workers or os.cpu_count() or 4
+        self.progress_cb = progress
+        self.ordered = ordered
+        self.index = index
+        self.progress = ScanProgress()
+
+    def walk(self, dir_path: T.Union[str, Path], recurse: bool = True) -> T.Iterator[os.DirEntry]:
+        """
+            Iterative scandir walk, each directory is listed exactly once.
+
+        Args:
+            dir_path: Directory to start from
+            recurse: Descend into sub-directories
+
+        Returns:
+            Generator of os.DirEntry for every matching file
+        """
+        pending = [os.fspath(dir_path)]
+
+        while pending:
+            current = pending.pop()
+            sub_dirs = []
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_file():
+                                if os.path.splitext(entry.name)[1] in self.valid_types:
+                                    yield entry
+                            elif recurse is True and entry.is_dir():
+                                sub_dirs.append(entry.path)
+                        except OSError:
+                            log.exception("Unable to stat %s", entry.path)
+            except OSError:
+                log.exception("Unable to read directory %s", current)
+                continue
+
+            # reversed so the first sub directory is walked first
+            pending.extend(reversed(sub_dirs))
+
+    @classmethod
+    def probe(cls, file_path: T.Union[str, Path], size: int = None, mtime: float = None) -> ScanResult:
+        """
+            Opens `file_path` as a decode-only stream, reads its length, format and tags, and frees it.
+
+        Args:
+            file_path: A music file
+            size: File size if already known (eg from os.DirEntry.stat)
+            mtime: Modification time if already known
+
+        Returns:
+            ScanResult with `error` set if BASS couldn't open the file
+        """
+        file_path = Path(file_path)
+        if size is None or mtime is None:
+            st = file_path.stat()
+            size, mtime = st.st_size, st.st_mtime
+
+        result = ScanResult(file_path, size, mtime)
+        try:
+            handle = BassStream.CreateDecodeFile(bytes(file_path))
+        except BassException as bexc:
+            result.error = bexc
+            return result
+
+        try:
+            cls.describe(result, handle)
+        finally:
+            BassStream.Free(handle)
+
+        return result
+
+    @staticmethod
+    def describe(result: ScanResult, handle: int) -> ScanResult:
+        """
+            Fill `result` with the length, format and tags of an open stream, or its `error` if BASS
+            can't tell how long the stream is
+        """
+        result.length_bytes = BassChannel.GetLengthBytes(handle)
+        result.duration = BassChannel.GetLengthSeconds(handle, result.length_bytes)
+        if result.duration < 0:
+            error = Bass.GetError()
+            result.error = BassException(error.code, error.desc, f"length of {result.path}")
+            result.length_bytes = result.duration = None
+            return result
+
+        info = BassChannel.GetInfo(handle)
+        if info is not None:
+            result.freq = info.freq
+            result.chans = info.chans
+        result.tags = BassChannel.GetTags(handle)
+        return result
+
+    def _probe_entry(self, entry: os.DirEntry) -> ScanResult:
+        try:
+            st = entry.stat()
+        except OSError as exc:
+            return ScanResult(Path(entry.path), 0, 0.0, error=exc)
+
+        return self.probe(entry.path, st.st_size, st.st_mtime)
+
+    def _submit(self, pool: ThreadPoolExecutor, entry: os.DirEntry) -> Future:
+        if self.index is not None:
+            try:
+                st = entry.stat()
+            except OSError:
+                pass
+            else:
+                cached = self.index.lookup(entry.path, st.st_size, st.st_mtime)
+                if cached is not None:
+                    future = Future()
+                    future.set_result(cached)
+                    return future
+
+        return pool.submit(self._probe_entry, entry)
+
+    def _report(self, result: ScanResult) -> ScanResult:
+        self.progress.probed += 1
+        if result.ok is False:
+            self.progress.failed += 1
+        elif result.cached is True:
+            self.progress.cached += 1
+        elif self.index is not None:
+            self.index.store(result)
+
+        if self.progress_cb is not None:
+            self.progress_cb(result, self.progress)
+
+        return result
+
+    def scan(self, dir_path: T.Union[str, Path], recurse: bool = True) -> T.Iterator[ScanResult]:
+        """
+            Walk and probe `dir_path`, yielding a ScanResult per file as it becomes available.
+
+            The number of in-flight probes is bounded so a huge library doesn't queue up
+            tens of thousands of futures before the first result is handed back.
+
+        Args:
+            dir_path: Directory to scan
+            recurse: Descend into sub-directories
+
+        Returns:
+            Generator of ScanResult
+        """
+        Bass.InitForDecoding()
+        self.progress = ScanProgress()
+        window = self.workers * 4
+        in_flight = deque()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pybass3-scan") as pool:
+            for entry in self.walk(dir_path, recurse):
+                self.progress.found += 1
+                in_flight.append(self._submit(pool, entry))
+
+                while in_flight and (len(in_flight) >= window or in_flight[0].done()):
+                    yield self._report(in_flight.popleft().result())
+
+                if self.ordered is False:
+                    for future in [f for f in in_flight if f.done()]:
+                        in_flight.remove(future)
+                        yield self._report(future.result())
+
+            while in_flight:
+                yield self._report(in_flight.popleft().result())
+
+        if self.index is not None:
+            self.index.flush()
+
+        log.debug("Scanned %s files in %.2f seconds (%.1f files/s)",
+                  self.progress.probed, self.progress.elapsed, self.progress.rate)
+
+    def scan_batches(self, dir_path: T.Union[str, Path], recurse: bool = True, size: int = 256,
+                     interval: float = 0.5) -> T.Iterator[T.List[ScanResult]]:
+        """
+            `scan` in lists, for callers that hand results over to another thread and shouldn't do so per file.
+
+        Args:
+            dir_path: Directory to scan
+            recurse: Descend into sub-directories
+            size: Most results per list
+            interval: Seconds after which a list is handed back even if it isn't full, so a slow scan still
+                shows up as it goes
+
+        Returns:
+            Generator of lists of ScanResult
+        """
+        batch = []
+        started = 0.0
+        for result in self.scan(dir_path, recurse):
+            if not batch:
+                started = time.perf_counter()
+            batch.append(result)
+            if len(batch) >= size or time.perf_counter() - started >= interval:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
@@ -1,72 +1,245 @@
 from pathlib import Path
-import typing as T
-from uuid import uuid4
+import itertools
 import logging
+import os
+import stat
+import threading
+import typing as T
 
 from .datatypes import HANDLE
 from .bass_module import Bass
-from .bass_channel import BassChannel
+from .bass_channel import BassChannel, ChannelSnapshot
 from .bass_stream import BassStream
+from .codes import attrib
+from .devices import use_device, move_channel
+from .readers import FileProcs
+from .handle_pool import HandlePool
+from .scanner import LibraryScanner, ScanResult
+
+if T.TYPE_CHECKING:
+    from .fx import EffectChain
 
 log = logging.getLogger(__name__)
 
-class Song:
+# Shared by every Song class so ids stay unique across them, next() on a count is atomic under the GIL
+_song_ids = itertools.count(1)
+# Taken while a handle is detached from its song so two threads can't both free it.  Reentrant because __del__
+# can run on a thread that already holds it.
+_handle_lock = threading.RLock()
+
+
+class BaseSong:
+    """
+        Everything a Song does, without deciding how instances store their attributes.   Use `Song`
+        (regular instances, can be subclassed freely eg Pys2Song) or `SlimSong` (__slots__, for holding
+        many songs at once).
+    """
+    __slots__ = ()
+
+    metadata_index = None # Optional MetadataIndex shared by all songs, consulted for lengths and filled by streams opened for one
+    handle_pool: HandlePool = None # Optional HandlePool shared by all songs, caps how many streams are open at once
+    reaper: T.Callable[[HANDLE], None] = None # Frees the handles of collected songs, see control.PlaylistController
 
     _handle: HANDLE
     _handle_length: float # Seconds
     _handle_position: float # Seconds
     file_path: Path
+    device: T.Optional[int] # Output device id, None for the calling thread's device
+    gain: T.Optional[float] # Loudness normalization in dB, None to play at full volume
+    effects: T.Optional["EffectChain"] # Native effects put on the stream when it is opened
+
+    def __init__(self, file_path: T.Union[str, Path], duration: float = None, buffer=None, reader=None, song_id=None,
+                 trusted: bool = False, device: int = None, gain: float = None, effects: "EffectChain" = None):
+        """
 
-    def __init__(self, file_path: T.Union[str, Path]):
-        super(Song, self).__init__()
-        Bass.Init()
+        Args:
+            file_path: A valid file path to a music file, or just a name when `buffer` is given
+            duration: Length in seconds if already known (eg from a library scan), avoids opening a stream
+                just to find out how long the song is.
+            buffer: Optional buffer-protocol object holding the whole encoded file, see `from_buffer`
+            reader: Optional file-like object with `readinto` to stream the encoded file from, see `from_reader`
+            song_id: Id to use instead of the next integer id, eg the song's track id in a Playlist
+            trusted: Skip checking that `file_path` is a file, for paths that came from a scan or an index
+            device: Output device the stream is created on (see devices.DeviceManager), None for the
+                calling thread's device
+            gain: Loudness normalization in dB (see loudness.analyze), applied as the stream's volume
+                when it is opened
+            effects: fx.EffectChain applied to the stream whenever it is opened
+        """
+        super(BaseSong, self).__init__()
+        self._handle = None
 
-        self._id = uuid4().hex
+        self._id = next(_song_ids) if song_id is None else song_id
         self.file_path = Path(file_path)
-        if self.file_path.exists() is False:
-            raise ValueError(f"{file_path} doesn't exist")
+        self._buffer = buffer
+        self._file_procs = FileProcs(reader) if reader is not None else None
 
-        if self.file_path.is_file() is False:
-            raise ValueError(f"{file_path=} is not a valid file")
+        if buffer is None and reader is None and trusted is False:
+            try:
+                mode = os.stat(file_path).st_mode
+            except FileNotFoundError:
+                raise ValueError(f"{file_path} doesn't exist") from None
 
+            if stat.S_ISREG(mode) is False:
+                raise ValueError(f"{file_path=} is not a valid file")
 
-        self._handle = None
-        self._handle_length = None # Length in seconds
+        self._handle_length = duration # Length in seconds
         self._handle_position = 0 # Current position in the song, in seconds
+        self._snapshot = None # Reused by snapshot()
+        self.device = device
+        self.gain = gain
+        self.effects = effects
+
+    @classmethod
+    def from_buffer(cls, buffer, name: T.Union[str, Path] = "memory", **kwargs) -> "Song":
+        """
+            Play an encoded file straight out of memory, eg a slice of a memory-mapped pack file or
+            a RAM cache.   Nothing is copied, the buffer is pinned while the stream is open.
+
+        Args:
+            buffer: bytes, bytearray, memoryview, mmap.mmap or any other contiguous buffer-protocol object
+            name: Label used in place of a file path
+
+        Returns:
+            Song (or subclass) instance
+        """
+        return cls(name, buffer=buffer, **kwargs)
+
+    @classmethod
+    def from_reader(cls, reader, name: T.Union[str, Path] = "reader", **kwargs) -> "Song":
+        """
+            Stream an encoded file from any file-like object (zip/tar members, decrypting wrappers,
+            readers.AsyncReaderAdapter...) without writing it to a temporary file first.
+
+            Seekable readers are rewound when the stream is freed so the song can be played again,
+            an unseekable reader can only be played through once.
+
+        Args:
+            reader: Object with a `readinto` method
+            name: Label used in place of a file path
+
+        Returns:
+            Song (or subclass) instance
+        """
+        return cls(name, reader=reader, **kwargs)
 
     def __del__(self):
         """
-            Ensure that the BASS library file handle is freed.
+            Ensure that the BASS library file handle is freed.   With a `reaper` set the handle is handed to it
+            instead, as __del__ runs on whichever thread dropped the last reference.
 
         :return:
         """
-        self.free_stream()
+        reaper = BaseSong.reaper
+        if reaper is None:
+            self.free_stream()
+            return
+
+        with _handle_lock:
+            handle, self._handle = getattr(self, "_handle", None), None
+
+        if handle is not None:
+            if self.handle_pool is not None:
+                self.handle_pool.forget(self)
+            reaper(handle)
 
     @property
     def id(self):
         return self._id
 
     def _create_stream(self):
-        self._handle = BassStream.CreateFile(False, bytes(self.file_path))
-        self._handle_length = BassChannel.GetLengthSeconds(self._handle, BassChannel.GetLengthBytes(self.handle))
+        if self.device is None:
+            Bass.Init()
+            self._open_stream()
+        else:
+            # Streams are created on the calling thread's device, which may be any thread
+            with use_device(self.device):
+                self._open_stream()
+
+        if self.gain is not None:
+            BassChannel.SetAttribute(self._handle, attrib.ATTRIB_VOL, self.volume)
+
+        if self.effects is not None:
+            self.effects.apply(self._handle)
+
+        if self.handle_pool is not None:
+            self.handle_pool.opened(self)
+
+    @property
+    def volume(self) -> float:
+        """
+            Linear volume the song plays at, 1.0 unless it has a normalization gain
+        """
+        return 1.0 if self.gain is None else 10 ** (self.gain / 20)
+
+    def _open_stream(self):
+        if self._buffer is not None:
+            self._handle = BassStream.CreateFromMemory(self._buffer)
+        elif self._file_procs is not None:
+            self._handle = BassStream.CreateFileUser(self._file_procs)
+        else:
+            self._handle = BassStream.CreateFile(False, bytes(self.file_path))
+        self._handle_length = BassChannel.GetLengthSeconds(self._handle, BassChannel.GetLengthBytes(self._handle))
+
+    def set_device(self, device: int) -> None:
+        """
+            Play on another output device from now on, an open stream is moved there without interruption.
+
+        Raises:
+            BassException if `device` isn't initialized
+        """
+        if self._handle is not None and device is not None:
+            move_channel(self._handle, device)
+        self.device = device
 
     def free_stream(self) -> None:
         """
-            Stop this music file from playing and frees its file handle from the BASS library.
+            Stop this music file from playing and frees its file handle from the BASS library.   Safe to call
+            from several threads at once, only one of them frees the stream.
 
             :raises
             BassException - If there is an issue releasing the file handle (eg it never existed).
         """
-        if self._handle is not None:
+        with _handle_lock:
+            handle = self._handle
+            if handle is None:
+                return
 
-            if self.is_playing or self.is_paused:
+            if BassChannel.IsPlaying(handle) or BassChannel.IsPaused(handle):
                 self.stop()
+            self._handle = None
 
-            retval = BassStream.Free(self._handle)
-            if retval is not True:
-                Bass.RaiseError()
+        if self.handle_pool is not None:
+            self.handle_pool.forget(self)
 
-        self._handle = None
+        self.free_handle(handle)
+
+    @staticmethod
+    def free_handle(handle: HANDLE) -> None:
+        """
+            Free a stream handle no Song owns anymore
+
+        Raises:
+            BassException
+        """
+        retval = BassStream.Free(handle)
+        # Once BASS itself is freed (eg at exit) every stream is already gone
+        if retval is not True and Bass.LIB_INITED is True:
+            Bass.RaiseError(f"{handle=}")
+
+    def snapshot(self, level: bool = True) -> ChannelSnapshot:
+        """
+            State, position, length and level in one call, for UIs refreshing many times a second.
+            The same ChannelSnapshot object is refreshed and returned on every call.
+
+        Args:
+            level: Also read the peak level
+
+        Returns:
+            ChannelSnapshot
+        """
+        self._snapshot = BassChannel.Snapshot(self.handle, self._snapshot, level)
+        return self._snapshot
 
     @property
     def position(self) -> float:
@@ -86,11 +259,30 @@ class Song:
 
     @property
     def duration(self) -> float:
-        if self._handle is None:
+        indexed = self.metadata_index is not None and self._buffer is None and self._file_procs is None
+        if self._handle_length is None and indexed is True:
+            entry = self.metadata_index.lookup(self.file_path)
+            if entry is not None:
+                self._handle_length = entry.duration
+
+        if self._handle_length is None:
             self._create_stream()
+            if indexed is True:
+                self._index_stream()
 
         return self._handle_length
 
+    def _index_stream(self):
+        # Store what the stream that was just opened says about the file, so the next lookup doesn't open it
+        try:
+            st = os.stat(self.file_path)
+        except OSError:
+            return
+
+        # Failed lookups aren't stored
+        self.metadata_index.store(LibraryScanner.describe(ScanResult(self.file_path, st.st_size, st.st_mtime),
+                                                          self._handle))
+
     @property
     def duration_bytes(self) -> int:
         return BassChannel.GetLengthBytes(self.handle)
@@ -120,6 +312,8 @@ class Song:
     def handle(self) -> HANDLE:
         if self._handle is None:
             self._create_stream()
+        elif self.handle_pool is not None:
+            self.handle_pool.touch(self)
 
         return self._handle
 
@@ -184,3 +378,18 @@ class Song:
 
     def __hash__(self):
         return hash(self.file_path)
+
+
+class Song(BaseSong):
+    """
+        The standard song, instances have a __dict__ so subclasses and callers can add attributes.
+    """
+
+
+class SlimSong(BaseSong):
+    """
+        A Song without a per instance __dict__, roughly half the memory of a Song.   It can't be given
+        extra attributes and subclasses need their own __slots__.
+    """
+    __slots__ = ("_id", "file_path", "_buffer", "_file_procs", "_handle", "_handle_length", "_handle_position",
+                 "_snapshot", "device", "gain", "effects", "__weakref__")
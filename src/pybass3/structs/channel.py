@@ -0,0 +1,16 @@
+import ctypes
+
+from ..datatypes import DWORD
+
+
+# Channel info structure
+class BASS_CHANNELINFO(ctypes.Structure):
+    _fields_ = [('freq', DWORD),  # default playback rate
+                ('chans', DWORD),  # channels
+                ('flags', DWORD),  # BASS_SAMPLE/STREAM/MUSIC/SPEAKER flags
+                ('ctype', DWORD),  # type of channel
+                ('origres', DWORD),  # original resolution
+                ('plugin', DWORD),  # plugin
+                ('sample', DWORD),  # sample
+                ('filename', ctypes.c_char_p)  # filename
+                ]
@@ -0,0 +1,114 @@
+import ctypes
+
+from ..datatypes import DWORD, BOOL
+from ..codes import fx
+
+
+class BASS_DX8_CHORUS(ctypes.Structure):
+    _fields_ = [('fWetDryMix', ctypes.c_float),
+                ('fDepth', ctypes.c_float),
+                ('fFeedback', ctypes.c_float),
+                ('fFrequency', ctypes.c_float),
+                ('lWaveform', DWORD),  # 0=triangle, 1=sine
+                ('fDelay', ctypes.c_float),
+                ('lPhase', DWORD)  # DX8_PHASE_xxx
+                ]
+
+
+class BASS_DX8_COMPRESSOR(ctypes.Structure):
+    _fields_ = [('fGain', ctypes.c_float),
+                ('fAttack', ctypes.c_float),
+                ('fRelease', ctypes.c_float),
+                ('fThreshold', ctypes.c_float),
+                ('fRatio', ctypes.c_float),
+                ('fPredelay', ctypes.c_float)
+                ]
+
+
+class BASS_DX8_DISTORTION(ctypes.Structure):
+    _fields_ = [('fGain', ctypes.c_float),
+                ('fEdge', ctypes.c_float),
+                ('fPostEQCenterFrequency', ctypes.c_float),
+                ('fPostEQBandwidth', ctypes.c_float),
+                ('fPreLowpassCutoff', ctypes.c_float)
+                ]
+
+
+class BASS_DX8_ECHO(ctypes.Structure):
+    _fields_ = [('fWetDryMix', ctypes.c_float),
+                ('fFeedback', ctypes.c_float),
+                ('fLeftDelay', ctypes.c_float),
+                ('fRightDelay', ctypes.c_float),
+                ('lPanDelay', BOOL)
+                ]
+
+
+class BASS_DX8_FLANGER(ctypes.Structure):
+    _fields_ = [('fWetDryMix', ctypes.c_float),
+                ('fDepth', ctypes.c_float),
+                ('fFeedback', ctypes.c_float),
+                ('fFrequency', ctypes.c_float),
+                ('lWaveform', DWORD),  # 0=triangle, 1=sine
+                ('fDelay', ctypes.c_float),
+                ('lPhase', DWORD)  # DX8_PHASE_xxx
+                ]
+
+
+class BASS_DX8_GARGLE(ctypes.Structure):
+    _fields_ = [('dwRateHz', DWORD),  # Rate of modulation in hz
+                ('dwWaveShape', DWORD)  # 0=triangle, 1=square
+                ]
+
+
+class BASS_DX8_I3DL2REVERB(ctypes.Structure):
+    _fields_ = [('lRoom', ctypes.c_int),  # [-10000, 0]      default: -1000 mB
+                ('lRoomHF', ctypes.c_int),  # [-10000, 0]      default: 0 mB
+                ('flRoomRolloffFactor', ctypes.c_float),  # [0.0, 10.0]      default: 0.0
+                ('flDecayTime', ctypes.c_float),  # [0.1, 20.0]      default: 1.49s
+                ('flDecayHFRatio', ctypes.c_float),  # [0.1, 2.0]       default: 0.83
+                ('lReflections', ctypes.c_int),  # [-10000, 1000]   default: -2602 mB
+                ('flReflectionsDelay', ctypes.c_float),  # [0.0, 0.3]       default: 0.007 s
+                ('lReverb', ctypes.c_int),  # [-10000, 2000]   default: 200 mB
+                ('flReverbDelay', ctypes.c_float),  # [0.0, 0.1]       default: 0.011 s
+                ('flDiffusion', ctypes.c_float),  # [0.0, 100.0]     default: 100.0 %
+                ('flDensity', ctypes.c_float),  # [0.0, 100.0]     default: 100.0 %
+                ('flHFReference', ctypes.c_float)  # [20.0, 20000.0]  default: 5000.0 Hz
+                ]
+
+
+class BASS_DX8_PARAMEQ(ctypes.Structure):
+    _fields_ = [('fCenter', ctypes.c_float),
+                ('fBandwidth', ctypes.c_float),
+                ('fGain', ctypes.c_float)
+                ]
+
+
+class BASS_DX8_REVERB(ctypes.Structure):
+    _fields_ = [('fInGain', ctypes.c_float),  # [-96.0,0.0]            default: 0.0 dB
+                ('fReverbMix', ctypes.c_float),  # [-96.0,0.0]            default: 0.0 db
+                ('fReverbTime', ctypes.c_float),  # [0.001,3000.0]         default: 1000.0 ms
+                ('fHighFreqRTRatio', ctypes.c_float)  # [0.001,0.999]          default: 0.001
+                ]
+
+
+class BASS_FX_VOLUME_PARAM(ctypes.Structure):
+    _fields_ = [('fTarget', ctypes.c_float),
+                ('fCurrent', ctypes.c_float),
+                ('fTime', ctypes.c_float),
+                ('lCurve', DWORD)
+                ]
+
+
+# Effect type -> its parameter struct
+PARAMETERS = {
+    fx.FX_DX8_CHORUS: BASS_DX8_CHORUS,
+    fx.FX_DX8_COMPRESSOR: BASS_DX8_COMPRESSOR,
+    fx.FX_DX8_DISTORTION: BASS_DX8_DISTORTION,
+    fx.FX_DX8_ECHO: BASS_DX8_ECHO,
+    fx.FX_DX8_FLANGER: BASS_DX8_FLANGER,
+    fx.FX_DX8_GARGLE: BASS_DX8_GARGLE,
+    fx.FX_DX8_I3DL2REVERB: BASS_DX8_I3DL2REVERB,
+    fx.FX_DX8_PARAMEQ: BASS_DX8_PARAMEQ,
+    fx.FX_DX8_REVERB: BASS_DX8_REVERB,
+    fx.FX_VOLUME: BASS_FX_VOLUME_PARAM,
+}
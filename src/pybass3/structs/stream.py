@@ -0,0 +1,18 @@
+import ctypes
+
+from ..datatypes import func_type, DWORD, QWORD, BOOL
+
+
+# User file stream callback functions
+FILECLOSEPROC = func_type(None, ctypes.c_void_p)
+FILELENPROC = func_type(QWORD, ctypes.c_void_p)
+FILEREADPROC = func_type(DWORD, ctypes.c_void_p, DWORD, ctypes.c_void_p)
+FILESEEKPROC = func_type(BOOL, QWORD, ctypes.c_void_p)
+
+
+class BASS_FILEPROCS(ctypes.Structure):
+    _fields_ = [('close', FILECLOSEPROC),
+                ('length', FILELENPROC),
+                ('read', FILEREADPROC),
+                ('seek', FILESEEKPROC)
+                ]
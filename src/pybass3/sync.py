@@ -0,0 +1,187 @@
+"""
+    Sync dispatch
+
+    BASS calls sync procs on its own threads.   `SyncDispatcher` registers Python callables as channel syncs
+    through a single ctypes trampoline and decides where they run:
+
+    * mixtime syncs run immediately on the BASS mixer thread, they must be quick and are meant for
+      sample accurate work like looping a channel.
+    * direct syncs run on BASS's sync thread as the event is heard, for work that must happen right then
+      without a trip through `post`, like starting the next channel.   They must be just as quick.
+    * everything else is handed to `post`, by default a queue drained by one daemon thread.  A Qt app can
+      post through a queued signal and an asyncio app through `loop.call_soon_threadsafe`.
+
+    Usage::
+
+        dispatcher = SyncDispatcher()
+        dispatcher.set_sync(song.handle, sync.SYNC_END, lambda channel, data: print("finished"))
+"""
+import functools
+import itertools
+import logging
+import queue
+import threading
+import typing as T
+
+from .bass_module import Bass
+from .bass_channel import BassChannel, SYNCPROC
+from .codes import sync
+
+log = logging.getLogger(__name__)
+
+SyncCallback = T.Callable[[int, int], None]  # callback(channel, data)
+
+
+class SyncDispatcher:
+
+    _default = None
+
+    def __init__(self, post: T.Callable[[T.Callable[[], None]], None] = None):
+        """
+
+        Args:
+            post: Called from a BASS thread with a no argument callable that must be run on the consumer's thread.
+                Defaults to an internal worker thread.
+        """
+        self._lock = threading.Lock()
+        self._keys = itertools.count(1)
+        self._callbacks = {}  # key -> (callback, run on the BASS thread)
+        self._channels = {}  # channel handle -> {key: HSYNC}
+        self._proc = SYNCPROC(self._trampoline)
+
+        self._queue = None
+        self._thread = None
+        if post is None:
+            self._queue = queue.SimpleQueue()
+            post = self._queue.put
+
+        self._post = post
+
+    @classmethod
+    def default(cls) -> "SyncDispatcher":
+        """
+            Process wide dispatcher running callbacks on its own worker thread
+        """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def _ensure_worker(self):
+        if self._queue is not None and self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="pybass3-sync", daemon=True)
+            self._thread.start()
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            job()
+
+    @staticmethod
+    def _run(callback: SyncCallback, channel: int, data: int):
+        try:
+            callback(channel, data)
+        except Exception:
+            log.exception("Sync callback %r failed", callback)
+
+    def _trampoline(self, hsync, channel, data, user):
+        # Called on a BASS thread, must never raise
+        entry = self._callbacks.get(user)
+        if entry is None:
+            return
+
+        callback, inline = entry
+        if inline is True:
+            self._run(callback, channel, data)
+        else:
+            self._post(functools.partial(self._run, callback, channel, data))
+
+    def _on_free(self, channel, data):
+        with self._lock:
+            for key in self._channels.pop(channel, {}):
+                self._callbacks.pop(key, None)
+
+    def set_sync(self, handle: int, sync_type: int, callback: SyncCallback,
+                 param: int = 0, mixtime: bool = False, onetime: bool = False, direct: bool = False) -> int:
+        """
+            Register `callback(channel, data)` for a sync on `handle`.   Registrations are forgotten
+            automatically when the channel is freed.
+
+        Args:
+            handle: A valid Bass stream handle
+            sync_type: codes.sync SYNC_xxx type
+            callback: Called with the channel handle and the type specific data value
+            param: Type specific, eg the byte position for SYNC_POS
+            mixtime: Run on the mixer thread as soon as the sync triggers instead of being posted
+            onetime: Remove the sync after it has fired once
+            direct: Run on BASS's sync thread when the event is heard instead of being posted, only BASS calls on
+                already open handles belong there
+
+        Returns:
+            Sync handle
+
+        Raises:
+            BassException
+        """
+        self._ensure_worker()
+
+        with self._lock:
+            first = handle not in self._channels
+            if first:
+                self._channels[handle] = {}
+
+        if first:
+            self._register(handle, sync.SYNC_FREE | sync.SYNC_MIXTIME, 0, self._on_free, True)
+
+        return self._register(handle, sync_type | (sync.SYNC_ONETIME if onetime else 0), param, callback, mixtime,
+                              direct)
+
+    def _register(self, handle, sync_type, param, callback, mixtime, direct=False) -> int:
+        key = next(self._keys)
+        with self._lock:
+            self._callbacks[key] = (callback, mixtime or direct)
+
+        if mixtime is True:
+            sync_type |= sync.SYNC_MIXTIME
+
+        hsync = BassChannel.SetSync(handle, sync_type, param, self._proc, key)
+        if hsync == 0:
+            with self._lock:
+                self._callbacks.pop(key, None)
+            Bass.RaiseError(f"{handle=} {sync_type=}")
+
+        with self._lock:
+            self._channels.setdefault(handle, {})[key] = hsync
+
+        return hsync
+
+    def remove_sync(self, handle: int, hsync: int) -> bool:
+        with self._lock:
+            syncs = self._channels.get(handle, {})
+            for key, value in list(syncs.items()):
+                if value == hsync:
+                    del syncs[key]
+                    self._callbacks.pop(key, None)
+
+        return BassChannel.RemoveSync(handle, hsync)
+
+    def remove_all(self, handle: int) -> None:
+        """
+            Remove every sync this dispatcher registered on `handle` (except its own free handler)
+        """
+        with self._lock:
+            syncs = self._channels.get(handle, {})
+            removable = [(key, hsync) for key, hsync in syncs.items() if self._callbacks.get(key, (None,))[0] != self._on_free]
+            for key, _ in removable:
+                del syncs[key]
+                self._callbacks.pop(key, None)
+
+        for _, hsync in removable:
+            BassChannel.RemoveSync(handle, hsync)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,230 @@
+"""
+    Columnar track store
+
+    A Playlist used to hold one Song object per file; a uuid string, a Path and for Pys2Song a QObject and
+    a QTimer, whether or not the song was ever played.   `TrackStore` keeps only what a playlist needs for
+    every track in flat columns:
+
+    * track ids are integers, the row of the track in the store
+    * paths are split into an interned table of directories and a file name
+    * durations, decoded lengths and normalization gains live in `array` columns, NaN / -1 when not known yet
+
+    `SongsView` is the `Playlist.songs` mapping on top of it.   Looking up a track id creates the Song on
+    demand and keeps it in a weak cache, so only the songs that are playing, prefetched or otherwise held on
+    to exist as objects.
+"""
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+import math
+import os
+import typing as T
+import weakref
+
+
+class TrackInfo(T.NamedTuple):
+    id: int
+    path: str
+    duration: T.Optional[float]
+    length_bytes: T.Optional[int]
+    gain: T.Optional[float] = None  # Loudness normalization gain in dB
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def duration_time(self) -> str:
+        duration = self.duration or 0
+        return f"{int(duration // 60):02}:{int(duration % 60):02}"
+
+
+class TrackStore:
+    """
+        Usage::
+
+            store = TrackStore()
+            track_id = store.add("/music/album/01.mp3", duration=181.4)
+            store.path(track_id)
+    """
+
+    def __init__(self):
+        self._dir_ids = {}  # directory -> index into _dirs
+        self._dirs = []
+        self._dir = array("I")  # per track, index into _dirs
+        self._names = []  # per track, file name or None once removed
+        self._durations = array("d")  # per track, seconds or NaN
+        self._length_bytes = array("q")  # per track, decoded length or -1
+        self._gains = array("d")  # per track, loudness normalization gain in dB or NaN
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, track_id):
+        return isinstance(track_id, int) and 0 <= track_id < len(self._names) and self._names[track_id] is not None
+
+    def __iter__(self) -> T.Iterator[int]:
+        return (track_id for track_id, name in enumerate(self._names) if name is not None)
+
+    def _check(self, track_id: int):
+        if track_id not in self:
+            raise KeyError(track_id)
+
+    def add(self, file_path: T.Union[str, Path], duration: float = None, length_bytes: int = None,
+            gain: float = None) -> int:
+        """
+            Add a track
+
+        Args:
+            file_path: Path to the music file
+            duration: Length in seconds if known
+            length_bytes: Decoded length in bytes if known
+            gain: Loudness normalization gain in dB if known
+
+        Returns:
+            The new track's id
+        """
+        directory, name = os.path.split(os.fspath(file_path))
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = self._dir_ids[directory] = len(self._dirs)
+            self._dirs.append(directory)
+
+        track_id = len(self._names)
+        self._dir.append(dir_id)
+        self._names.append(name)
+        self._durations.append(math.nan if duration is None else duration)
+        self._length_bytes.append(-1 if length_bytes is None else length_bytes)
+        self._gains.append(math.nan if gain is None else gain)
+        self._count += 1
+        return track_id
+
+    def remove(self, track_id: int) -> None:
+        """
+            Forget a track, ids are never reused
+        """
+        self._check(track_id)
+        self._names[track_id] = None
+        self._durations[track_id] = math.nan
+        self._length_bytes[track_id] = -1
+        self._gains[track_id] = math.nan
+        self._count -= 1
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def path(self, track_id: int) -> str:
+        self._check(track_id)
+        return os.path.join(self._dirs[self._dir[track_id]], self._names[track_id])
+
+    def duration(self, track_id: int) -> T.Optional[float]:
+        self._check(track_id)
+        duration = self._durations[track_id]
+        return None if math.isnan(duration) else duration
+
+    def length_bytes(self, track_id: int) -> T.Optional[int]:
+        self._check(track_id)
+        length = self._length_bytes[track_id]
+        return None if length < 0 else length
+
+    def set_duration(self, track_id: int, duration: float, length_bytes: int = None) -> None:
+        self._check(track_id)
+        self._durations[track_id] = math.nan if duration is None else duration
+        if length_bytes is not None:
+            self._length_bytes[track_id] = length_bytes
+
+    def gain(self, track_id: int) -> T.Optional[float]:
+        self._check(track_id)
+        gain = self._gains[track_id]
+        return None if math.isnan(gain) else gain
+
+    def set_gain(self, track_id: int, gain: T.Optional[float]) -> None:
+        self._check(track_id)
+        self._gains[track_id] = math.nan if gain is None else gain
+
+    def info(self, track_id: int) -> TrackInfo:
+        """
+            Everything known about a track without creating a Song, for table views and the like
+        """
+        return TrackInfo(track_id, self.path(track_id), self.duration(track_id), self.length_bytes(track_id),
+                         self.gain(track_id))
+
+    def total_duration(self) -> float:
+        """
+            Sum of the known durations
+        """
+        return math.fsum(duration for duration in self._durations if not math.isnan(duration))
+
+
+class SongsView(Mapping):
+    """
+        Read only `track id -> Song` mapping over a TrackStore.   Songs are created by `factory` on first
+        access and cached weakly, ordering follows `order` (the playlist's rows).
+    """
+
+    def __init__(self, store: TrackStore, order: T.Sequence[int], factory: T.Callable[[int], T.Any]):
+        """
+
+        Args:
+            store: Where the tracks live
+            order: Track ids in iteration order
+            factory: Called with a track id to create its Song
+        """
+        self.store = store
+        self.order = order
+        self.factory = factory
+        self._songs = weakref.WeakValueDictionary()
+
+    def __repr__(self):
+        return f"<SongsView {len(self)} tracks, {len(self._songs)} songs alive>"
+
+    def __getitem__(self, track_id):
+        song = self._songs.get(track_id)
+        if song is None:
+            if track_id not in self.store:
+                raise KeyError(track_id)
+            song = self._songs[track_id] = self.factory(track_id)
+        return song
+
+    def __contains__(self, track_id):
+        return track_id in self.store
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __len__(self):
+        return len(self.order)
+
+    def cached(self, track_id):
+        """
+            The Song for `track_id` if one exists right now, without creating it
+        """
+        return self._songs.get(track_id)
+
+    def adopt(self, track_id, song) -> None:
+        """
+            Use an already created Song for `track_id`
+        """
+        if track_id not in self.store:
+            raise KeyError(track_id)
+        self._songs[track_id] = song
+
+    def cached_songs(self) -> list:
+        """
+            Every Song currently materialized
+        """
+        return list(self._songs.values())
+
+    def discard(self, track_id) -> None:
+        self._songs.pop(track_id, None)
+
+    def clear(self) -> None:
+        self._songs.clear()
+
+    @property
+    def alive(self) -> int:
+        """
+            Number of Song objects currently materialized
+        """
+        return len(self._songs)
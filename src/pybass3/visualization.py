@@ -0,0 +1,240 @@
+"""
+    Spectrum and level meters
+
+    Needs numpy.   Everything is preallocated once: BASS writes FFT bins and levels straight into numpy arrays
+    and bands, decibels and smoothing are computed with in place ufuncs, so a refresh is two ctypes calls and
+    a handful of vectorized operations no matter how many bars are drawn.
+
+    Usage (eg from a 16ms QTimer)::
+
+        spectrum = Spectrum(bands=48)
+        meter = LevelMeter()
+
+        def refresh():
+            bars = spectrum.update(song.handle)  # 0..1 per band, smoothed
+            left, right = meter.update(song.handle)
+"""
+import typing as T
+
+import numpy as np
+
+from .bass_channel import BassChannel
+from .codes import data
+
+FFT_FLAGS = {
+    256: data.DATA_FFT256,
+    512: data.DATA_FFT512,
+    1024: data.DATA_FFT1024,
+    2048: data.DATA_FFT2048,
+    4096: data.DATA_FFT4096,
+    8192: data.DATA_FFT8192,
+    16384: data.DATA_FFT16384,
+    32768: data.DATA_FFT32768,
+}
+
+
+def fft_flag(fft_size: int) -> int:
+    """
+        codes.data DATA_FFTxxx value for an FFT of `fft_size` samples
+
+    Raises:
+        ValueError for sizes BASS doesn't support
+    """
+    try:
+        return FFT_FLAGS[fft_size]
+    except KeyError:
+        raise ValueError(f"{fft_size=} must be one of {sorted(FFT_FLAGS)}") from None
+
+
+def band_edges(fft_size: int, bands: int, freq: int = 44100, low: float = 20.0, high: float = None) -> np.ndarray:
+    """
+        Start bin of each of `bands` logarithmically spaced bands, ready for `np.ufunc.reduceat`.
+
+        Low bands narrower than one bin are merged, so fewer than `bands` edges can come back for small
+        FFTs.
+
+    Args:
+        fft_size: FFT size in samples, the spectrum has fft_size / 2 bins
+        bands: Number of bands wanted
+        freq: Sample rate of the channel
+        low: Lowest frequency in Hz
+        high: Highest frequency in Hz, defaults to the Nyquist frequency
+
+    Returns:
+        Increasing intp array of bin indexes
+    """
+    bins = fft_size // 2
+    high = freq / 2 if high is None else min(high, freq / 2)
+    hz_per_bin = freq / fft_size
+
+    edges = np.geomspace(low, high, bands + 1)[:-1] / hz_per_bin
+    edges = np.clip(np.floor(edges), 1, bins - 1).astype(np.intp)
+    return np.unique(edges)
+
+
+def aggregate_bands(spectrum: np.ndarray, edges: np.ndarray, out: np.ndarray = None,
+                    reduce: np.ufunc = np.maximum) -> np.ndarray:
+    """
+        Reduce FFT bins to bands, by default the loudest bin of each band.
+
+    Args:
+        spectrum: FFT magnitudes
+        edges: Start bin of every band, see `band_edges`
+        out: Array of len(edges) to write into
+        reduce: np.maximum, np.add...
+
+    Returns:
+        `out`
+    """
+    return reduce.reduceat(spectrum, edges, out=out)
+
+
+def to_decibels(values: np.ndarray, floor_db: float = -60.0, out: np.ndarray = None) -> np.ndarray:
+    """
+        Map linear magnitudes to 0..1 on a decibel scale, `floor_db` and below become 0.
+
+    Args:
+        values: Linear magnitudes, 1.0 is full scale
+        floor_db: Level drawn as empty
+        out: Array to write into, can be `values`
+
+    Returns:
+        `out`
+    """
+    out = np.maximum(values, 10 ** (floor_db / 20), out=out)
+    np.log10(out, out=out)
+    out *= 20 / -floor_db
+    out += 1.0
+    return np.clip(out, 0.0, 1.0, out=out)
+
+
+def smooth(previous: np.ndarray, current: np.ndarray, attack: float = 1.0, decay: float = 0.85) -> np.ndarray:
+    """
+        Rise towards new values at `attack` and fall at `decay` per frame, in place on `previous`.
+
+    Args:
+        previous: Last frame's values, updated in place
+        current: This frame's values
+        attack: 1 jumps straight up, lower values rise more slowly
+        decay: Fraction of the previous value kept when the new value is lower
+
+    Returns:
+        `previous`
+    """
+    rising = current > previous
+    if attack >= 1.0:
+        np.copyto(previous, current, where=rising)
+    else:
+        previous[rising] += (current[rising] - previous[rising]) * attack
+
+    falling = ~rising
+    np.maximum(previous * decay, current, out=previous, where=falling)
+    return previous
+
+
+class Spectrum:
+    """
+        Smoothed spectrum bars of a playing channel.
+    """
+
+    def __init__(self, bands: int = 64, fft_size: int = 2048, freq: int = 44100, floor_db: float = -60.0,
+                 attack: float = 1.0, decay: float = 0.85, peak_decay: float = 0.98, low: float = 20.0,
+                 high: float = None):
+        """
+
+        Args:
+            bands: Number of bars, small FFTs may give fewer, see `band_edges`
+            fft_size: 256..32768 samples, bigger means finer low frequencies and slower response
+            freq: Sample rate of the channels that will be measured
+            floor_db: Level drawn as an empty bar
+            attack: See `smooth`
+            decay: See `smooth`
+            peak_decay: Fraction of the peak markers kept every frame
+            low: Lowest frequency drawn in Hz
+            high: Highest frequency drawn in Hz
+        """
+        self.fft = fft_flag(fft_size)
+        self.floor_db = floor_db
+        self.attack = attack
+        self.decay = decay
+        self.peak_decay = peak_decay
+
+        self.bins = np.zeros(fft_size // 2, dtype=np.float32)
+        self.edges = band_edges(fft_size, bands, freq, low, high)
+        self._bands = np.zeros(len(self.edges), dtype=np.float32)
+        self.values = np.zeros(len(self.edges), dtype=np.float32)
+        self.peaks = np.zeros(len(self.edges), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.edges)
+
+    def update(self, handle: int) -> np.ndarray:
+        """
+            Read the channel's FFT and refresh `values` and `peaks`.   When the channel isn't playing the
+            bars fall back to zero.
+
+        Returns:
+            `values`, 0..1 per band.  The same array is updated on every call.
+        """
+        if BassChannel.GetFFT(handle, self.bins, self.fft) < 0:
+            self.bins.fill(0.0)
+
+        aggregate_bands(self.bins, self.edges, out=self._bands)
+        to_decibels(self._bands, self.floor_db, out=self._bands)
+        smooth(self.values, self._bands, self.attack, self.decay)
+
+        self.peaks *= self.peak_decay
+        np.maximum(self.peaks, self.values, out=self.peaks)
+        return self.values
+
+    def reset(self) -> None:
+        self.bins.fill(0.0)
+        self.values.fill(0.0)
+        self.peaks.fill(0.0)
+
+
+class LevelMeter:
+    """
+        Per channel peak or RMS meter of a playing channel.
+    """
+
+    def __init__(self, channels: int = 2, window: float = 0.02, rms: bool = False, decibels: bool = True,
+                 floor_db: float = -60.0, decay: float = 0.85):
+        """
+
+        Args:
+            channels: 1 for a mono meter (channels mixed down), 2 for stereo
+            window: Seconds measured per update
+            rms: Measure RMS instead of the peak
+            decibels: Report on a 0..1 decibel scale instead of linear amplitude
+            floor_db: Level reported as 0 with `decibels`
+            decay: Fraction of the previous value kept when the level drops
+        """
+        if channels not in (1, 2):
+            raise ValueError(f"{channels=} must be 1 or 2")
+
+        self.window = window
+        self.flags = (data.LEVEL_MONO if channels == 1 else data.LEVEL_STEREO) | (data.LEVEL_RMS if rms else 0)
+        self.decibels = decibels
+        self.floor_db = floor_db
+        self.decay = decay
+
+        self._levels = np.zeros(channels, dtype=np.float32)
+        self.values = np.zeros(channels, dtype=np.float32)
+
+    def update(self, handle: int) -> np.ndarray:
+        """
+            Returns:
+                `values`, one entry per channel.  The same array is updated on every call.
+        """
+        if BassChannel.GetLevelEx(handle, self._levels, self.window, self.flags) is not True:
+            self._levels.fill(0.0)
+
+        if self.decibels is True:
+            to_decibels(self._levels, self.floor_db, out=self._levels)
+
+        return smooth(self.values, self._levels, 1.0, self.decay)
+
+    @property
+    def levels(self) -> T.Tuple[float, ...]:
+        return tuple(self.values.tolist())
@@ -0,0 +1,281 @@
+"""
+    Waveform overviews
+
+    Needs numpy.   `compute_waveform` decodes a file once with a decode-only stream (no output device, as fast as
+    the CPU allows) and reduces it to `buckets` min/max/RMS triples, one per pixel of a seek bar, in a single
+    streaming pass over a reused buffer.
+
+    Overviews are cached as small binary files keyed by the music file's path, size and modification time, so
+    a library only has to be decoded once:
+
+        cache = WaveformCache(Path("~/.cache/pybass3/waveforms").expanduser())
+        waveform = cache.get(song.file_path, buckets=800)
+
+        # Or a whole playlist on a process pool
+        for track_id, waveform in generate_for_playlist(playlist, cache, buckets=800):
+            ...
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import dataclasses
+import hashlib
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+import struct
+import typing as T
+
+import numpy as np
+
+from .decoder import Decoder, DEFAULT_BLOCK_SIZE
+
+log = logging.getLogger(__name__)
+
+# magic, format version, channels, buckets, freq, duration, file size, file mtime
+HEADER = struct.Struct("<4sHHIIdqd")
+MAGIC = b"PBWF"
+VERSION = 1
+SCALE = 32767  # Peaks are stored as int16
+
+
+@dataclasses.dataclass
+class Waveform:
+    mins: np.ndarray  # float32 per bucket, -1..0
+    maxs: np.ndarray  # float32 per bucket, 0..1
+    rms: np.ndarray  # float32 per bucket, 0..1
+    duration: float  # Seconds
+    freq: int = 0  # Sample rate
+    chans: int = 0  # Channel count
+    size: int = 0  # Size of the source file when this was computed
+    mtime: float = 0.0  # Modification time of the source file when this was computed
+
+    def __len__(self):
+        return len(self.maxs)
+
+    @property
+    def buckets(self) -> int:
+        return len(self.maxs)
+
+    def seconds_per_bucket(self) -> float:
+        return self.duration / len(self.maxs) if len(self.maxs) else 0.0
+
+    def to_bytes(self) -> bytes:
+        header = HEADER.pack(MAGIC, VERSION, self.chans, len(self.maxs), self.freq, self.duration, self.size,
+                             self.mtime)
+        peaks = np.stack([self.mins, self.maxs, self.rms])
+        return header + np.round(np.clip(peaks, -1.0, 1.0) * SCALE).astype("<i2").tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "Waveform":
+        """
+        Raises:
+            ValueError if `blob` isn't a waveform written by `to_bytes`
+        """
+        if len(blob) < HEADER.size:
+            raise ValueError("Waveform data is truncated")
+
+        magic, version, chans, buckets, freq, duration, size, mtime = HEADER.unpack_from(blob)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} waveform")
+
+        peaks = np.frombuffer(blob, dtype="<i2", offset=HEADER.size)
+        if len(peaks) != buckets * 3:
+            raise ValueError("Waveform data is truncated")
+
+        mins, maxs, rms = peaks.reshape(3, buckets).astype(np.float32) / SCALE
+        return cls(mins, maxs, rms, duration, freq, chans, size, mtime)
+
+
+def compute_waveform(file_path: T.Union[str, Path], buckets: int = 1000,
+                     block_size: int = DEFAULT_BLOCK_SIZE * 4) -> Waveform:
+    """
+        Decode `file_path` and reduce it to `buckets` min/max/RMS values, all channels mixed into one.
+
+    Args:
+        file_path: A music file
+        buckets: Number of values, eg the width of the seek bar in pixels
+        block_size: Bytes decoded per read
+
+    Returns:
+        Waveform
+
+    Raises:
+        BassException if BASS can't open the file
+    """
+    st = os.stat(file_path)
+    mins = np.zeros(buckets, dtype=np.float32)
+    maxs = np.zeros(buckets, dtype=np.float32)
+    squares = np.zeros(buckets, dtype=np.float64)
+    counts = np.zeros(buckets, dtype=np.int64)
+
+    with Decoder(file_path, prescan=True, buffer=np.empty(block_size // 4, dtype=np.float32)) as decoder:
+        chans = decoder.chans
+        total = decoder.length_bytes // (4 * chans)  # frames
+        duration = decoder.duration
+        frame = 0
+
+        for block in decoder.blocks():
+            frames = block[:len(block) - len(block) % chans].reshape(-1, chans)
+            count = len(frames)
+            if count == 0 or total <= 0:
+                continue
+
+            # Mix down per frame: the extremes of any channel and the mean power across channels
+            low = frames.min(axis=1)
+            high = frames.max(axis=1)
+            power = np.square(frames, dtype=np.float64).mean(axis=1)
+
+            # Buckets this block touches and where each of them starts inside it
+            end = frame + count
+            first = min(frame * buckets // total, buckets - 1)
+            last = min((end - 1) * buckets // total, buckets - 1)
+            touched = np.arange(first, last + 1)
+            starts = -(-touched * total // buckets) - frame  # ceil division
+            starts[0] = 0
+            starts = np.clip(starts, 0, count - 1)
+
+            np.minimum(mins[first:last + 1], np.minimum.reduceat(low, starts), out=mins[first:last + 1])
+            np.maximum(maxs[first:last + 1], np.maximum.reduceat(high, starts), out=maxs[first:last + 1])
+            squares[first:last + 1] += np.add.reduceat(power, starts)
+            counts[first:last + 1] += np.diff(np.append(starts, count))
+
+            frame = end
+
+        freq = decoder.freq
+
+    rms = np.sqrt(squares / np.maximum(counts, 1)).astype(np.float32)
+    return Waveform(mins, maxs, rms, duration, freq, chans, st.st_size, st.st_mtime)
+
+
+class WaveformCache:
+    """
+        Directory of `.pbwf` files, one per music file and bucket count.   An entry is only used while the
+        music file's size and modification time match the ones it was computed from.
+    """
+
+    def __init__(self, cache_dir: T.Union[str, Path]):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def entry_path(self, file_path: T.Union[str, Path], buckets: int) -> Path:
+        key = hashlib.sha1(os.fsencode(os.path.abspath(file_path))).hexdigest()
+        return self.cache_dir / f"{key}-{buckets}.pbwf"
+
+    def lookup(self, file_path: T.Union[str, Path], buckets: int) -> T.Optional[Waveform]:
+        """
+            The cached waveform if it is still current, None otherwise
+        """
+        try:
+            st = os.stat(file_path)
+            blob = self.entry_path(file_path, buckets).read_bytes()
+        except FileNotFoundError:
+            return None
+
+        try:
+            waveform = Waveform.from_bytes(blob)
+        except ValueError:
+            log.warning("Ignoring corrupt waveform cache entry for %s", file_path)
+            return None
+
+        if waveform.size != st.st_size or waveform.mtime != st.st_mtime:
+            return None
+
+        return waveform
+
+    def store(self, file_path: T.Union[str, Path], waveform: Waveform) -> None:
+        entry = self.entry_path(file_path, waveform.buckets)
+        partial = entry.with_suffix(f".{os.getpid()}.tmp")
+        partial.write_bytes(waveform.to_bytes())
+        # Readers never see a half written entry
+        os.replace(partial, entry)
+
+    def get(self, file_path: T.Union[str, Path], buckets: int = 1000) -> Waveform:
+        """
+            Cached waveform, computed and stored first if needed
+
+        Raises:
+            BassException if BASS can't open the file
+        """
+        waveform = self.lookup(file_path, buckets)
+        if waveform is None:
+            waveform = compute_waveform(file_path, buckets)
+            self.store(file_path, waveform)
+        return waveform
+
+    def clear(self) -> int:
+        """
+            Delete every entry
+
+        Returns:
+            Number of entries deleted
+        """
+        count = 0
+        for entry in self.cache_dir.glob("*.pbwf"):
+            entry.unlink()
+            count += 1
+        return count
+
+
+def _generate(file_path: str, buckets: int, cache_dir: T.Optional[str]) -> bytes:
+    # Runs in a worker process, hands back the compact form rather than pickled arrays
+    if cache_dir is None:
+        return compute_waveform(file_path, buckets).to_bytes()
+    return WaveformCache(cache_dir).get(file_path, buckets).to_bytes()
+
+
+def generate_many(paths: T.Iterable[T.Union[str, Path]], buckets: int = 1000, cache: WaveformCache = None,
+                  workers: int = None) -> T.Iterator[T.Tuple[Path, T.Union[Waveform, Exception]]]:
+    """
+        Compute waveforms on a process pool, decoding is CPU bound so threads wouldn't help.   Cached entries
+        are answered in this process without starting a worker.
+
+    Args:
+        paths: Music files
+        buckets: Values per waveform
+        cache: Where waveforms are looked up and stored, nothing is cached if None
+        workers: Number of processes, defaults to the CPU count
+
+    Returns:
+        Generator of (path, Waveform) in completion order, (path, exception) for files that failed
+    """
+    cache_dir = None if cache is None else os.fspath(cache.cache_dir)
+    # spawn: a forked child would inherit BASS's state without its threads
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {}
+        for path in paths:
+            path = Path(path)
+            waveform = None if cache is None else cache.lookup(path, buckets)
+            if waveform is not None:
+                yield path, waveform
+            else:
+                futures[pool.submit(_generate, os.fspath(path), buckets, cache_dir)] = path
+
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                yield path, Waveform.from_bytes(future.result())
+            except Exception as exc:
+                log.warning("Couldn't compute the waveform of %s: %r", path, exc)
+                yield path, exc
+
+
+def generate_for_playlist(playlist, cache: WaveformCache = None, buckets: int = 1000,
+                          workers: int = None) -> T.Iterator[T.Tuple[int, Waveform]]:
+    """
+        Waveforms for every track of a Playlist, see `generate_many`.   Songs aren't created, paths come
+        straight from the playlist's TrackStore.
+
+    Returns:
+        Generator of (track id, Waveform), tracks that couldn't be decoded are skipped
+    """
+    ids_by_path = {}
+    for track_id in playlist.rows.tolist():
+        ids_by_path.setdefault(Path(playlist.tracks.path(track_id)), []).append(track_id)
+
+    for path, waveform in generate_many(ids_by_path, buckets, cache, workers):
+        if isinstance(waveform, Exception):
+            continue
+        for track_id in ids_by_path[path]:
+            yield track_id, waveform
@@ -0,0 +1,82 @@
+"""
+    Regenerates src/pybass3/_bass_api.py from src/pybass3/vendor/bass.h
+
+    Usage::
+
+        python tools/generate_bindings.py
+
+    Every `BASSDEF(name)(args);` declaration becomes an entry of normalized C type names, which
+    pybass3.bindings turns into ctypes argtypes/restype the first time the function is used.
+"""
+from pathlib import Path
+import re
+
+ROOT = Path(__file__).resolve().parent.parent
+HEADER = ROOT / "src" / "pybass3" / "vendor" / "bass.h"
+OUTPUT = ROOT / "src" / "pybass3" / "_bass_api.py"
+
+DECLARATION = re.compile(r"^\s*(?P<restype>[\w\s\*]+?)\s*\*?\s*BASSDEF\((?P<name>\w+)\)\((?P<args>[^)]*)\);", re.M)
+
+
+def normalize(c_type: str) -> str:
+    """
+        "const void *" -> "void*", "DWORD" -> "DWORD"
+    """
+    c_type = c_type.replace("const ", "").strip()
+    pointers = c_type.count("*")
+    return c_type.replace("*", "").strip() + "*" * pointers
+
+
+def parse_arg(arg: str) -> str:
+    arg = arg.strip()
+    # Drop the parameter name, keep any pointer stars attached to it
+    match = re.match(r"^(?P<type>.*?)(?P<stars>\**)\s*\w+$", arg)
+    if match is None:
+        return normalize(arg)
+    return normalize(match.group("type") + match.group("stars"))
+
+
+def parse(header: str) -> dict:
+    prototypes = {}
+    for match in DECLARATION.finditer(header):
+        name = match.group("name")
+        if name in prototypes:
+            # BASS_Init is declared twice (Windows HWND/GUID vs void*), both are pointers to ctypes
+            continue
+
+        full = match.group(0)
+        restype = normalize(full[:full.index("BASSDEF")])
+        args = match.group("args").strip()
+        argtypes = tuple(parse_arg(arg) for arg in args.split(",")) if args and args != "void" else ()
+        prototypes[name] = (restype, argtypes)
+
+    return prototypes
+
+
+def render(prototypes: dict) -> str:
+    lines = [
+        '"""',
+        "    Generated by tools/generate_bindings.py from vendor/bass.h, do not edit by hand.",
+        "",
+        "    name -> (C return type, (C argument types, ...))",
+        '"""',
+        "",
+        "PROTOTYPES = {",
+    ]
+    for name, (restype, argtypes) in prototypes.items():
+        args = ", ".join(repr(arg) for arg in argtypes)
+        if len(argtypes) == 1:
+            args += ","
+        lines.append(f"    {name!r}: ({restype!r}, ({args})),")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    prototypes = parse(HEADER.read_text(encoding="latin-1"))
+    OUTPUT.write_text(render(prototypes), encoding="utf-8")
+    print(f"Wrote {len(prototypes)} prototypes to {OUTPUT}")
+
+
+if __name__ == "__main__":
+    main()